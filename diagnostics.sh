@@ -110,6 +110,7 @@ check_scripts() {
         "create_client.sh"
         "scripts/generate_client_repo.sh"
         "scripts/repository_optimizer.sh"
+        "scripts/remote_branch_cache.py"
         "manage_templates.sh"
         "install_deps.sh"
     )
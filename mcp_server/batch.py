@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Batched tool calls for the HTTP API (`POST /tools/batch`)
+
+A batch is a list of calls `{"id", "name", "arguments", "depends_on"}`. Calls
+whose dependencies are satisfied run concurrently (bounded by `concurrency`);
+a call starts as soon as every call it depends on has succeeded, and is
+skipped if one of them failed. Results are yielded in completion order so the
+endpoint can stream them as NDJSON or collect them keyed by call id.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Tuple
+
+MAX_CALLS = 100
+
+# execute(name, arguments) -> (result, failed)
+Executor = Callable[[str, Dict[str, Any]], Awaitable[Tuple[Any, bool]]]
+
+
+class BatchError(ValueError):
+    """Invalid batch (duplicate ids, unknown dependency, cycle...)"""
+
+
+def validate_batch(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Normalize the calls (default ids, arguments, dependencies) and reject invalid batches"""
+    if not calls:
+        raise BatchError("The batch is empty")
+    if len(calls) > MAX_CALLS:
+        raise BatchError(f"Too many calls in the batch ({len(calls)} > {MAX_CALLS})")
+
+    normalized = []
+    for index, call in enumerate(calls):
+        if not call.get("name"):
+            raise BatchError(f"Call #{index} has no tool name")
+        normalized.append({
+            "id": str(call.get("id") or index),
+            "name": call["name"],
+            "arguments": call.get("arguments") or {},
+            "depends_on": [str(dep) for dep in call.get("depends_on") or []],
+        })
+
+    ids = [call["id"] for call in normalized]
+    duplicates = sorted({call_id for call_id in ids if ids.count(call_id) > 1})
+    if duplicates:
+        raise BatchError(f"Duplicate call ids: {', '.join(duplicates)}")
+    known = set(ids)
+    for call in normalized:
+        unknown = [dep for dep in call["depends_on"] if dep not in known]
+        if unknown:
+            raise BatchError(f"Call '{call['id']}' depends on unknown calls: {', '.join(unknown)}")
+
+    # Cycle detection (depth-first, iterative)
+    graph = {call["id"]: call["depends_on"] for call in normalized}
+    state: Dict[str, int] = {}  # 1: in progress, 2: done
+    for root in graph:
+        stack = [(root, iter(graph[root]))]
+        state.setdefault(root, 1)
+        if state[root] == 2:
+            continue
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                state[node] = 2
+                stack.pop()
+            elif state.get(child) == 1:
+                raise BatchError(f"Dependency cycle involving '{child}'")
+            elif child not in state:
+                state[child] = 1
+                stack.append((child, iter(graph[child])))
+    return normalized
+
+
+async def run_batch(calls: List[Dict[str, Any]], execute: Executor, concurrency: int = 8) -> AsyncIterator[Dict[str, Any]]:
+    """Run validated calls and yield `{"id", "name", "success", "result"|"error", "duration"}` as they complete"""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    succeeded = {call["id"]: loop.create_future() for call in calls}
+    completed: asyncio.Queue = asyncio.Queue()
+
+    async def run(call: Dict[str, Any]):
+        result: Dict[str, Any] = {"id": call["id"], "name": call["name"]}
+        failed_deps = [dep for dep in call["depends_on"] if not await succeeded[dep]]
+        if failed_deps:
+            result.update(success=False, skipped=True, error=f"Dependency failed: {', '.join(failed_deps)}", duration=0.0)
+        else:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    value, failed = await execute(call["name"], call["arguments"])
+                    result.update(success=not failed, result=value)
+                except Exception as e:
+                    result.update(success=False, error=str(e))
+                result["duration"] = round(time.perf_counter() - started, 4)
+        succeeded[call["id"]].set_result(result["success"])
+        await completed.put(result)
+
+    tasks = [asyncio.create_task(run(call)) for call in calls]
+    try:
+        for _ in calls:
+            yield await completed.get()
+    finally:
+        # Client gone (streaming) or consumer stopped: do not leave calls running
+        for task in tasks:
+            task.cancel()
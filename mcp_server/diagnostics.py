@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Parallel diagnostics engine for Odoo clients
+
+Replaces the sequential checks of scripts/diagnose_client.sh for the MCP
+server: independent checks run concurrently, each under its own timeout, and
+produce a structured report with per-check durations. Container states are
+read with a single `docker ps` shared by every client of a fleet sweep, and
+HTTP checks go through the Traefik entrypoint without spawning curl.
+
+Usage (from the repository root):
+    python3 mcp_server/diagnostics.py [CLIENT ...] [--json] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+TRAEFIK_URL = os.environ.get("TRAEFIK_URL", "http://localhost:8090")
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_CONCURRENCY = 8
+
+# Severity order of check statuses, and matching exit codes of diagnose_client.sh
+SEVERITY = {"ok": 0, "skipped": 0, "warning": 1, "error": 2, "critical": 3}
+STATUS_ICONS = {"ok": "✅", "skipped": "⏭️", "warning": "⚠️", "error": "❌", "critical": "🚨"}
+
+
+def _check(name: str, status: str, message: str, **details: Any) -> Dict[str, Any]:
+    result = {"name": name, "status": status, "message": message}
+    if details:
+        result["details"] = details
+    return result
+
+
+class DiagnosticsEngine:
+    """Concurrent health checks for one client or the whole fleet"""
+
+    def __init__(self, repo_path: Path, timeout: float = DEFAULT_TIMEOUT, traefik_url: str = TRAEFIK_URL, metrics=None):
+        self.repo_path = Path(repo_path)
+        self.clients_dir = self.repo_path / "clients"
+        self.timeout = timeout
+        self.traefik_url = traefik_url.rstrip("/")
+        self.metrics = metrics  # optional metrics.Metrics counting the spawned subprocesses
+
+    async def _exec(self, *command: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run a command without a shell; the process is killed when the timeout expires"""
+        if self.metrics is not None:
+            self.metrics.record_subprocess(command[0])
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            return {"returncode": 127, "stdout": "", "stderr": f"{command[0]}: command not found"}
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout or self.timeout)
+        finally:
+            # Own timeout, or cancellation by the check's timeout in _timed(): never leave an orphan
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        return {"returncode": process.returncode, "stdout": stdout.decode(errors="replace"), "stderr": stderr.decode(errors="replace")}
+
+    def _http_get(self, path: str, host: str) -> Dict[str, Any]:
+        request = urllib.request.Request(f"{self.traefik_url}{path}", headers={"Host": host})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return {"status": response.status, "body": response.read(4096).decode(errors="replace")}
+        except urllib.error.HTTPError as e:
+            return {"status": e.code, "body": ""}
+        except (urllib.error.URLError, OSError) as e:
+            return {"status": None, "body": "", "error": str(getattr(e, "reason", e))}
+
+    async def container_states(self) -> Dict[str, Dict[str, str]]:
+        """State of every container, from a single `docker ps -a`"""
+        result = await self._exec("docker", "ps", "-a", "--format", "{{.Names}}\t{{.State}}\t{{.Status}}")
+        if result["returncode"] != 0:
+            raise RuntimeError(result["stderr"].strip() or "docker ps failed")
+        states = {}
+        for line in result["stdout"].splitlines():
+            name, _, rest = line.partition("\t")
+            state, _, status = rest.partition("\t")
+            states[name] = {"state": state, "status": status}
+        return states
+
+    async def _timed(self, name: str, coroutine, timeout: Optional[float] = None) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(coroutine, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            result = _check(name, "error", f"Timed out after {timeout or self.timeout:.0f}s")
+        except Exception as e:
+            result = _check(name, "error", f"Check failed: {e}")
+        result["duration"] = round(time.monotonic() - started, 3)
+        return result
+
+    # Individual checks
+
+    async def check_containers(self, client: str, states: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+        expected = [f"odoo-{client}", f"postgresql-{client}"]
+        found = {name: states[name] for name in expected if name in states}
+        running = [name for name, info in found.items() if info["state"] == "running"]
+        if not found:
+            return _check("containers", "error", "No container found - the project is not started",
+                          hint=f"cd clients/{client} && docker compose up -d")
+        status = "ok" if len(running) == len(expected) else "error"
+        return _check("containers", status, f"{len(found)} found, {len(running)} running", containers=found)
+
+    async def check_postgresql(self, client: str, states: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+        container = f"postgresql-{client}"
+        if container not in states:
+            return _check("postgresql", "error", f"Container '{container}' not found")
+        if states[container]["state"] != "running":
+            return _check("postgresql", "error", f"Not running (state: {states[container]['state']})")
+        result = await self._exec("docker", "exec", container, "pg_isready", "-U", "odoo")
+        if "accepting connections" in result["stdout"]:
+            return _check("postgresql", "ok", "Accepting connections")
+        return _check("postgresql", "warning", "Running but not accepting connections",
+                      output=(result["stdout"] + result["stderr"]).strip())
+
+    async def check_odoo(self, client: str, states: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+        container = f"odoo-{client}"
+        if container not in states:
+            return _check("odoo", "error", f"Container '{container}' not found")
+        if states[container]["state"] != "running":
+            return _check("odoo", "error", f"Not running (state: {states[container]['state']})")
+        result = await self._exec("docker", "exec", container, "curl", "-sf", "http://localhost:8069/web/health")
+        if '"pass"' in result["stdout"]:
+            return _check("odoo", "ok", "Health check passed")
+        return _check("odoo", "warning", "Running but the health check does not answer",
+                      output=(result["stdout"] + result["stderr"]).strip()[:500])
+
+    async def check_traefik(self, client: str, states: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+        if not any("traefik" in name and info["state"] == "running" for name, info in states.items()):
+            return _check("traefik", "error", "Traefik not found or not running")
+        host = f"dev.{client}.localhost"
+        health, home = await asyncio.gather(
+            asyncio.to_thread(self._http_get, "/web/health", host),
+            asyncio.to_thread(self._http_get, "/", host),
+        )
+        if home["status"] is None:
+            return _check("traefik", "error", f"Client not reachable via Traefik ({home.get('error')})", url=f"http://{host}")
+        if '"pass"' in health["body"]:
+            return _check("traefik", "ok", f"Routing to {host} works", url=f"http://{host}")
+        return _check("traefik", "warning", f"Routing problem to {host} (HTTP {health['status']})", url=f"http://{host}")
+
+    async def check_disk(self, client: str) -> Dict[str, Any]:
+        usage = await asyncio.to_thread(shutil.disk_usage, self.clients_dir / client)
+        percent = round(usage.used * 100 / usage.total) if usage.total else 0
+        available = f"{usage.free / 1024 ** 3:.1f} GB"
+        if percent > 90:
+            status, message = "error", f"Critical disk space: {percent}% used, {available} available"
+        elif percent > 80:
+            status, message = "warning", f"Low disk space: {percent}% used, {available} available"
+        else:
+            status, message = "ok", f"{percent}% used, {available} available"
+        return _check("disk", status, message, used_percent=percent)
+
+    # Reports
+
+    async def diagnose(self, client: str, states: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Any]:
+        """Run every check of a client concurrently"""
+        started = time.monotonic()
+        client_dir = self.clients_dir / client
+        if not client_dir.is_dir():
+            checks = [_check("client", "critical", f"Client '{client}' not found in {self.clients_dir}")]
+        elif not (client_dir / "docker-compose.yml").exists():
+            checks = [_check("client", "error", "Docker configuration missing (docker-compose.yml)")]
+        else:
+            checks = [_check("client", "ok", f"Found in {client_dir}")]
+            if states is None:
+                try:
+                    states = await asyncio.wait_for(self.container_states(), self.timeout)
+                except (asyncio.TimeoutError, RuntimeError) as e:
+                    checks.append(_check("docker", "critical", f"Docker unavailable: {str(e) or 'timeout'}"))
+            container_checks = []
+            if states is not None:
+                container_checks = [
+                    self._timed("containers", self.check_containers(client, states)),
+                    self._timed("postgresql", self.check_postgresql(client, states)),
+                    self._timed("odoo", self.check_odoo(client, states)),
+                    self._timed("traefik", self.check_traefik(client, states)),
+                ]
+            checks += await asyncio.gather(*container_checks, self._timed("disk", self.check_disk(client)))
+
+        status = max((check["status"] for check in checks), key=SEVERITY.__getitem__)
+        report = {
+            "client": client,
+            "status": status,
+            "exit_code": SEVERITY[status],
+            "duration": round(time.monotonic() - started, 3),
+            "checks": checks,
+        }
+        recommendations = []
+        if any(c["name"] == "containers" and c["status"] != "ok" for c in checks):
+            recommendations.append(f"Start the services: cd clients/{client} && docker compose up -d")
+        elif any(c["name"] in ("odoo", "traefik") and c["status"] != "ok" for c in checks):
+            recommendations.append(f"Check the logs: cd clients/{client} && docker compose logs")
+            recommendations.append("Restart the services: docker compose restart")
+        if recommendations:
+            report["recommendations"] = recommendations
+        return report
+
+    def list_clients(self) -> List[str]:
+        if not self.clients_dir.is_dir():
+            return []
+        return sorted(path.name for path in self.clients_dir.iterdir() if path.is_dir())
+
+    async def diagnose_all(self, clients: Optional[List[str]] = None, concurrency: int = DEFAULT_CONCURRENCY) -> Dict[str, Any]:
+        """Diagnose the fleet in parallel, sharing one container listing"""
+        started = time.monotonic()
+        clients = clients or self.list_clients()
+        try:
+            states = await asyncio.wait_for(self.container_states(), self.timeout)
+        except (asyncio.TimeoutError, RuntimeError):
+            states = None  # each client reports Docker as unavailable
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def bounded(client: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.diagnose(client, states)
+
+        reports = await asyncio.gather(*(bounded(client) for client in clients))
+        summary: Dict[str, int] = {}
+        for report in reports:
+            summary[report["status"]] = summary.get(report["status"], 0) + 1
+        return {
+            "clients": len(reports),
+            "duration": round(time.monotonic() - started, 3),
+            "summary": summary,
+            "reports": list(reports),
+        }
+
+
+def format_report(report: Dict[str, Any], verbose: bool = False) -> str:
+    """Human readable rendering of a client report"""
+    lines = [f"{STATUS_ICONS[report['status']]} Client '{report['client']}': {report['status']} ({report['duration']}s)"]
+    for check in report["checks"]:
+        duration = f" ({check['duration']}s)" if "duration" in check else ""
+        lines.append(f"  {STATUS_ICONS[check['status']]} {check['name']}: {check['message']}{duration}")
+        if verbose and check.get("details"):
+            lines.append(f"      {json.dumps(check['details'], ensure_ascii=False)}")
+    for recommendation in report.get("recommendations", []):
+        lines.append(f"  🛠️ {recommendation}")
+    return "\n".join(lines)
+
+
+def format_fleet_report(fleet: Dict[str, Any], verbose: bool = False) -> str:
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(fleet["summary"].items()))
+    lines = [f"📊 {fleet['clients']} client(s) diagnosed in {fleet['duration']}s: {summary or 'no client'}", ""]
+    lines += [format_report(report, verbose) for report in fleet["reports"]]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel diagnostics of Odoo clients")
+    parser.add_argument("clients", nargs="*", help="Clients to diagnose (all clients if omitted)")
+    parser.add_argument("--repo", default=str(Path(__file__).resolve().parent.parent), help="Repository root")
+    parser.add_argument("--json", action="store_true", help="JSON output")
+    parser.add_argument("--verbose", action="store_true", help="Show check details")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Clients diagnosed concurrently")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Timeout of each check (s)")
+    args = parser.parse_args()
+
+    engine = DiagnosticsEngine(Path(args.repo), timeout=args.timeout)
+    fleet = asyncio.run(engine.diagnose_all(args.clients or None, args.concurrency))
+    if args.json:
+        print(json.dumps(fleet, indent=2, ensure_ascii=False))
+    else:
+        print(format_fleet_report(fleet, args.verbose))
+    sys.exit(max((report["exit_code"] for report in fleet["reports"]), default=0))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,11 +13,17 @@ import os
 import sys
 import logging
 import json
+import tempfile
+import time
 import argparse
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from contextlib import asynccontextmanager
 
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, container_families
+from profiling import LoopLagMonitor
+from singleflight import SingleFlight, call_key
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -35,24 +41,36 @@ except ImportError:
     logger.error("MCP library not found. Install with: pip install mcp")
     sys.exit(1)
 
-# HTTP server dependencies
-try:
-    from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
-    from fastapi.middleware.cors import CORSMiddleware
-    from pydantic import BaseModel
-    import uvicorn
-    import asyncio
-    import pty
-    import select
-    import termios
-    import struct
-    import fcntl
-except ImportError:
-    logger.warning("FastAPI not found. HTTP mode will not be available. Install with: pip install fastapi uvicorn")
-    FastAPI = None
+# HTTP server dependencies, imported by _load_http_dependencies() for the http/both modes only:
+# stdio sessions (spawned by Claude Desktop) do not pay for FastAPI, uvicorn and the terminal modules
+FastAPI = None
+
 
-# HTTP API Models
-if FastAPI:
+def _load_http_dependencies() -> bool:
+    """Import the HTTP and terminal dependencies; returns False if they are not installed"""
+    global FastAPI, Header, HTTPException, Response, WebSocket, WebSocketDisconnect, CORSMiddleware
+    global BaseModel, uvicorn, pty, select, termios, struct, fcntl, ToolCallRequest, ToolCallResponse
+    global StreamingResponse, GZipMiddleware, ToolBatchCall, ToolBatchRequest
+    if FastAPI is not None:
+        return True
+    try:
+        import fastapi
+        from fastapi import Header, HTTPException, Response, WebSocket, WebSocketDisconnect
+        from fastapi.middleware.cors import CORSMiddleware
+        from fastapi.middleware.gzip import GZipMiddleware
+        from fastapi.responses import StreamingResponse
+        from pydantic import BaseModel
+        import uvicorn
+        import pty
+        import select
+        import termios
+        import struct
+        import fcntl
+    except ImportError:
+        logger.warning("FastAPI not found. HTTP mode will not be available. Install with: pip install fastapi uvicorn")
+        return False
+    
+    # HTTP API Models
     class ToolCallRequest(BaseModel):
         name: str
         arguments: Dict[str, Any] = {}
@@ -61,14 +79,45 @@ if FastAPI:
         success: bool
         result: Any
         error: Optional[str] = None
+    
+    class ToolBatchCall(BaseModel):
+        id: Optional[str] = None
+        name: str
+        arguments: Dict[str, Any] = {}
+        depends_on: List[str] = []
+    
+    class ToolBatchRequest(BaseModel):
+        calls: List[ToolBatchCall]
+        concurrency: int = 8
+        stream: bool = False
+    
+    FastAPI = fastapi.FastAPI
+    return True
 
 class OdooClientMCPServer:
     """MCP Server for Odoo Client Repository Generator"""
     
+    # Tools without side effects: identical concurrent calls share one execution (single-flight)
+    READ_ONLY_TOOLS = frozenset({
+        "list_clients", "client_status", "get_client_status", "check_client", "list_modules",
+        "get_client_logs", "diagnose_client", "diagnose_all", "list_backups",
+    })
+    # Tools behind the same MCP_ADMIN_TOKEN check as the /admin endpoints when called over HTTP
+    ADMIN_TOOLS = frozenset({"profile_server"})
+    
     def __init__(self, repo_path: str):
         self.repo_path = Path(repo_path).resolve()
         self.server = Server("odoo-client-generator")
-        self.http_app = None
+        self._http_app = None
+        self._tools = None
+        self._tool_executor = None  # worker threads for read-only and batched tools, created on first use
+        self._single_flight = SingleFlight()
+        self._output_store = None
+        self._oca_search = None
+        self.metrics = REGISTRY
+        self.loop_monitor = LoopLagMonitor()
+        self.metrics.add_collector("event_loop", self.loop_monitor.metric_families)
+        self._container_states = (0.0, None)  # (monotonic time, docker ps snapshot) reused between scrapes
         
         if not self.repo_path.exists():
             raise ValueError(f"Repository path '{repo_path}' does not exist")
@@ -76,26 +125,56 @@ class OdooClientMCPServer:
         if not (self.repo_path / "Makefile").exists():
             raise ValueError(f"Makefile not found in '{repo_path}'. Not a valid repository.")
         
+        # Python tooling shared with the shell scripts (addon index, ...)
+        scripts_dir = str(self.repo_path / "scripts")
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
+        
         self._setup_handlers()
-        if FastAPI:
+    
+    @property
+    def output_store(self):
+        """Spill-to-disk store of large outputs, created on first use"""
+        if self._output_store is None:
+            from output_store import OutputStore
+            self._output_store = OutputStore()
+        return self._output_store
+    
+    def _read_output(self, stream, spill: bool, source: str) -> str:
+        if spill:
+            return self.output_store.spill_file(stream, source)
+        stream.seek(0)
+        return stream.read().decode("utf-8", errors="replace")
+    
+    @property
+    def http_app(self):
+        """FastAPI app, built on first access (None if FastAPI is not installed)"""
+        if self._http_app is None and _load_http_dependencies():
             self._setup_http_app()
+        return self._http_app
     
-    def _run_command(self, command: List[str], cwd: Optional[Path] = None) -> Dict[str, Any]:
-        """Execute a shell command and return the result"""
+    def _run_command(self, command: List[str], cwd: Optional[Path] = None, spill: bool = True) -> Dict[str, Any]:
+        """Execute a shell command and return the result
+        
+        Output goes to temporary files rather than memory; with `spill`, an output above the
+        output store threshold is returned as a head/tail summary with a handle to the full text.
+        """
+        self.metrics.record_subprocess(Path(command[0]).name)
         try:
-            result = subprocess.run(
-                command,
-                cwd=cwd or self.repo_path,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
-            return {
-                "success": result.returncode == 0,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "return_code": result.returncode
-            }
+            with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+                result = subprocess.run(
+                    command,
+                    cwd=cwd or self.repo_path,
+                    stdout=stdout,
+                    stderr=stderr,
+                    timeout=300  # 5 minute timeout
+                )
+                return {
+                    "success": result.returncode == 0,
+                    "stdout": self._read_output(stdout, spill, f"{command[0]} stdout"),
+                    "stderr": self._read_output(stderr, spill, f"{command[0]} stderr"),
+                    "return_code": result.returncode
+                }
         except subprocess.TimeoutExpired:
             return {
                 "success": False,
@@ -116,7 +195,12 @@ class OdooClientMCPServer:
         
         @self.server.list_tools()
         async def handle_list_tools():
-            """Return list of available tools"""
+            """Return list of available tools (schemas are built once, on the first request)"""
+            if self._tools is None:
+                self._tools = build_tools()
+            return self._tools
+        
+        def build_tools():
             return [
                 types.Tool(
                     name="create_client",
@@ -208,13 +292,18 @@ class OdooClientMCPServer:
                 ),
                 types.Tool(
                     name="update_client",
-                    description="Update submodules for a specific client",
+                    description="Update submodules for a specific client in parallel (unchanged submodules are skipped)",
                     inputSchema={
                         "type": "object",
                         "properties": {
                             "client": {
                                 "type": "string",
                                 "description": "Name of the client to update"
+                            },
+                            "jobs": {
+                                "type": "integer",
+                                "description": "Number of submodules updated concurrently",
+                                "default": 8
                             }
                         },
                         "required": ["client"]
@@ -242,6 +331,11 @@ class OdooClientMCPServer:
                             "link_modules": {
                                 "type": "string",
                                 "description": "Comma-separated list of specific modules to link to extra-addons (e.g. 'module1,module2')"
+                            },
+                            "with_dependencies": {
+                                "type": "boolean",
+                                "description": "Also add the OCA repositories and link the modules required by the linked modules",
+                                "default": False
                             }
                         },
                         "required": ["client", "module"]
@@ -274,6 +368,26 @@ class OdooClientMCPServer:
                         "required": ["client", "repository"]
                     }
                 ),
+                types.Tool(
+                    name="sparse_checkout",
+                    description="Limit a client's OCA submodules to linked addons and their dependencies (opt-in sparse mode)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "client": {
+                                "type": "string",
+                                "description": "Name of the client"
+                            },
+                            "action": {
+                                "type": "string",
+                                "enum": ["enable", "disable", "apply", "status"],
+                                "description": "enable/disable the sparse mode, re-apply it, or show the checked out addons",
+                                "default": "status"
+                            }
+                        },
+                        "required": ["client"]
+                    }
+                ),
                 types.Tool(
                     name="list_modules",
                     description="List available modules for a specific client",
@@ -290,14 +404,28 @@ class OdooClientMCPServer:
                 ),
                 types.Tool(
                     name="list_oca_modules",
-                    description="List all available OCA modules with optional filtering",
+                    description="Search OCA repositories and addons (fuzzy search on names and descriptions, ranked by stars)",
                     inputSchema={
                         "type": "object",
                         "properties": {
                             "pattern": {
                                 "type": "string",
-                                "description": "Optional pattern to filter modules",
+                                "description": "Optional search text (typos tolerated); lists the most popular repositories if empty",
                                 "default": ""
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of results",
+                                "default": 50
+                            },
+                            "type": {
+                                "type": "string",
+                                "description": "Restrict results to repositories or addons",
+                                "enum": ["repository", "addon"]
+                            },
+                            "version": {
+                                "type": "string",
+                                "description": "Odoo version used to filter addons"
                             }
                         },
                         "required": []
@@ -361,6 +489,11 @@ class OdooClientMCPServer:
                                 "type": "boolean",
                                 "description": "Use fast update without verification",
                                 "default": False
+                            },
+                            "incremental": {
+                                "type": "boolean",
+                                "description": "Only re-verify repositories that are new or changed since the last update",
+                                "default": False
                             }
                         },
                         "required": []
@@ -388,13 +521,83 @@ class OdooClientMCPServer:
                 ),
                 types.Tool(
                     name="backup_client",
-                    description="Create a backup of a client",
+                    description="Create an incremental backup of a client (submodules recorded by commit, content deduplicated)",
                     inputSchema={
                         "type": "object",
                         "properties": {
                             "client": {
                                 "type": "string",
                                 "description": "Name of the client to backup"
+                            },
+                            "include_database": {
+                                "type": "boolean",
+                                "description": "Also stream a pg_dump of the client databases and their filestore",
+                                "default": False
+                            }
+                        },
+                        "required": ["client"]
+                    }
+                ),
+                types.Tool(
+                    name="restore_client_database",
+                    description="Restore the client databases and filestore from a database backup, in parallel",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "client": {
+                                "type": "string",
+                                "description": "Name of the client"
+                            },
+                            "backup_id": {
+                                "type": "string",
+                                "description": "Database backup to restore (latest if omitted)"
+                            },
+                            "database": {
+                                "type": "string",
+                                "description": "Only restore this database (all databases of the backup if omitted)"
+                            },
+                            "jobs": {
+                                "type": "integer",
+                                "description": "Restore parallelism (databases and pg_restore jobs)",
+                                "default": 4
+                            },
+                            "drop": {
+                                "type": "boolean",
+                                "description": "Replace existing databases and filestores",
+                                "default": False
+                            }
+                        },
+                        "required": ["client"]
+                    }
+                ),
+                types.Tool(
+                    name="list_backups",
+                    description="List the backups of a client (or of all clients)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "client": {
+                                "type": "string",
+                                "description": "Name of the client (all clients if omitted)"
+                            }
+                        },
+                        "required": []
+                    }
+                ),
+                types.Tool(
+                    name="prune_backups",
+                    description="Delete old backups of a client and free the chunks no backup references anymore",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "client": {
+                                "type": "string",
+                                "description": "Name of the client"
+                            },
+                            "keep": {
+                                "type": "integer",
+                                "description": "Number of most recent backups to keep",
+                                "default": 7
                             }
                         },
                         "required": ["client"]
@@ -425,6 +628,85 @@ class OdooClientMCPServer:
                         "required": ["client"]
                     }
                 ),
+                types.Tool(
+                    name="profile_server",
+                    description="Profile the running MCP server for a few seconds (stack sampling or cProfile) and report event loop lag",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "duration": {
+                                "type": "number",
+                                "description": "Profiling duration in seconds (max 120)",
+                                "default": 10
+                            },
+                            "mode": {
+                                "type": "string",
+                                "description": "sample: collapsed stacks for flamegraphs, cprofile: deterministic profile of the event loop thread",
+                                "enum": ["sample", "cprofile"],
+                                "default": "sample"
+                            },
+                            "loop_only": {
+                                "type": "boolean",
+                                "description": "Sample only the event loop thread",
+                                "default": False
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of stacks (or pstats rows) returned",
+                                "default": 100
+                            }
+                        }
+                    }
+                ),
+                types.Tool(
+                    name="get_output_page",
+                    description="Read a page of a large tool output stored by handle (outputs above the size threshold are returned as a head/tail summary with a handle)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "handle": {
+                                "type": "string",
+                                "description": "Output handle given in the truncated result"
+                            },
+                            "page": {
+                                "type": "integer",
+                                "description": "Page number, starting at 0",
+                                "default": 0
+                            },
+                            "page_size": {
+                                "type": "integer",
+                                "description": "Page size in bytes (max 1 MiB)",
+                                "default": 65536
+                            }
+                        },
+                        "required": ["handle"]
+                    }
+                ),
+                types.Tool(
+                    name="diagnose_all",
+                    description="Run diagnostics on all clients in parallel and summarize the fleet health",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "format": {
+                                "type": "string",
+                                "description": "Output format",
+                                "enum": ["text", "json"],
+                                "default": "text"
+                            },
+                            "concurrency": {
+                                "type": "integer",
+                                "description": "Number of clients diagnosed concurrently",
+                                "default": 8
+                            },
+                            "verbose": {
+                                "type": "boolean",
+                                "description": "Include check details",
+                                "default": False
+                            }
+                        }
+                    }
+                ),
                 types.Tool(
                     name="delete_client",
                     description="Delete a client repository (REQUIRES USER CONFIRMATION)",
@@ -606,13 +888,111 @@ class OdooClientMCPServer:
                         },
                         "required": ["token", "organization"]
                     }
+                ),
+                types.Tool(
+                    name="find_oca_addon",
+                    description="Find which OCA repository contains an addon (from the local addon index)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "addon": {
+                                "type": "string",
+                                "description": "Technical name of the addon (e.g. 'base_tier_validation')"
+                            },
+                            "version": {
+                                "type": "string",
+                                "description": "Odoo version (all indexed versions if omitted)"
+                            }
+                        },
+                        "required": ["addon"]
+                    }
+                ),
+                types.Tool(
+                    name="search_oca_addons",
+                    description="Search OCA addons by technical name or summary in the local addon index",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "Text to search in addon names and summaries"
+                            },
+                            "version": {
+                                "type": "string",
+                                "description": "Odoo version (all indexed versions if omitted)"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of results",
+                                "default": 20
+                            }
+                        },
+                        "required": ["query"]
+                    }
+                ),
+                types.Tool(
+                    name="update_oca_addon_index",
+                    description="Update the local OCA addon index from cached git trees (only changed commits are re-indexed)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "version": {
+                                "type": "string",
+                                "description": "Odoo version to index (all versions if omitted)"
+                            },
+                            "repositories": {
+                                "type": "string",
+                                "description": "Comma-separated list of repositories (all if omitted)"
+                            },
+                            "fetch": {
+                                "type": "boolean",
+                                "description": "Fetch the repositories from GitHub into the local git cache first",
+                                "default": False
+                            }
+                        },
+                        "required": []
+                    }
+                ),
+                types.Tool(
+                    name="resolve_dependencies",
+                    description="Resolve the transitive OCA dependencies of addons: minimal repositories to add and modules to link (optionally applied to the client)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "client": {
+                                "type": "string",
+                                "description": "Client name (existing repositories and links are taken into account)"
+                            },
+                            "modules": {
+                                "type": "string",
+                                "description": "Comma-separated list of target addons"
+                            },
+                            "version": {
+                                "type": "string",
+                                "description": "Odoo version (detected from the client if omitted)"
+                            },
+                            "apply": {
+                                "type": "boolean",
+                                "description": "Add the repositories and link the modules in one batched operation",
+                                "default": False
+                            },
+                            "force": {
+                                "type": "boolean",
+                                "description": "Apply the plan even if it has dependency cycles or unresolved dependencies",
+                                "default": False
+                            }
+                        },
+                        "required": ["client", "modules"]
+                    }
                 )
             ]
         
         @self.server.call_tool()
         async def handle_call_tool(name: str, arguments: dict):
             """Handle tool calls"""
-            
+            return await self._execute_tool(name, arguments, lambda: dispatch_tool(name, arguments))
+        
+        async def dispatch_tool(name: str, arguments: dict):
             if name == "create_client":
                 return await self._create_client(
                     arguments.get("name"),
@@ -634,13 +1014,14 @@ class OdooClientMCPServer:
             elif name == "list_clients":
                 return await self._list_clients()
             elif name == "update_client":
-                return await self._update_client(arguments.get("client"))
+                return await self._update_client(arguments.get("client"), arguments.get("jobs", 8))
             elif name == "add_module":
                 return await self._add_module(
                     arguments.get("client"), 
                     arguments.get("module"),
                     arguments.get("link_all", False),
-                    arguments.get("link_modules", "")
+                    arguments.get("link_modules", ""),
+                    arguments.get("with_dependencies", False)
                 )
             elif name == "link_modules":
                 return await self._link_modules(
@@ -649,10 +1030,17 @@ class OdooClientMCPServer:
                     arguments.get("link_all", False),
                     arguments.get("modules", "")
                 )
+            elif name == "sparse_checkout":
+                return await self._sparse_checkout(arguments.get("client"), arguments.get("action", "status"))
             elif name == "list_modules":
                 return await self._list_modules(arguments.get("client"))
             elif name == "list_oca_modules":
-                return await self._list_oca_modules(arguments.get("pattern", ""))
+                return await self._list_oca_modules(
+                    arguments.get("pattern", ""),
+                    arguments.get("limit", 50),
+                    arguments.get("type"),
+                    arguments.get("version")
+                )
             elif name == "client_status":
                 return await self._client_status()
             elif name == "check_client":
@@ -663,6 +1051,25 @@ class OdooClientMCPServer:
                     arguments.get("format", "text"),
                     arguments.get("verbose", False)
                 )
+            elif name == "diagnose_all":
+                return await self._diagnose_all(
+                    arguments.get("format", "text"),
+                    arguments.get("concurrency", 8),
+                    arguments.get("verbose", False)
+                )
+            elif name == "get_output_page":
+                return await self._get_output_page(
+                    arguments.get("handle"),
+                    arguments.get("page", 0),
+                    arguments.get("page_size", 65536)
+                )
+            elif name == "profile_server":
+                return await self._profile_server(
+                    arguments.get("duration", 10),
+                    arguments.get("mode", "sample"),
+                    arguments.get("loop_only", False),
+                    arguments.get("limit", 100)
+                )
             elif name == "update_requirements":
                 return await self._update_requirements(
                     arguments.get("client"),
@@ -671,7 +1078,8 @@ class OdooClientMCPServer:
             elif name == "update_oca_repos":
                 return await self._update_oca_repos(
                     arguments.get("language", "fr"),
-                    arguments.get("fast", False)
+                    arguments.get("fast", False),
+                    arguments.get("incremental", False)
                 )
             elif name == "build_docker_image":
                 return await self._build_docker_image(
@@ -679,7 +1087,19 @@ class OdooClientMCPServer:
                     arguments.get("tag", "")
                 )
             elif name == "backup_client":
-                return await self._backup_client(arguments.get("client"))
+                return await self._backup_client(arguments.get("client"), arguments.get("include_database", False))
+            elif name == "restore_client_database":
+                return await self._restore_client_database(
+                    arguments.get("client"),
+                    arguments.get("backup_id"),
+                    arguments.get("database"),
+                    arguments.get("jobs", 4),
+                    arguments.get("drop", False)
+                )
+            elif name == "list_backups":
+                return await self._list_backups(arguments.get("client"))
+            elif name == "prune_backups":
+                return await self._prune_backups(arguments.get("client"), arguments.get("keep", 7))
             elif name == "delete_client":
                 return await self._delete_client(
                     arguments.get("client"),
@@ -722,6 +1142,31 @@ class OdooClientMCPServer:
                     arguments.get("token"),
                     arguments.get("organization")
                 )
+            elif name == "find_oca_addon":
+                return await self._find_oca_addon(
+                    arguments.get("addon"),
+                    arguments.get("version")
+                )
+            elif name == "search_oca_addons":
+                return await self._search_oca_addons(
+                    arguments.get("query"),
+                    arguments.get("version"),
+                    arguments.get("limit", 20)
+                )
+            elif name == "update_oca_addon_index":
+                return await self._update_oca_addon_index(
+                    arguments.get("version"),
+                    arguments.get("repositories", ""),
+                    arguments.get("fetch", False)
+                )
+            elif name == "resolve_dependencies":
+                return await self._resolve_dependencies(
+                    arguments.get("client"),
+                    arguments.get("modules", ""),
+                    arguments.get("version"),
+                    arguments.get("apply", False),
+                    arguments.get("force", False)
+                )
             else:
                 raise ValueError(f"Unknown tool: {name}")
         
@@ -747,13 +1192,14 @@ class OdooClientMCPServer:
         elif name == "list_clients":
             return await self._list_clients()
         elif name == "update_client":
-            return await self._update_client(arguments.get("client"))
+            return await self._update_client(arguments.get("client"), arguments.get("jobs", 8))
         elif name == "add_module":
             return await self._add_module(
                 arguments.get("client"), 
                 arguments.get("module"),
                 arguments.get("link_all", False),
-                arguments.get("link_modules", "")
+                arguments.get("link_modules", ""),
+                arguments.get("with_dependencies", False)
             )
         elif name == "link_modules":
             return await self._link_modules(
@@ -762,10 +1208,17 @@ class OdooClientMCPServer:
                 arguments.get("link_all", False),
                 arguments.get("modules", "")
             )
+        elif name == "sparse_checkout":
+            return await self._sparse_checkout(arguments.get("client"), arguments.get("action", "status"))
         elif name == "list_modules":
             return await self._list_modules(arguments.get("client"))
         elif name == "list_oca_modules":
-            return await self._list_oca_modules(arguments.get("pattern", ""))
+            return await self._list_oca_modules(
+                arguments.get("pattern", ""),
+                arguments.get("limit", 50),
+                arguments.get("type"),
+                arguments.get("version")
+            )
         elif name == "client_status":
             return await self._client_status()
         elif name == "check_client":
@@ -776,6 +1229,25 @@ class OdooClientMCPServer:
                 arguments.get("format", "text"),
                 arguments.get("verbose", False)
             )
+        elif name == "diagnose_all":
+            return await self._diagnose_all(
+                arguments.get("format", "text"),
+                arguments.get("concurrency", 8),
+                arguments.get("verbose", False)
+            )
+        elif name == "get_output_page":
+            return await self._get_output_page(
+                arguments.get("handle"),
+                arguments.get("page", 0),
+                arguments.get("page_size", 65536)
+            )
+        elif name == "profile_server":
+            return await self._profile_server(
+                arguments.get("duration", 10),
+                arguments.get("mode", "sample"),
+                arguments.get("loop_only", False),
+                arguments.get("limit", 100)
+            )
         elif name == "update_requirements":
             return await self._update_requirements(
                 arguments.get("client"),
@@ -784,7 +1256,8 @@ class OdooClientMCPServer:
         elif name == "update_oca_repos":
             return await self._update_oca_repos(
                 arguments.get("language", "fr"),
-                arguments.get("fast", False)
+                arguments.get("fast", False),
+                arguments.get("incremental", False)
             )
         elif name == "build_docker_image":
             return await self._build_docker_image(
@@ -792,7 +1265,19 @@ class OdooClientMCPServer:
                 arguments.get("tag", "")
             )
         elif name == "backup_client":
-            return await self._backup_client(arguments.get("client"))
+            return await self._backup_client(arguments.get("client"), arguments.get("include_database", False))
+        elif name == "restore_client_database":
+            return await self._restore_client_database(
+                arguments.get("client"),
+                arguments.get("backup_id"),
+                arguments.get("database"),
+                arguments.get("jobs", 4),
+                arguments.get("drop", False)
+            )
+        elif name == "list_backups":
+            return await self._list_backups(arguments.get("client"))
+        elif name == "prune_backups":
+            return await self._prune_backups(arguments.get("client"), arguments.get("keep", 7))
         elif name == "delete_client":
             return await self._delete_client(
                 arguments.get("client"),
@@ -835,6 +1320,31 @@ class OdooClientMCPServer:
                 arguments.get("token"),
                 arguments.get("organization")
             )
+        elif name == "find_oca_addon":
+            return await self._find_oca_addon(
+                arguments.get("addon"),
+                arguments.get("version")
+            )
+        elif name == "search_oca_addons":
+            return await self._search_oca_addons(
+                arguments.get("query"),
+                arguments.get("version"),
+                arguments.get("limit", 20)
+            )
+        elif name == "update_oca_addon_index":
+            return await self._update_oca_addon_index(
+                arguments.get("version"),
+                arguments.get("repositories", ""),
+                arguments.get("fetch", False)
+            )
+        elif name == "resolve_dependencies":
+            return await self._resolve_dependencies(
+                arguments.get("client"),
+                arguments.get("modules", ""),
+                arguments.get("version"),
+                arguments.get("apply", False),
+                arguments.get("force", False)
+            )
         else:
             raise ValueError(f"Unknown tool: {name}")
     
@@ -941,22 +1451,31 @@ class OdooClientMCPServer:
             text=result["stdout"] if result["success"] else f"Error: {result['stderr']}"
         )]
     
-    async def _update_client(self, client: str):
-        """Update submodules for a specific client"""
-        result = self._run_command(["make", "update-client", f"CLIENT={client}"])
-        
-        if result["success"]:
+    async def _update_client(self, client: str, jobs: int = 8):
+        """Update submodules for a specific client, fetching them concurrently"""
+        client_dir = self.repo_path / "clients" / client
+        if not (client_dir / ".git").exists():
             return [types.TextContent(
                 type="text",
-                text=f"✅ Client '{client}' updated successfully\n\n{result['stdout']}"
+                text=f"❌ Client '{client}' not found or not a git repository"
             )]
+        
+        import parallel_submodule_update
+        
+        report = await asyncio.to_thread(parallel_submodule_update.update_client, client_dir, int(jobs or 8))
+        failed = report["summary"].get("failed", 0)
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(report["summary"].items()))
+        if failed:
+            status = f"❌ Failed to update {failed} submodule(s) for client '{client}' ({summary})"
         else:
-            return [types.TextContent(
-                type="text",
-                text=f"❌ Failed to update client '{client}'\n\nError: {result['stderr']}"
-            )]
+            status = f"✅ Client '{client}' updated successfully ({summary}, {report['duration']}s)"
+        
+        return [types.TextContent(
+            type="text",
+            text=f"{status}\n\n{json.dumps(report, indent=2, ensure_ascii=False)}"
+        )]
     
-    async def _add_module(self, client: str, module: str, link_all: bool = False, link_modules: str = ""):
+    async def _add_module(self, client: str, module: str, link_all: bool = False, link_modules: str = "", with_dependencies: bool = False):
         """Add an OCA module to a client"""
         # Build command with linking options
         cmd = [str(self.repo_path / "scripts" / "add_oca_module.sh"), client, module]
@@ -985,9 +1504,20 @@ class OdooClientMCPServer:
                 except Exception:
                     pass  # If we can't check, just continue with success message
                     
+            text = f"✅ Module '{module}' added to client '{client}'\n\n{result['stdout']}"
+            if with_dependencies and link_all:
+                # --all links every addon of the repository: resolve over all of them
+                repository_dir = self.repo_path / "clients" / client / "addons" / module
+                link_modules = ",".join(sorted(
+                    p.name for p in repository_dir.iterdir() if (p / "__manifest__.py").exists()
+                )) if repository_dir.is_dir() else ""
+            if with_dependencies and link_modules:
+                dependencies = await self._resolve_dependencies(client, link_modules, apply=True)
+                text += f"\n\n🔗 Dependencies:\n{dependencies[0].text}"
+            
             return [types.TextContent(
                 type="text",
-                text=f"✅ Module '{module}' added to client '{client}'\n\n{result['stdout']}"
+                text=text
             )]
         else:
             # Check if the module already exists (can be in stdout or stderr)
@@ -1041,6 +1571,16 @@ class OdooClientMCPServer:
         if not extra_addons_path.exists():
             extra_addons_path.mkdir(exist_ok=True)
         
+        # Sparse clients: check out the requested addons (and their dependencies) before linking
+        import client_sparse_checkout
+        
+        if client_sparse_checkout.is_enabled(client_path):
+            if link_all:
+                include = {repository: client_sparse_checkout.ALL}
+            else:
+                include = {repository: [m.strip() for m in (modules or "").split(",") if m.strip()]}
+            await asyncio.to_thread(client_sparse_checkout.apply, client_path, include)
+        
         # Get list of modules to link
         modules_to_link = []
         if link_all:
@@ -1103,6 +1643,41 @@ class OdooClientMCPServer:
             text="\n".join(result_parts)
         )]
     
+    async def _sparse_checkout(self, client: str, action: str = "status"):
+        """Enable, disable, re-apply or inspect the sparse checkout of a client's submodules"""
+        client_dir = self.repo_path / "clients" / client
+        if not (client_dir / ".git").exists():
+            return [types.TextContent(
+                type="text",
+                text=f"❌ Client '{client}' not found or not a git repository"
+            )]
+        
+        import client_sparse_checkout
+        
+        actions = {
+            "enable": client_sparse_checkout.enable,
+            "disable": client_sparse_checkout.disable,
+            "apply": client_sparse_checkout.apply,
+            "status": client_sparse_checkout.status,
+        }
+        if action not in actions:
+            return [types.TextContent(
+                type="text",
+                text=f"❌ Unknown action '{action}' (expected one of: {', '.join(actions)})"
+            )]
+        
+        report = await asyncio.to_thread(actions[action], client_dir)
+        mode = "enabled" if report["enabled"] else "disabled"
+        if report.get("errors"):
+            status = f"⚠️ Sparse checkout {action} finished with {len(report['errors'])} error(s) for client '{client}'"
+        else:
+            status = f"✅ Sparse checkout {mode} for client '{client}'"
+        
+        return [types.TextContent(
+            type="text",
+            text=f"{status}\n\n{json.dumps(report, indent=2, ensure_ascii=False)}"
+        )]
+    
     async def _list_modules(self, client: str):
         """List available modules for a specific client"""
         result = self._run_command(["make", "list-modules", f"CLIENT={client}"])
@@ -1112,17 +1687,168 @@ class OdooClientMCPServer:
             text=result["stdout"] if result["success"] else f"Error: {result['stderr']}"
         )]
     
-    async def _list_oca_modules(self, pattern: str = ""):
-        """List all available OCA modules with optional filtering"""
-        cmd = ["make", "list-oca-modules"]
-        if pattern:
-            cmd.append(f"PATTERN={pattern}")
+    async def _list_oca_modules(self, pattern: str = "", limit: int = 50, kind: Optional[str] = None, version: Optional[str] = None):
+        """Search OCA repositories and addons with the in-memory search engine"""
+        if self._oca_search is None:
+            from oca_search import OcaSearchEngine
+            self._oca_search = OcaSearchEngine(self.repo_path / "config")
+            self.metrics.register_cache(
+                "oca_search", lambda: (self._oca_search.cache_hits, self._oca_search.cache_misses)
+            )
         
-        result = self._run_command(cmd)
+        try:
+            results = self._oca_search.search(pattern or "", int(limit), kind or None, version or None)
+        except Exception as e:
+            return [types.TextContent(
+                type="text",
+                text=f"Error: {str(e)}"
+            )]
         
         return [types.TextContent(
             type="text",
-            text=result["stdout"] if result["success"] else f"Error: {result['stderr']}"
+            text=json.dumps({
+                "pattern": pattern,
+                "count": len(results),
+                "results": results
+            }, indent=2, ensure_ascii=False)
+        )]
+    
+    async def _find_oca_addon(self, addon: str, version: Optional[str] = None):
+        """Find which OCA repositories contain an addon"""
+        if not addon:
+            return [types.TextContent(
+                type="text",
+                text="❌ Addon name is required"
+            )]
+        
+        from oca_addon_index import AddonIndex
+        
+        index = AddonIndex()
+        try:
+            matches = index.find(addon, version or None)
+        finally:
+            index.close()
+        
+        if not matches:
+            return [types.TextContent(
+                type="text",
+                text=f"❌ Addon '{addon}' not found in the local index" +
+                     (f" for Odoo {version}" if version else "") +
+                     "\n\nUpdate the index with `update_oca_addon_index(fetch=True)`"
+            )]
+        
+        return [types.TextContent(
+            type="text",
+            text=json.dumps({"addon": addon, "matches": matches}, indent=2, ensure_ascii=False)
+        )]
+    
+    async def _search_oca_addons(self, query: str, version: Optional[str] = None, limit: int = 20):
+        """Search OCA addons in the local index"""
+        if not query:
+            return [types.TextContent(
+                type="text",
+                text="❌ Search query is required"
+            )]
+        
+        from oca_addon_index import AddonIndex
+        
+        index = AddonIndex()
+        try:
+            results = index.search(query, version or None, int(limit))
+        finally:
+            index.close()
+        
+        return [types.TextContent(
+            type="text",
+            text=json.dumps({"query": query, "count": len(results), "results": results}, indent=2, ensure_ascii=False)
+        )]
+    
+    async def _update_oca_addon_index(self, version: Optional[str] = None, repositories: str = "", fetch: bool = False):
+        """Update the local OCA addon index from cached git trees"""
+        import oca_addon_index
+        
+        versions = [version] if version else None
+        repos = [r.strip() for r in repositories.split(",") if r.strip()] if repositories else None
+        
+        def run_update():
+            fetch_report = None
+            if fetch:
+                fetch_report = oca_addon_index.fetch_repositories(repos, versions)
+            index = oca_addon_index.AddonIndex()
+            try:
+                report = oca_addon_index.update_index(index, versions, repos)
+                report["stats"] = index.stats()
+            finally:
+                index.close()
+            if fetch_report is not None:
+                report["fetch"] = fetch_report
+            return report
+        
+        try:
+            report = await asyncio.to_thread(run_update)
+        except Exception as e:
+            return [types.TextContent(
+                type="text",
+                text=f"❌ Failed to update the OCA addon index\n\nError: {str(e)}"
+            )]
+        
+        return [types.TextContent(
+            type="text",
+            text=f"✅ OCA addon index updated: {len(report['indexed'])} trees indexed, {report['unchanged']} unchanged\n\n" +
+                 json.dumps(report, indent=2, ensure_ascii=False)
+        )]
+    
+    async def _resolve_dependencies(self, client: str, modules: str, version: Optional[str] = None,
+                                    apply: bool = False, force: bool = False):
+        """Resolve transitive OCA dependencies and optionally apply the plan
+
+        A plan with dependency cycles or unresolved dependencies is only applied with `force`.
+        """
+        targets = [m.strip() for m in (modules or "").split(",") if m.strip()]
+        if not client or not targets:
+            return [types.TextContent(
+                type="text",
+                text="❌ Client and at least one module are required"
+            )]
+        
+        import oca_dependency_resolver
+        
+        def run_resolution():
+            plan = oca_dependency_resolver.resolve_for_client(client, targets, version or None)
+            if apply and (force or not (plan["cycles"] or plan["unresolved"])):
+                plan["applied"] = oca_dependency_resolver.apply_plan(plan)
+            return plan
+        
+        try:
+            plan = await asyncio.to_thread(run_resolution)
+        except oca_dependency_resolver.ResolutionError as e:
+            return [types.TextContent(
+                type="text",
+                text=f"❌ {str(e)}"
+            )]
+        
+        warnings = []
+        if plan["cycles"]:
+            warnings.append("⚠️ Dependency cycles detected: " + "; ".join(" -> ".join(c) for c in plan["cycles"]))
+        if plan["unresolved"]:
+            warnings.append("⚠️ Dependencies not found in OCA nor Odoo core: " + ", ".join(plan["unresolved"]))
+        
+        if apply and "applied" not in plan:
+            status = f"❌ Plan not applied for client '{client}' (use force=true to apply it anyway)"
+        elif apply and plan["applied"]["errors"]:
+            status = (f"❌ Plan partially applied for client '{client}': "
+                      + "; ".join(plan["applied"]["errors"]))
+        elif apply:
+            status = (f"✅ Plan applied for client '{client}': {len(plan['applied']['added'])} repositories added, "
+                      f"{len(plan['applied']['linked'])} modules linked")
+        else:
+            status = (f"✅ {len(plan['addons'])} OCA addons required: {len(plan['repositories_to_add'])} repositories to add, "
+                      f"{len(plan['modules_to_link'])} modules to link")
+        status = "\n".join(warnings + [status])
+        
+        return [types.TextContent(
+            type="text",
+            text=f"{status}\n\n{json.dumps(plan, indent=2, ensure_ascii=False)}"
         )]
     
     async def _client_status(self):
@@ -1162,9 +1888,13 @@ class OdooClientMCPServer:
                 text=f"❌ Failed to update requirements for client '{client}'\n\nError: {result['stderr']}"
             )]
     
-    async def _update_oca_repos(self, language: str = "fr", fast: bool = False):
+    async def _update_oca_repos(self, language: str = "fr", fast: bool = False, incremental: bool = False):
         """Update OCA repository list from GitHub"""
-        if fast:
+        if incremental:
+            cmd = [str(self.repo_path / "scripts" / "update_oca_repositories.sh"), "--incremental", "--lang", language]
+            if fast:
+                cmd.append("--no-verify")
+        elif fast:
             cmd = ["make", "update-oca-repos-fast"]
         elif language == "en":
             cmd = ["make", "update-oca-repos-en"]
@@ -1205,20 +1935,109 @@ class OdooClientMCPServer:
                 text=f"❌ Failed to build Docker image\n\nError: {result['stderr']}"
             )]
     
-    async def _backup_client(self, client: str):
-        """Create a backup of a client"""
-        result = self._run_command(["make", "backup-client", f"CLIENT={client}"])
+    async def _backup_client(self, client: str, include_database: bool = False):
+        """Create an incremental, content-addressed backup of a client (and optionally of its databases)"""
+        import client_backup
+        import client_db_backup
+        
+        # Files and databases are captured concurrently
+        jobs = [asyncio.to_thread(client_backup.snapshot, client)]
+        if include_database:
+            jobs.append(asyncio.to_thread(client_db_backup.backup, client))
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        for result in results:
+            if isinstance(result, (client_backup.BackupError, OSError)):
+                return [types.TextContent(
+                    type="text",
+                    text=f"❌ Failed to backup client '{client}'\n\nError: {result}"
+                )]
+            if isinstance(result, BaseException):
+                raise result
+        
+        manifest = results[0]
+        stats = manifest["stats"]
+        summary = {key: manifest[key] for key in ("id", "client", "created_at", "parent", "compression", "stats")}
+        summary["submodules"] = {s["path"]: s["commit"] for s in manifest["submodules"]}
+        status = (f"✅ Client '{client}' backed up successfully (snapshot {manifest['id']}, "
+                  f"{stats['reused_files']}/{stats['files']} files unchanged, {stats['stored_bytes']} bytes added)")
+        if include_database:
+            summary["database_backup"] = results[1]
+            status += f"\n✅ {len(results[1]['databases'])} database(s) dumped ({results[1]['stored_bytes']} bytes, {results[1]['duration']}s)"
+        return [types.TextContent(
+            type="text",
+            text=f"{status}\n\n{json.dumps(summary, indent=2, ensure_ascii=False)}"
+        )]
+    
+    async def _restore_client_database(self, client: str, backup_id: Optional[str] = None, database: Optional[str] = None,
+                                       jobs: int = 4, drop: bool = False):
+        """Restore the databases and filestore of a client from a streamed database backup"""
+        import client_db_backup
         
-        if result["success"]:
+        try:
+            report = await asyncio.to_thread(
+                client_db_backup.restore, client, backup_id or None, [database] if database else None, int(jobs or 4), drop
+            )
+        except client_db_backup.BackupError as e:
             return [types.TextContent(
                 type="text",
-                text=f"✅ Client '{client}' backed up successfully\n\n{result['stdout']}"
+                text=f"❌ Failed to restore databases of client '{client}'\n\nError: {e}"
             )]
+        
+        failed = [entry for entry in report["databases"] if entry["status"] == "failed"]
+        if failed:
+            status = f"❌ Failed to restore {len(failed)} database(s) of client '{client}'"
         else:
+            status = f"✅ Restored {len(report['databases'])} database(s) of client '{client}' from backup {report['backup']}"
+        return [types.TextContent(
+            type="text",
+            text=f"{status}\n\n{json.dumps(report, indent=2, ensure_ascii=False)}"
+        )]
+    
+    async def _list_backups(self, client: Optional[str] = None):
+        """List the backups of a client (or of all clients)"""
+        import client_backup
+        import client_db_backup
+        
+        snapshots = await asyncio.to_thread(client_backup.list_snapshots, client or None)
+        databases = await asyncio.to_thread(client_db_backup.list_backups, client) if client else []
+        if not snapshots and not databases:
             return [types.TextContent(
                 type="text",
-                text=f"❌ Failed to backup client '{client}'\n\nError: {result['stderr']}"
+                text=f"No backup found{f' for client {client!r}' if client else ''}"
             )]
+        backups = {"snapshots": snapshots}
+        if client:
+            backups["database_backups"] = [
+                {
+                    "id": entry["id"],
+                    "created_at": entry["created_at"],
+                    "databases": [d["database"] for d in entry["databases"]],
+                    "stored_bytes": entry["stored_bytes"],
+                    "duration": entry["duration"],
+                }
+                for entry in databases
+            ]
+        return [types.TextContent(
+            type="text",
+            text=f"✅ {len(snapshots)} backup(s), {len(databases)} database backup(s)\n\n"
+                 f"{json.dumps(backups, indent=2, ensure_ascii=False)}"
+        )]
+    
+    async def _prune_backups(self, client: str, keep: int = 7):
+        """Keep only the most recent backups of a client and free unreferenced chunks"""
+        import client_backup
+        import client_db_backup
+        
+        keep = max(1, int(keep))
+        report = await asyncio.to_thread(client_backup.prune, client, keep)
+        report["database_backups"] = await asyncio.to_thread(client_db_backup.prune, client, keep)
+        return [types.TextContent(
+            type="text",
+            text=f"✅ Removed {len(report['removed'])} backup(s) and {len(report['database_backups']['removed'])} "
+                 f"database backup(s) of client '{client}', freed {report['freed_chunks']} chunk(s) "
+                 f"({report['freed_bytes'] + report['database_backups']['freed_bytes']} bytes)\n\n"
+                 f"{json.dumps(report, indent=2, ensure_ascii=False)}"
+        )]
     
     async def _delete_client(self, client: str, confirmed: bool = False):
         """Delete a client repository with confirmation"""
@@ -1301,83 +2120,113 @@ class OdooClientMCPServer:
                 )]
 
     async def _diagnose_client(self, client: str, format: str = "text", verbose: bool = False):
-        """Run comprehensive diagnostics on a client"""
+        """Run comprehensive diagnostics on a client (checks run concurrently)"""
         if not client:
             return [types.TextContent(
                 type="text",
                 text="❌ Client name is required"
             )]
-        
-        # Build command arguments
-        cmd = [str(self.repo_path / "scripts" / "diagnose_client.sh"), client]
-        
+
+        from diagnostics import DiagnosticsEngine, format_report
+
+        report = await DiagnosticsEngine(self.repo_path, metrics=self.metrics).diagnose(client)
         if format == "json":
-            cmd.extend(["--format", "json"])
-        
-        if verbose:
-            cmd.append("--verbose")
-        
-        result = self._run_command(cmd)
-        
-        if result['success']:
-            if format == "json":
-                # For JSON output, parse and format nicely
-                import json
-                try:
-                    json_data = json.loads(result['stdout'])
-                    formatted_json = json.dumps(json_data, indent=2, ensure_ascii=False)
-                    return [types.TextContent(
-                        type="text",
-                        text=f"🔍 Diagnostic Results for Client '{client}':\n\n```json\n{formatted_json}\n```"
-                    )]
-                except json.JSONDecodeError:
-                    # Fallback to raw output if JSON parsing fails
-                    return [types.TextContent(
-                        type="text",
-                        text=f"🔍 Diagnostic Results for Client '{client}':\n\n{result['stdout']}"
-                    )]
-            else:
-                # Text format
-                return [types.TextContent(
-                    type="text",
-                    text=f"🔍 Diagnostic Results for Client '{client}':\n\n{result['stdout']}"
-                )]
+            text = f"```json\n{json.dumps(report, indent=2, ensure_ascii=False)}\n```"
         else:
-            error_msg = result.get('stderr', 'Unknown error occurred')
-            return_code = result.get('return_code', -1)
-            
-            # Interpret return codes
-            status_messages = {
-                0: "✅ All systems operational",
-                1: "⚠️ Some warnings detected",
-                2: "❌ Significant errors found", 
-                3: "🚨 Critical issues detected"
-            }
-            
-            status_text = status_messages.get(return_code, f"❌ Unknown status (code: {return_code})")
-            
-            return [types.TextContent(
-                type="text",
-                text=f"🔍 Diagnostic completed with status: {status_text}\n\n" +
-                     f"Client: {client}\n" +
-                     f"Format: {format}\n" +
-                     f"Verbose: {verbose}\n\n" +
-                     f"Output:\n{result.get('stdout', 'No output')}\n\n" +
-                     f"Issues:\n{error_msg}\n\n" +
-                     f"💡 For more details, run the diagnostic with --verbose flag or check the client manually:\n" +
-                     f"```bash\n" +
-                     f"cd clients/{client}\n" +
-                     f"docker compose ps\n" +
-                     f"docker compose logs\n" +
-                     f"```"
-            )]
+            text = format_report(report, verbose)
+        return [types.TextContent(
+            type="text",
+            text=f"🔍 Diagnostic Results for Client '{client}':\n\n{text}"
+        )]
+
+    async def _diagnose_all(self, format: str = "text", concurrency: int = 8, verbose: bool = False):
+        """Diagnose every client in parallel"""
+        from diagnostics import DiagnosticsEngine, format_fleet_report
+
+        fleet = await DiagnosticsEngine(self.repo_path, metrics=self.metrics).diagnose_all(concurrency=concurrency)
+        if format == "json":
+            text = f"```json\n{json.dumps(fleet, indent=2, ensure_ascii=False)}\n```"
+        else:
+            text = format_fleet_report(fleet, verbose)
+        return [types.TextContent(type="text", text=f"🔍 Fleet diagnostics:\n\n{text}")]
+
+    async def _profile_server(self, duration: float = 10, mode: str = "sample", loop_only: bool = False, limit: int = 100):
+        """Time-boxed profile of the running server"""
+        import profiling
+
+        try:
+            result = await profiling.profile(duration, mode, loop_only=loop_only, limit=limit)
+        except (profiling.ProfilerBusyError, ValueError) as e:
+            return [types.TextContent(type="text", text=f"❌ {e}")]
+
+        lag = self.loop_monitor.stats()
+        text = (
+            f"✅ Profile ({result['mode']}) completed in {result['duration']}s\n"
+            f"Event loop lag: last {lag['last_lag'] * 1000:.1f} ms, max {lag['max_lag'] * 1000:.1f} ms, "
+            f"{lag['stalls']} stall(s) over {lag['threshold'] * 1000:.0f} ms\n\n"
+        )
+        if mode == "cprofile":
+            text += f"```\n{result['output']}\n```"
+        else:
+            text += f"{result['samples']} samples, collapsed stacks (flamegraph.pl / speedscope):\n\n```\n{result['collapsed']}\n```"
+        for stall in lag["recent_stalls"][-3:]:
+            text += f"\n\n⚠️ Loop blocked {stall['blocked_for'] * 1000:.0f} ms in:\n" + "\n".join(stall["stack"][-10:])
+        return [types.TextContent(type="text", text=text)]
+
+    async def _get_output_page(self, handle: str, page: int = 0, page_size: int = 65536):
+        """Page of an output stored by the output store"""
+        from output_store import OutputNotFoundError
+
+        try:
+            result = self.output_store.page(handle, int(page), page_size)
+        except OutputNotFoundError:
+            return [types.TextContent(type="text", text=f"❌ Unknown or expired output handle '{handle}'")]
+        except ValueError as e:
+            return [types.TextContent(type="text", text=f"❌ {e}")]
+
+        header = (
+            f"📄 Output {handle} — page {result['page'] + 1}/{result['pages']} "
+            f"(bytes {result['start']}-{result['end']} of {result['size']})"
+        )
+        return [types.TextContent(type="text", text=f"{header}\n\n{result['content']}")]
+
+    def _check_admin_token(self, token: Optional[str]):
+        """Admin endpoints require MCP_ADMIN_TOKEN in X-Admin-Token when the variable is set"""
+        expected = os.environ.get("MCP_ADMIN_TOKEN")
+        if expected and token != expected:
+            raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    @staticmethod
+    def _is_failure(result) -> bool:
+        """Tools report most errors as text starting with ❌ rather than raising"""
+        return bool(result) and getattr(result[0], "text", "").lstrip().startswith("❌")
+
+    async def _render_metrics(self, max_age: float = 10.0) -> str:
+        """Render the metrics registry with per-client container gauges"""
+        from diagnostics import DiagnosticsEngine
+
+        engine = DiagnosticsEngine(self.repo_path, timeout=5.0, metrics=self.metrics)
+        checked_at, states = self._container_states
+        if states is None or time.monotonic() - checked_at > max_age:
+            try:
+                states = await engine.container_states()
+            except (asyncio.TimeoutError, RuntimeError) as e:
+                logger.warning(f"Cannot read container states for metrics: {e}")
+                states = None
+            self._container_states = (time.monotonic(), states)
+
+        extra = [("mcp_docker_up", "gauge", "Whether the Docker daemon answered the last container listing",
+                  [("", {}, 0 if states is None else 1)])]
+        if states is not None:
+            extra += container_families(states, engine.list_clients())
+        return self.metrics.render(extra)
 
     def _setup_http_app(self):
         """Setup FastAPI HTTP server"""
         if not FastAPI:
             return
             
-        self.http_app = FastAPI(
+        self._http_app = FastAPI(
             title="Odoo Client MCP Server",
             description="HTTP API for Odoo Client Repository Generator",
             version="1.0.0"
@@ -1391,6 +2240,8 @@ class OdooClientMCPServer:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+        # Compress large responses (tool results, /metrics, client lists) for clients sending Accept-Encoding: gzip
+        self.http_app.add_middleware(GZipMiddleware, minimum_size=1024)
         
         @self.http_app.get("/")
         async def root():
@@ -1404,11 +2255,16 @@ class OdooClientMCPServer:
             return [{"name": tool.name, "description": tool.description, "inputSchema": tool.inputSchema} for tool in tools]
         
         @self.http_app.post("/tools/call")
-        async def call_tool(request: ToolCallRequest):
+        async def call_tool(request: ToolCallRequest, x_admin_token: Optional[str] = Header(None)):
             """Call a tool with given arguments"""
+            if request.name in self.ADMIN_TOOLS:
+                self._check_admin_token(x_admin_token)
             try:
                 # Call the MCP tool handler directly
-                result = await self._handle_tool_call(request.name, request.arguments)
+                result = await self._execute_tool(
+                    request.name, request.arguments,
+                    lambda: self._handle_tool_call(request.name, request.arguments)
+                )
                 
                 # Convert MCP response to HTTP response
                 return ToolCallResponse(
@@ -1424,6 +2280,64 @@ class OdooClientMCPServer:
                     error=str(e)
                 )
         
+        @self.http_app.post("/tools/batch")
+        async def call_tools_batch(request: ToolBatchRequest, x_admin_token: Optional[str] = Header(None)):
+            """Call several tools in one request: independent calls run concurrently, results keyed by call id"""
+            from batch import BatchError, run_batch, validate_batch
+            
+            try:
+                calls = validate_batch([call.model_dump() for call in request.calls])
+            except BatchError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if any(call["name"] in self.ADMIN_TOOLS for call in calls):
+                self._check_admin_token(x_admin_token)
+            
+            results = run_batch(calls, self._call_tool_in_executor, request.concurrency)
+            if request.stream:
+                async def lines():
+                    async for result in results:
+                        yield json.dumps(result, ensure_ascii=False, default=str) + "\n"
+                # identity: GZip would buffer the stream instead of sending each result as it completes
+                return StreamingResponse(lines(), media_type="application/x-ndjson",
+                                         headers={"Content-Encoding": "identity"})
+            
+            started = time.perf_counter()
+            collected = {result["id"]: result async for result in results}
+            return {
+                "success": all(result["success"] for result in collected.values()),
+                "duration": round(time.perf_counter() - started, 4),
+                "results": {call["id"]: collected[call["id"]] for call in calls},
+            }
+        
+        @self.http_app.get("/outputs/{handle}")
+        async def get_output(handle: str, range_header: Optional[str] = Header(None, alias="Range")):
+            """Full output stored by handle, or the byte range of a `Range: bytes=start-end` header"""
+            from output_store import OutputNotFoundError, parse_range
+            
+            try:
+                size = self.output_store.info(handle)["size"]
+            except OutputNotFoundError:
+                raise HTTPException(status_code=404, detail=f"Unknown or expired output handle '{handle}'")
+            
+            headers = {"Accept-Ranges": "bytes"}
+            start, end, status_code = 0, size, 200
+            if range_header:
+                try:
+                    start, end = parse_range(range_header, size)
+                except ValueError:
+                    return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+                status_code = 206
+                # Ranges are byte offsets of the stored output: not compressed
+                headers.update({"Content-Range": f"bytes {start}-{end - 1}/{size}", "Content-Encoding": "identity"})
+            headers["Content-Length"] = str(end - start)
+            
+            def chunks():
+                for offset in range(start, end, 1024 ** 2):
+                    yield self.output_store.read_range(handle, offset, min(end, offset + 1024 ** 2))
+            
+            return StreamingResponse(chunks(), status_code=status_code, headers=headers,
+                                     media_type="text/plain; charset=utf-8")
+        
         @self.http_app.get("/clients")
         async def get_clients():
             """Get list of clients"""
@@ -1473,6 +2387,32 @@ class OdooClientMCPServer:
                 logger.error(f"Error checking client {client_name}: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
         
+        @self.http_app.get("/metrics")
+        async def metrics():
+            """Prometheus metrics (tools, subprocesses, caches, client containers)"""
+            return Response(content=await self._render_metrics(), media_type=METRICS_CONTENT_TYPE)
+        
+        @self.http_app.post("/admin/profile")
+        async def admin_profile(duration: float = 10, mode: str = "sample", loop_only: bool = False,
+                                limit: Optional[int] = None, x_admin_token: Optional[str] = Header(None)):
+            """Profile the running server; returns collapsed stacks (or pstats output) as text"""
+            import profiling
+            
+            self._check_admin_token(x_admin_token)
+            try:
+                result = await profiling.profile(duration, mode, loop_only=loop_only, limit=limit)
+            except profiling.ProfilerBusyError as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return Response(content=result.get("collapsed", result.get("output")) + "\n", media_type="text/plain")
+        
+        @self.http_app.get("/admin/loop-lag")
+        async def admin_loop_lag(x_admin_token: Optional[str] = Header(None)):
+            """Event loop lag and the stacks captured during recent stalls"""
+            self._check_admin_token(x_admin_token)
+            return self.loop_monitor.stats()
+        
         @self.http_app.get("/status")
         async def get_all_status():
             """Get status of all clients"""
@@ -1766,7 +2706,7 @@ class OdooClientMCPServer:
         # Vérifier l'état des conteneurs
         result = self._run_command([
             "docker", "compose", "ps", "--format", "json"
-        ], cwd=client_dir)
+        ], cwd=client_dir, spill=False)
         
         if result['success']:
             try:
@@ -1956,21 +2896,19 @@ class OdooClientMCPServer:
         """Test GitHub connection with provided credentials"""
         try:
             import requests
+            from github_client import GitHubClient
             
             # Test user authentication
-            headers = {
-                'Authorization': f'token {token}',
-                'Accept': 'application/vnd.github.v3+json'
-            }
+            github = GitHubClient(token=token or "")
             
-            response = requests.get('https://api.github.com/user', headers=headers, timeout=10)
+            response = github.get('/user', timeout=10)
             
             if response.status_code == 200:
                 user_data = response.json()
                 username = user_data.get('login', 'unknown')
                 
                 # Test organization access
-                org_response = requests.get(f'https://api.github.com/orgs/{organization}', headers=headers, timeout=10)
+                org_response = github.get(f'/orgs/{organization}', timeout=10)
                 
                 if org_response.status_code == 200:
                     return [types.TextContent(
@@ -2165,6 +3103,56 @@ class OdooClientMCPServer:
             )
         ]
 
+    async def _run_in_tool_executor(self, name: str, arguments: dict):
+        """Run a tool on a worker thread with its own event loop
+
+        Most tools block on subprocess.run; running them in the executor keeps concurrent
+        calls from serializing on the server loop.
+        """
+        if self._tool_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            workers = int(os.environ.get("MCP_TOOL_WORKERS", "8"))
+            self._tool_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-tool")
+        
+        return await asyncio.get_running_loop().run_in_executor(
+            self._tool_executor, lambda: asyncio.run(self._handle_tool_call(name, arguments))
+        )
+    
+    async def _execute_tool(self, name: str, arguments: dict, dispatch):
+        """Run a tool call with metrics; read-only tools run off the loop and are coalesced"""
+        with self.metrics.track_tool(name) as call:
+            if name in self.READ_ONLY_TOOLS:
+                result, shared = await self._single_flight.do(
+                    call_key(name, arguments), lambda: self._run_in_tool_executor(name, arguments)
+                )
+                if shared:
+                    self.metrics.record_coalesced(name)
+            else:
+                result = await dispatch()
+            call.failed = self._is_failure(result)
+        if name != "get_output_page":
+            result = self._spill_result(name, result)
+        return result
+    
+    def _spill_result(self, name: str, result):
+        """Replace texts above the output threshold by a summary with a handle to the full text"""
+        if not isinstance(result, list):
+            return result
+        spilled = []
+        for item in result:
+            text = getattr(item, "text", None)
+            if text is not None:
+                summary = self.output_store.spill_text(text, source=name)
+                if summary is not text:
+                    item = types.TextContent(type="text", text=summary)
+            spilled.append(item)
+        return spilled
+    
+    async def _call_tool_in_executor(self, name: str, arguments: dict):
+        """Executor of /tools/batch: returns (HTTP result, failed)"""
+        result = await self._execute_tool(name, arguments, lambda: self._run_in_tool_executor(name, arguments))
+        return self._mcp_to_http_response(result), self._is_failure(result)
+    
     def _mcp_to_http_response(self, mcp_result):
         """Convert MCP response to HTTP-friendly format"""
         if isinstance(mcp_result, list):
@@ -2202,6 +3190,7 @@ async def main():
     
     try:
         server = OdooClientMCPServer(args.repo_path)
+        server.loop_monitor.start()
         
         if args.mode == "stdio":
             logger.info("🔌 Starting MCP server with stdio...")
@@ -2214,7 +3203,7 @@ async def main():
                 )
         
         elif args.mode == "http":
-            if not FastAPI:
+            if not _load_http_dependencies():
                 logger.error("❌ FastAPI not available. Install with: pip install fastapi uvicorn")
                 sys.exit(1)
             
@@ -2229,7 +3218,7 @@ async def main():
             await http_server.serve()
         
         elif args.mode == "both":
-            if not FastAPI:
+            if not _load_http_dependencies():
                 logger.error("❌ FastAPI not available for HTTP mode. Install with: pip install fastapi uvicorn")
                 sys.exit(1)
             
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics for the MCP server
+
+A small dependency-free registry rendered in the Prometheus text exposition
+format (version 0.0.4) by the `/metrics` endpoint of the HTTP app.
+
+Counters and histograms are plain dict and list updates without locks: tool
+calls run on the event loop, and a rare lost increment from a worker thread
+is acceptable for monitoring. Gauges that are expensive to compute (container
+states, cache statistics) are produced by collectors called at scrape time
+only, so the hot path never pays for them.
+"""
+
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Tool latencies range from a cached lookup to a full client build
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Histogram:
+    """Fixed-bucket histogram; buckets are stored non-cumulative and summed at render time"""
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * (bucket_count + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+
+class ToolCall:
+    """Handle yielded by `Metrics.track_tool`; set `failed` when the tool reported an error"""
+
+    __slots__ = ("failed",)
+
+    def __init__(self):
+        self.failed = False
+
+
+class Metrics:
+    """Registry of the server metrics"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.started_at = time.time()
+        self.buckets = buckets
+        self.tool_calls: Dict[Tuple[str, str], int] = {}
+        self.tool_latency: Dict[str, Histogram] = {}
+        self.tool_in_flight: Dict[str, int] = {}
+        self.subprocesses: Dict[str, int] = {}
+        self.coalesced: Dict[str, int] = {}
+        self.cache_lookups: Dict[Tuple[str, str], int] = {}
+        self.cache_sources: Dict[str, Callable[[], Tuple[int, int]]] = {}
+        self.collectors: Dict[str, Collector] = {}
+
+    # Hot path ---------------------------------------------------------------
+
+    @contextmanager
+    def track_tool(self, tool: str):
+        """Count a tool call, its latency and the executions in flight"""
+        self.tool_in_flight[tool] = self.tool_in_flight.get(tool, 0) + 1
+        call = ToolCall()
+        started = time.perf_counter()
+        status = "success"
+        try:
+            yield call
+            if call.failed:
+                status = "failed"
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self.observe_tool(tool, status, time.perf_counter() - started)
+            self.tool_in_flight[tool] -= 1
+
+    def observe_tool(self, tool: str, status: str, duration: float):
+        key = (tool, status)
+        self.tool_calls[key] = self.tool_calls.get(key, 0) + 1
+        histogram = self.tool_latency.get(tool)
+        if histogram is None:
+            histogram = self.tool_latency[tool] = Histogram(len(self.buckets))
+        histogram.counts[bisect.bisect_left(self.buckets, duration)] += 1
+        histogram.sum += duration
+
+    def record_subprocess(self, program: str):
+        self.subprocesses[program] = self.subprocesses.get(program, 0) + 1
+
+    def record_coalesced(self, tool: str):
+        """A call reused the execution of an identical call in flight (single-flight)"""
+        self.coalesced[tool] = self.coalesced.get(tool, 0) + 1
+
+    def record_cache(self, cache: str, hit: bool):
+        key = (cache, "hit" if hit else "miss")
+        self.cache_lookups[key] = self.cache_lookups.get(key, 0) + 1
+
+    # Scrape -----------------------------------------------------------------
+
+    def register_cache(self, cache: str, stats: Callable[[], Tuple[int, int]]):
+        """Expose the (hits, misses) counters kept by a cache object, read at scrape time"""
+        self.cache_sources[cache] = stats
+
+    def add_collector(self, name: str, collector: Collector):
+        """Register (or replace) a callable returning (name, type, help, samples) families at scrape time"""
+        self.collectors[name] = collector
+
+    def families(self) -> Iterable[Tuple[str, str, str, List[Sample]]]:
+        yield ("mcp_server_start_time_seconds", "gauge", "Start time of the MCP server since the epoch",
+               [("", {}, self.started_at)])
+        yield ("mcp_tool_calls_total", "counter", "Tool calls by tool and outcome (success, failed, error)",
+               [("", {"tool": tool, "status": status}, count) for (tool, status), count in sorted(self.tool_calls.items())])
+        yield ("mcp_tool_in_flight", "gauge", "Tool executions currently running",
+               [("", {"tool": tool}, count) for tool, count in sorted(self.tool_in_flight.items())])
+
+        latency: List[Sample] = []
+        for tool, histogram in sorted(self.tool_latency.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+                cumulative += count
+                latency.append(("_bucket", {"tool": tool, "le": _format_value(bound)}, cumulative))
+            latency.append(("_sum", {"tool": tool}, histogram.sum))
+            latency.append(("_count", {"tool": tool}, cumulative))
+        yield ("mcp_tool_duration_seconds", "histogram", "Tool call latency", latency)
+
+        yield ("mcp_tool_coalesced_total", "counter", "Tool executions saved by sharing an identical call in flight",
+               [("", {"tool": tool}, count) for tool, count in sorted(self.coalesced.items())])
+        yield ("mcp_subprocesses_total", "counter", "Subprocesses spawned by the server, by program",
+               [("", {"program": program}, count) for program, count in sorted(self.subprocesses.items())])
+        lookups = dict(self.cache_lookups)
+        for cache, stats in self.cache_sources.items():
+            hits, misses = stats()
+            lookups[(cache, "hit")] = lookups.get((cache, "hit"), 0) + hits
+            lookups[(cache, "miss")] = lookups.get((cache, "miss"), 0) + misses
+        yield ("mcp_cache_lookups_total", "counter", "Cache lookups by cache and result (hit, miss)",
+               [("", {"cache": cache, "result": result}, count) for (cache, result), count in sorted(lookups.items())])
+
+    def render(self, extra: Iterable[Tuple[str, str, str, List[Sample]]] = ()) -> str:
+        """Prometheus text exposition of the registry, its collectors and `extra` families"""
+        lines = []
+        families = list(self.families()) + list(extra)
+        for collector in self.collectors.values():
+            families.extend(collector())
+        for name, kind, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels.items())} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def container_families(states: Dict[str, Dict[str, str]], clients: List[str]) -> List[Tuple[str, str, str, List[Sample]]]:
+    """Per-client container gauges from a `DiagnosticsEngine.container_states()` snapshot"""
+    up: List[Sample] = []
+    health: List[Sample] = []
+    for client in clients:
+        for service in ("odoo", "postgresql"):
+            info = states.get(f"{service}-{client}")
+            labels = {"client": client, "service": service}
+            up.append(("", labels, 1 if info and info["state"] == "running" else 0))
+            if info and "(" in info["status"]:
+                # "Up 2 hours (healthy)" -> healthy
+                state = info["status"].rsplit("(", 1)[1].rstrip(")")
+                health.append(("", {**labels, "health": state.split(":")[0].strip()}, 1))
+    return [
+        ("odoo_client_container_up", "gauge", "Whether the client container is running", up),
+        ("odoo_client_container_health", "gauge", "Docker health check state of the client container", health),
+    ]
+
+
+REGISTRY = Metrics()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Spill-to-disk store for large tool outputs
+
+Outputs above `threshold` bytes (command output, tool results) are written to
+a bounded temporary directory instead of being kept in memory and sent in full.
+The caller gets a head/tail summary with a handle; the complete output is read
+back page by page (`get_output_page` tool) or by byte range (`GET
+/outputs/{handle}`).
+
+The store is bounded in total size (oldest outputs evicted first) and in age,
+and its directory is removed when the process exits.
+"""
+
+import os
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from typing import IO, Any, Dict, Optional, Tuple
+
+DEFAULT_THRESHOLD = int(os.environ.get("MCP_OUTPUT_THRESHOLD", 64 * 1024))
+DEFAULT_MAX_BYTES = int(os.environ.get("MCP_OUTPUT_STORE_MAX_BYTES", 512 * 1024 ** 2))
+DEFAULT_TTL = int(os.environ.get("MCP_OUTPUT_TTL", 3600))
+DEFAULT_PAGE_SIZE = 64 * 1024
+MAX_PAGE_SIZE = 1024 ** 2
+SUMMARY_BYTES = 8 * 1024  # head and tail kept in the summary
+
+
+class OutputNotFoundError(KeyError):
+    """Unknown or expired output handle"""
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def _utf8_start(data: bytes) -> int:
+    """Offset of the first complete UTF-8 character (skip leading continuation bytes)"""
+    offset = 0
+    while offset < min(len(data), 4) and data[offset] & 0xC0 == 0x80:
+        offset += 1
+    return offset
+
+
+def parse_range(header: str, size: int) -> Tuple[int, int]:
+    """`[start, end)` of an HTTP `Range: bytes=...` header (single range); ValueError if unsatisfiable"""
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        raise ValueError(f"Unsupported range: {header}")
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:  # suffix range: the last N bytes
+            start, end = max(0, size - int(last)), size
+        else:
+            start, end = int(first), min(size, int(last) + 1) if last else size
+    except ValueError:
+        raise ValueError(f"Invalid range: {header}")
+    if start >= end:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    return start, end
+
+
+class OutputStore:
+    """Bounded temporary store of large outputs, addressed by handle"""
+
+    def __init__(self, directory: Optional[str] = None, threshold: int = DEFAULT_THRESHOLD,
+                 max_bytes: int = DEFAULT_MAX_BYTES, ttl: int = DEFAULT_TTL):
+        base = directory or os.environ.get("MCP_OUTPUT_DIR")
+        if base:
+            os.makedirs(base, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix="mcp-outputs-", dir=base)
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()  # puts come from the tool worker threads
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, True)
+
+    # Storage ----------------------------------------------------------------
+
+    def _path(self, handle: str) -> str:
+        return os.path.join(self.directory, handle)
+
+    def _register(self, handle: str, size: int, source: str):
+        with self._lock:
+            self._entries[handle] = {"size": size, "created": time.time(), "source": source}
+            self._evict(keep=handle)
+
+    def _evict(self, keep: Optional[str] = None):
+        """Drop expired outputs, then the oldest ones while the store is over its size bound"""
+        now = time.time()
+        total = sum(entry["size"] for entry in self._entries.values())
+        for handle, entry in sorted(self._entries.items(), key=lambda item: item[1]["created"]):
+            if handle == keep or (total <= self.max_bytes and now - entry["created"] <= self.ttl):
+                continue
+            total -= entry["size"]
+            del self._entries[handle]
+            try:
+                os.remove(self._path(handle))
+            except OSError:
+                pass
+
+    def put_text(self, text: str, source: str = "") -> str:
+        handle = secrets.token_hex(8)
+        data = text.encode("utf-8")
+        with open(self._path(handle), "wb") as f:
+            f.write(data)
+        self._register(handle, len(data), source)
+        return handle
+
+    def put_file(self, stream: IO[bytes], source: str = "") -> str:
+        """Copy a binary file object (from its start) into the store"""
+        handle = secrets.token_hex(8)
+        stream.seek(0)
+        with open(self._path(handle), "wb") as f:
+            shutil.copyfileobj(stream, f, 1024 ** 2)
+            size = f.tell()
+        self._register(handle, size, source)
+        return handle
+
+    def info(self, handle: str) -> Dict[str, Any]:
+        with self._lock:
+            self._evict()
+            entry = self._entries.get(handle)
+        if entry is None:
+            raise OutputNotFoundError(handle)
+        return {"handle": handle, **entry}
+
+    # Reading ----------------------------------------------------------------
+
+    def read_range(self, handle: str, start: int, end: int) -> bytes:
+        """Bytes [start, end) of an output"""
+        self.info(handle)
+        with open(self._path(handle), "rb") as f:
+            f.seek(start)
+            return f.read(max(0, end - start))
+
+    def page(self, handle: str, page: int = 0, page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """Page of an output as text; pages are byte ranges adjusted to UTF-8 boundaries"""
+        size = self.info(handle)["size"]
+        page_size = max(1024, min(int(page_size), MAX_PAGE_SIZE))
+        pages = max(1, -(-size // page_size))
+        if not 0 <= page < pages:
+            raise ValueError(f"Page {page} out of range (0-{pages - 1})")
+        start = page * page_size
+        # Read a few bytes on each side to move the cuts to character boundaries
+        data = self.read_range(handle, start, start + page_size + 4)
+        begin = _utf8_start(data) if page else 0
+        end = page_size + _utf8_start(data[page_size:]) if len(data) > page_size else len(data)
+        return {
+            "handle": handle,
+            "page": page,
+            "pages": pages,
+            "size": size,
+            "start": start + begin,
+            "end": start + end,
+            "content": data[begin:end].decode("utf-8", errors="replace"),
+        }
+
+    def summary(self, handle: str, head: bytes, tail: bytes) -> str:
+        size = self.info(handle)["size"]
+        pages = max(1, -(-size // DEFAULT_PAGE_SIZE))
+        head_text = head.decode("utf-8", errors="ignore").rsplit("\n", 1)[0]
+        tail_text = tail[_utf8_start(tail):].decode("utf-8", errors="ignore").split("\n", 1)[-1]
+        return (
+            f"{head_text}\n\n"
+            f"… [output of {_format_size(size)} truncated; full output stored as handle {handle}: "
+            f"get_output_page(handle=\"{handle}\", page=0..{pages - 1}) or GET /outputs/{handle} with a Range header] …\n\n"
+            f"{tail_text}"
+        )
+
+    # Spilling ---------------------------------------------------------------
+
+    def spill_text(self, text: str, source: str = "") -> str:
+        """`text` itself if small enough, otherwise a head/tail summary of the stored output"""
+        if len(text) * 4 <= self.threshold:  # fast path: cannot exceed the threshold once encoded
+            return text
+        data = text.encode("utf-8")
+        if len(data) <= self.threshold:
+            return text
+        handle = self.put_text(text, source)
+        return self.summary(handle, data[:SUMMARY_BYTES], data[-SUMMARY_BYTES:])
+
+    def spill_file(self, stream: IO[bytes], source: str = "") -> str:
+        """Content of a binary file object as text, summarized and stored if above the threshold"""
+        size = stream.seek(0, os.SEEK_END)
+        stream.seek(0)
+        if size <= self.threshold:
+            return stream.read().decode("utf-8", errors="replace")
+        handle = self.put_file(stream, source)
+        stream.seek(0)
+        head = stream.read(SUMMARY_BYTES)
+        stream.seek(size - SUMMARY_BYTES)
+        tail = stream.read()
+        return self.summary(handle, head, tail)
+
+    def close(self):
+        self._finalizer()
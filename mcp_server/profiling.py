@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+On-demand profiling of the running MCP server
+
+- `profile()` runs a time-boxed profile without restarting the server: either
+  a stack sampler (a background thread reading `sys._current_frames()`,
+  output as collapsed stacks ready for flamegraph.pl or speedscope) or
+  cProfile on the event loop thread (pstats summary).
+- `LoopLagMonitor` measures the event loop lag with a heartbeat task. A
+  watchdog thread notices when the loop stops beating for longer than the
+  threshold and captures the stack of the loop thread while it is blocked,
+  so the log says what blocked it, not only that it was blocked.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_DURATION = 120.0
+DEFAULT_INTERVAL = 0.005
+LOOP_LAG_THRESHOLD = float(os.environ.get("MCP_LOOP_LAG_THRESHOLD", "0.1"))
+
+
+class ProfilerBusyError(RuntimeError):
+    """A profile is already running"""
+
+
+def _frame_stack(frame) -> List[str]:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _collapsed_stack(frame) -> str:
+    # Line numbers are left out so samples of the same function merge in the flamegraph
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+class StackSampler:
+    """Samples the stacks of the interpreter threads at a fixed interval"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, thread_ids: Optional[List[int]] = None):
+        self.interval = interval
+        self.thread_ids = thread_ids  # None: every thread but the sampler
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def run(self, duration: float):
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                self.stacks[f"{names.get(thread_id, thread_id)};{_collapsed_stack(frame)}"] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+    def collapsed(self, limit: Optional[int] = None) -> str:
+        """`frame;frame;frame count` lines, heaviest first"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common(limit))
+
+
+_profile_lock = threading.Lock()
+
+
+async def profile(duration: float = 10.0, mode: str = "sample", interval: float = DEFAULT_INTERVAL,
+                  loop_only: bool = False, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Profile the server for `duration` seconds while it keeps serving requests"""
+    if mode not in ("sample", "cprofile"):
+        raise ValueError(f"Unknown profiling mode: {mode}")
+    duration = max(0.1, min(float(duration), MAX_DURATION))
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    started = time.monotonic()
+    try:
+        if mode == "cprofile":
+            import cProfile
+            import io
+            import pstats
+
+            # Deterministic profile of everything running on the event loop thread
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                profiler.disable()
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(limit or 50)
+            return {"mode": mode, "duration": round(time.monotonic() - started, 3), "output": output.getvalue()}
+
+        sampler = StackSampler(interval, [threading.get_ident()] if loop_only else None)
+        await asyncio.to_thread(sampler.run, duration)
+        return {
+            "mode": mode,
+            "duration": round(time.monotonic() - started, 3),
+            "samples": sampler.samples,
+            "interval": interval,
+            "collapsed": sampler.collapsed(limit),
+        }
+    finally:
+        _profile_lock.release()
+
+
+class LoopLagMonitor:
+    """Event loop lag gauge and watchdog capturing the stack of blocking callbacks"""
+
+    def __init__(self, threshold: float = LOOP_LAG_THRESHOLD, interval: float = 0.05, history: int = 50):
+        self.threshold = threshold
+        self.interval = interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._beat = time.monotonic()
+        self._captured_beat: Optional[float] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start monitoring the running loop (idempotent)"""
+        if self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            previous, self._beat = self._beat, now
+            self.last_lag = max(0.0, now - expected)
+            self.max_lag = max(self.max_lag, self.last_lag)
+            if self.last_lag > self.threshold and self._captured_beat != previous:
+                # Too short for the watchdog to catch it in the act
+                self.stalls += 1
+                logger.warning(f"⚠️ Event loop lag: {self.last_lag * 1000:.0f} ms")
+
+    def _watch(self):
+        # One capture per stall: the stack of the loop thread while it does not beat
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked <= self.threshold or beat == self._captured_beat:
+                continue
+            self._captured_beat = beat
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = _frame_stack(frame) if frame is not None else []
+            self.stalls += 1
+            self.recent.append({"at": time.time(), "blocked_for": round(blocked, 3), "stack": stack})
+            logger.warning(
+                f"⚠️ Event loop blocked for more than {blocked * 1000:.0f} ms in:\n  " + "\n  ".join(stack[-15:])
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "threshold": self.threshold,
+            "last_lag": round(self.last_lag, 4),
+            "max_lag": round(self.max_lag, 4),
+            "stalls": self.stalls,
+            "recent_stalls": list(self.recent),
+        }
+
+    def metric_families(self):
+        """Collector for metrics.Metrics.add_collector"""
+        return [
+            ("mcp_event_loop_lag_seconds", "gauge", "Last measured event loop lag", [("", {}, self.last_lag)]),
+            ("mcp_event_loop_max_lag_seconds", "gauge", "Largest event loop lag since start", [("", {}, self.max_lag)]),
+            ("mcp_event_loop_stalls_total", "counter", "Event loop stalls longer than the threshold", [("", {}, self.stalls)]),
+        ]
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Request coalescing (single-flight) for identical concurrent tool calls
+
+While a call is running, identical calls (same key) wait for it and receive
+the same result instead of starting their own execution. Nothing is cached:
+once the execution completes, the next call runs again.
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+def call_key(name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+    """Key of a tool call: tool name and arguments with sorted keys, None values dropped"""
+    normalized = {key: value for key, value in (arguments or {}).items() if value is not None}
+    return name, json.dumps(normalized, sort_keys=True, default=str)
+
+
+class SingleFlight:
+    """Shares the execution of identical concurrent calls (event loop only, no locking)"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return `(result, shared)`; `shared` is True when another call's execution was reused"""
+        future = self._calls.get(key)
+        shared = future is not None
+        if not shared:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._calls.pop(key, None) if self._calls.get(key) is done else None)
+        # shield: a caller that goes away (client disconnected) does not cancel the shared execution
+        return await asyncio.shield(future), shared
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Benchmarks du serveur MCP en mode HTTP
+
+Le serveur est lancé dans un sous-processus sur un dépôt factice (clients
+générés, Makefile vide) avec des exécutables `make`, `docker` et `git`
+simulés placés en tête du PATH : leur latence et la taille de leur sortie
+sont configurables, ce qui isole le coût du serveur lui-même (dispatch des
+outils, sérialisation, boucle asyncio) de celui des vraies commandes.
+
+Mesures : débit et latences (p50, p95, p99) de /tools/call, /clients,
+/status, /metrics, /tools/batch, d'une charge mixte concurrente, et débit/aller-retour
+du terminal websocket. La charge `startup` mesure le temps entre le
+lancement d'une session stdio et sa réponse à `initialize` (budget
+--startup-budget, code de sortie 1 s'il est dépassé). Les résultats sont
+enregistrés en JSON pour comparer deux versions (--compare). La charge
+`oca_search` mesure en processus les recherches floues non mises en cache de
+list_oca_modules avec un index synthétique de --addons addons.
+
+Usage :
+    python3 mcp_server/tests/benchmark.py [--requests 200] [--concurrency 8]
+        [--latency 0.02] [--output-bytes 2048] [--clients 20]
+        [--only tools_call,mixed] [--output resultats.json] [--compare ancien.json]
+        [--startup-runs 10] [--startup-budget 1.0] [--addons 15000]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+MCP_DIR = Path(__file__).resolve().parent.parent
+ROOT_DIR = MCP_DIR.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "benchmarks"
+
+WORKLOADS = ["startup", "oca_search", "tools_call", "clients", "status", "metrics", "batch", "mixed", "terminal"]
+LOCAL_WORKLOADS = ["startup", "oca_search"]  # mesurées sans serveur HTTP
+HTTP_WORKLOADS = [name for name in WORKLOADS if name not in LOCAL_WORKLOADS]
+STARTUP_BUDGET = 1.0  # secondes, du lancement d'une session stdio à sa réponse à initialize
+# Requêtes de list_oca_modules : mots courants, fautes de frappe, phrases
+SEARCH_QUERIES = [
+    "account", "acount analytic", "stock picking", "tier validation", "partner firstname", "l10n es",
+    "sale", "web", "mrp", "helpdesk ticket", "queue job", "invoice payment reconcile", "base",
+    "dat rnge", "hr", "product", "auth ldap",
+]
+
+# Exécutable simulé unique, installé sous les noms make, docker et git
+STUB = textwrap.dedent("""\
+    #!/usr/bin/env python3
+    import os, sys, time
+    name = os.path.basename(sys.argv[0])
+    args = sys.argv[1:]
+    time.sleep(float(os.environ.get("BENCH_LATENCY", "0")))
+    clients = sorted(os.listdir(os.environ["BENCH_CLIENTS_DIR"]))
+    size = int(os.environ.get("BENCH_OUTPUT_BYTES", "2048"))
+    filler = ("x" * 79 + "\\n") * (size // 80)
+
+    if name == "make" and "list-clients" in args:
+        print("Clients disponibles:")
+        for client in clients:
+            print(f"- {client}")
+    elif name == "docker" and args[:1] == ["ps"]:
+        for client in clients:
+            print(f"odoo-{client}\\trunning\\tUp 2 hours (healthy)")
+            print(f"postgresql-{client}\\trunning\\tUp 2 hours")
+    elif name == "docker" and args[:1] == ["exec"] and "-it" in args:
+        # Terminal : "bench N" émet N octets puis DONE, "ping" répond PONG
+        for line in sys.stdin:
+            command = line.split()
+            if command[:1] == ["bench"]:
+                remaining = int(command[1])
+                while remaining > 0:
+                    chunk = min(remaining, 4096)
+                    sys.stdout.write("y" * (chunk - 1) + "\\n")
+                    remaining -= chunk
+                sys.stdout.write("DONE\\n")
+            elif command[:1] == ["ping"]:
+                sys.stdout.write("PONG\\n")
+            elif command[:1] == ["exit"]:
+                break
+            sys.stdout.flush()
+    elif name == "docker" and "pg_isready" in args:
+        print("/var/run/postgresql:5432 - accepting connections")
+    elif name == "docker" and "curl" in args:
+        print('{"jsonrpc": "2.0", "id": null, "result": {"status": "pass"}}')
+    elif name == "git" and args[:1] == ["rev-parse"]:
+        print("0" * 40)
+    else:
+        sys.stdout.write(filler)
+""")
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, float]:
+    """Percentiles (rang le plus proche) en millisecondes"""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        index = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Écarts de débit et de p95 entre deux fichiers de résultats"""
+    rows = []
+    for name, result in current["workloads"].items():
+        before = previous.get("workloads", {}).get(name)
+        if not before:
+            continue
+        row = {"workload": name}
+        # Le terminal mesure un débit en MiB/s et la latence d'un aller-retour
+        for key, value, old in (
+            ("throughput", result.get("throughput", result.get("throughput_mib_s")),
+             before.get("throughput", before.get("throughput_mib_s"))),
+            ("p95", result.get("latency", result.get("round_trip", {})).get("p95"),
+             before.get("latency", before.get("round_trip", {})).get("p95")),
+        ):
+            if value is not None and old:
+                row[key] = {"before": old, "after": value, "change": round((value - old) * 100 / old, 1)}
+        rows.append(row)
+    return rows
+
+
+def make_fake_repository(root: Path, clients: int) -> Path:
+    """Dépôt factice : Makefile, config et scripts réels (liens), clients vides"""
+    repo = root / "repo"
+    (repo / "clients").mkdir(parents=True)
+    (repo / "Makefile").write_text("# benchmark\n")
+    for name in ("config", "scripts"):
+        (repo / name).symlink_to(ROOT_DIR / name)
+    for index in range(clients):
+        client_dir = repo / "clients" / f"client-{index:02d}"
+        client_dir.mkdir()
+        (client_dir / "docker-compose.yml").write_text("services: {}\n")
+
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    for name in ("make", "docker", "git"):
+        (bin_dir / name).write_text(STUB)
+        (bin_dir / name).chmod(0o755)
+    return repo
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_requests(send: Callable[[int], Awaitable[Any]], total: int, concurrency: int) -> Dict[str, Any]:
+    """Exécute `total` requêtes avec `concurrency` requêtes en vol"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                response = await send(index)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    duration = time.perf_counter() - started
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "duration": round(duration, 3),
+        "throughput": round(total / duration, 2) if duration else None,
+        "latency": latency_stats(latencies),
+    }
+
+
+async def bench_terminal(base_url: str, client: str, total_bytes: int, pings: int) -> Dict[str, Any]:
+    """Débit de sortie du terminal websocket et aller-retour d'une commande"""
+    import websockets
+
+    url = base_url.replace("http://", "ws://") + f"/terminal/{client}"
+    async with websockets.connect(url, max_size=None) as websocket:
+        async def read_until(marker: str, timeout: float = 60.0) -> int:
+            received = 0
+            buffer = ""
+            deadline = time.monotonic() + timeout
+            while marker not in buffer:
+                message = await asyncio.wait_for(websocket.recv(), max(0.1, deadline - time.monotonic()))
+                received += len(message)
+                buffer = (buffer + message)[-len(marker) * 4:]
+            return received
+
+        await websocket.send("ping\n")
+        await read_until("PONG")
+
+        latencies = []
+        for _ in range(pings):
+            started = time.perf_counter()
+            await websocket.send("ping\n")
+            await read_until("PONG")
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await websocket.send(f"bench {total_bytes}\n")
+        received = await read_until("DONE")
+        duration = time.perf_counter() - started
+        await websocket.send("exit\n")
+
+    return {
+        "bytes": received,
+        "duration": round(duration, 3),
+        "throughput_mib_s": round(received / duration / 1024 ** 2, 3) if duration else None,
+        "round_trip": latency_stats(latencies),
+    }
+
+
+def bench_startup(repo: Path, env: Dict[str, str], runs: int, budget: float) -> Dict[str, Any]:
+    """Temps de démarrage d'une session stdio, comme lancée par Claude Desktop"""
+    initialize = json.dumps({
+        "jsonrpc": "2.0", "id": 1, "method": "initialize",
+        "params": {"protocolVersion": "2024-11-05", "capabilities": {}, "clientInfo": {"name": "benchmark", "version": "1.0"}},
+    }) + "\n"
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, str(MCP_DIR / "mcp_server.py"), str(repo), "--mode", "stdio"],
+            env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        try:
+            server.stdin.write(initialize.encode())
+            server.stdin.flush()
+            response = server.stdout.readline()
+            durations.append(time.perf_counter() - started)
+        finally:
+            server.kill()
+            server.wait()
+        if b'"result"' not in response:
+            raise SystemExit(f"❌ Réponse inattendue à initialize: {response[:200]!r}")
+    latency = latency_stats(durations)
+    return {"runs": runs, "latency": latency, "budget_ms": budget * 1000, "within_budget": latency["p95"] <= budget * 1000}
+
+
+def make_addon_index(db_path: Path, addons: int, seed: int = 0) -> Path:
+    """Index d'addons synthétique : noms et résumés tirés du vocabulaire des dépôts OCA"""
+    sys.path.insert(0, str(ROOT_DIR / "scripts"))
+    import oca_addon_index
+
+    config_dir = ROOT_DIR / "config"
+    repositories = sorted(json.loads((config_dir / "repositories.json").read_text())["oca_repositories"])
+    descriptions = json.loads((config_dir / "oca_descriptions.json").read_text())
+    texts = repositories + [info.get("en", "") for info in descriptions.values()]
+    vocabulary = sorted({word for text in texts for word in re.findall(r"[a-z]{3,}", text.lower())})
+
+    rng = random.Random(seed)
+    by_repository: Dict[str, Dict[str, Any]] = {}
+    for _ in range(addons):
+        repository = rng.choice(repositories)
+        name = "_".join([repository.split("-")[0], *rng.sample(vocabulary, rng.randint(1, 3))])
+        summary = " ".join(rng.sample(vocabulary, 6)).capitalize()
+        by_repository.setdefault(repository, {})[name] = oca_addon_index._normalize_manifest(
+            {"summary": summary, "depends": ["base"]}
+        )
+    index = oca_addon_index.AddonIndex(db_path)
+    for repository, manifests in by_repository.items():
+        index.replace_repository(repository, "17.0", "benchmark", manifests)
+    index.close()
+    return db_path
+
+
+def bench_oca_search(root: Path, addons: int, rounds: int = 5) -> Dict[str, Any]:
+    """Latence des recherches floues non mises en cache, index des addons chargé"""
+    db_path = make_addon_index(root / "addons.db", addons)
+    import oca_search
+
+    engine = oca_search.OcaSearchEngine(ROOT_DIR / "config", db_path)
+    stats = engine.stats()
+    durations = []
+    for _ in range(rounds):
+        for query in SEARCH_QUERIES:
+            engine.clear_cache()
+            started = time.perf_counter()
+            engine.search(query, 20)
+            durations.append(time.perf_counter() - started)
+    return {"documents": stats["documents"], "addons": stats["addons"], "queries": len(durations),
+            "latency": latency_stats(durations)}
+
+
+async def run_benchmarks(args, base_url: str, clients: List[str]) -> Dict[str, Any]:
+    import httpx
+
+    results: Dict[str, Any] = {}
+    selected = args.only.split(",") if args.only else HTTP_WORKLOADS
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as http:
+        requests = {
+            "tools_call": lambda i: http.post("/tools/call", json={"name": "list_clients", "arguments": {}}),
+            "clients": lambda i: http.get("/clients"),
+            "status": lambda i: http.get("/status"),
+            "metrics": lambda i: http.get("/metrics"),
+            # Chargement d'une page du tableau de bord : un appel par client en une requête
+            "batch": lambda i: http.post("/tools/batch", json={"calls": [
+                {"id": client, "name": "check_client", "arguments": {"client": client}} for client in clients[:8]
+            ]}),
+        }
+        mixed = [
+            requests["tools_call"],
+            requests["clients"],
+            requests["status"],
+            lambda i: http.post("/tools/call", json={"name": "check_client", "arguments": {"client": clients[i % len(clients)]}}),
+            lambda i: http.post("/tools/call", json={"name": "diagnose_client", "arguments": {"client": clients[i % len(clients)]}}),
+            requests["metrics"],
+        ]
+        requests["mixed"] = lambda i: mixed[i % len(mixed)](i)
+
+        for name in selected:
+            if name == "terminal" or name in LOCAL_WORKLOADS:
+                continue
+            if name not in requests:
+                raise SystemExit(f"❌ Charge inconnue: {name} (disponibles: {', '.join(WORKLOADS)})")
+            await requests[name](0)  # préchauffage
+            results[name] = await run_requests(requests[name], args.requests, args.concurrency)
+            print(f"   {name:<12} {results[name]['throughput']:>9} req/s   p95 {results[name]['latency'].get('p95')} ms"
+                  f"{'   ' + str(results[name]['errors']) + ' erreur(s)' if results[name]['errors'] else ''}")
+
+    if "terminal" in selected:
+        results["terminal"] = await bench_terminal(base_url, clients[0], args.terminal_bytes, args.pings)
+        print(f"   {'terminal':<12} {results['terminal']['throughput_mib_s']:>9} MiB/s  "
+              f"aller-retour p95 {results['terminal']['round_trip'].get('p95')} ms")
+    return results
+
+
+def git_commit() -> Optional[str]:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def start_server(repo: Path, env: Dict[str, str], port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, str(MCP_DIR / "mcp_server.py"), str(repo), "--mode", "http", "--host", "127.0.0.1", "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+
+
+async def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 30.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as http:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise SystemExit(f"❌ Le serveur s'est arrêté au démarrage (code {server.returncode})")
+            try:
+                await http.get("/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise SystemExit("❌ Le serveur n'a pas démarré à temps")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du serveur MCP en mode HTTP")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes par charge")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requêtes en vol")
+    parser.add_argument("--latency", type=float, default=0.02, help="Latence des commandes simulées (s)")
+    parser.add_argument("--output-bytes", type=int, default=2048, help="Taille de la sortie des commandes simulées")
+    parser.add_argument("--clients", type=int, default=20, help="Nombre de clients du dépôt factice")
+    parser.add_argument("--terminal-bytes", type=int, default=256 * 1024, help="Octets émis pour le débit du terminal")
+    parser.add_argument("--pings", type=int, default=50, help="Allers-retours mesurés sur le terminal")
+    parser.add_argument("--startup-runs", type=int, default=10, help="Démarrages stdio mesurés")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET, help="Budget de démarrage p95 (s)")
+    parser.add_argument("--addons", type=int, default=15000, help="Addons de l'index synthétique (charge oca_search)")
+    parser.add_argument("--only", help=f"Charges à exécuter, séparées par des virgules ({','.join(WORKLOADS)})")
+    parser.add_argument("--output", help="Fichier de résultats JSON (défaut: tests/benchmarks/<commit>.json)")
+    parser.add_argument("--compare", help="Résultats précédents à comparer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mcp-bench-") as tmp_dir:
+        tmp = Path(tmp_dir)
+        repo = make_fake_repository(tmp, args.clients)
+        clients = sorted(path.name for path in (repo / "clients").iterdir())
+        env = {
+            **os.environ,
+            "PATH": f"{tmp / 'bin'}:{os.environ['PATH']}",
+            "BENCH_LATENCY": str(args.latency),
+            "BENCH_OUTPUT_BYTES": str(args.output_bytes),
+            "BENCH_CLIENTS_DIR": str(repo / "clients"),
+            "TRAEFIK_URL": "http://127.0.0.1:9",  # routage Traefik injoignable : échec immédiat
+        }
+        selected = args.only.split(",") if args.only else WORKLOADS
+        workloads: Dict[str, Any] = {}
+
+        print(f"🏁 Benchmarks du serveur MCP ({args.requests} requêtes, {args.concurrency} en vol, "
+              f"commandes simulées {args.latency * 1000:.0f} ms / {args.output_bytes} octets)")
+        if "startup" in selected:
+            workloads["startup"] = bench_startup(repo, env, args.startup_runs, args.startup_budget)
+            startup = workloads["startup"]
+            print(f"   {'startup':<12} p50 {startup['latency']['p50']} ms   p95 {startup['latency']['p95']} ms   "
+                  f"{'✅' if startup['within_budget'] else '❌'} budget {startup['budget_ms']:.0f} ms")
+        if "oca_search" in selected:
+            workloads["oca_search"] = bench_oca_search(tmp, args.addons)
+            search = workloads["oca_search"]
+            print(f"   {'oca_search':<12} p50 {search['latency']['p50']} ms   p95 {search['latency']['p95']} ms   "
+                  f"max {search['latency']['max']} ms ({search['documents']} documents)")
+
+        if any(name not in LOCAL_WORKLOADS for name in selected):
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            server = start_server(repo, env, port)
+            try:
+                asyncio.run(wait_until_ready(base_url, server))
+                workloads.update(asyncio.run(run_benchmarks(args, base_url, clients)))
+            finally:
+                server.terminate()
+                try:
+                    server.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+
+    commit = git_commit()
+    result = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "config": {key: getattr(args, key) for key in ("requests", "concurrency", "latency", "output_bytes", "clients", "terminal_bytes", "pings", "startup_runs", "startup_budget", "addons")},
+        "workloads": workloads,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n")
+    print(f"💾 Résultats enregistrés dans {output}")
+
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())
+        print(f"\n📊 Comparaison avec {previous.get('commit') or args.compare}")
+        for row in compare(previous, result):
+            parts = [f"{key} {info['before']} -> {info['after']} ({info['change']:+}%)"
+                     for key, info in row.items() if key != "workload"]
+            print(f"   {row['workload']:<12} " + "   ".join(parts))
+
+    if not workloads.get("startup", {}).get("within_budget", True):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
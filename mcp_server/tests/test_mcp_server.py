@@ -9,6 +9,8 @@ import os
 import json
 import tempfile
 import shutil
+import textwrap
+from contextlib import contextmanager
 from pathlib import Path
 from unittest.mock import Mock, AsyncMock, patch
 
@@ -40,6 +42,22 @@ class TestMCPServer:
             "message": message
         })
         print(f"{status} {name}: {message}")
+    
+    GIT_ENV = {"GIT_AUTHOR_NAME": "test", "GIT_AUTHOR_EMAIL": "test@example.com",
+               "GIT_COMMITTER_NAME": "test", "GIT_COMMITTER_EMAIL": "test@example.com",
+               "GIT_ALLOW_PROTOCOL": "file"}
+    
+    @contextmanager
+    def git_sandbox(self):
+        """Répertoire temporaire avec une identité git de test (dépôts locaux clonables)"""
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.dict(os.environ, self.GIT_ENV):
+            yield Path(tmp_dir)
+    
+    @staticmethod
+    def git(*args, cwd):
+        """Exécute git dans `cwd` (clones et submodules depuis des chemins locaux autorisés)"""
+        import subprocess
+        subprocess.run(["git", "-c", "protocol.file.allow=always", *args], cwd=cwd, check=True, capture_output=True)
         
     async def test_server_creation(self):
         """Test la création du serveur MCP"""
@@ -374,6 +392,1206 @@ class TestMCPServer:
         except Exception as e:
             self.log_test("Error Handling", False, f"Erreur: {e}")
     
+    async def test_oca_addon_index(self):
+        """Test de l'index local des addons OCA"""
+        try:
+            server = OdooClientMCPServer(str(self.repo_path))
+            import oca_addon_index
+            
+            manifest = oca_addon_index.parse_manifest(
+                "# -*- coding: utf-8 -*-\n{'name': 'Tier', 'depends': ['base'], 'installable': True}"
+            )
+            if not manifest or manifest.get("depends") != ["base"]:
+                self.log_test("OCA Addon Index (Manifest)", False, f"Manifeste mal analysé: {manifest}")
+                return
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                db_path = Path(tmp_dir) / "addons.db"
+                index = oca_addon_index.AddonIndex(db_path)
+                index.replace_repository("server-ux", "17.0", "abc123", {
+                    "base_tier_validation": oca_addon_index._normalize_manifest(manifest)
+                })
+                index.close()
+                
+                with patch.object(oca_addon_index, "DEFAULT_DB_PATH", db_path):
+                    result = await server._find_oca_addon("base_tier_validation", "17.0")
+            
+            data = json.loads(result[0].text)
+            if data["matches"][0]["repository"] == "server-ux":
+                self.log_test("OCA Addon Index", True, "Addon retrouvé dans l'index local")
+            else:
+                self.log_test("OCA Addon Index", False, f"Résultat inattendu: {data}")
+                
+        except Exception as e:
+            self.log_test("OCA Addon Index", False, f"Erreur: {e}")
+    
+    async def test_oca_addon_index_sources(self):
+        """Test du choix d'un seul arbre git par dépôt et branche (miroir, sinon commit le plus récent)"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import oca_addon_index
+            
+            with self.git_sandbox() as tmp:
+                source = tmp / "src" / "server-ux"
+                (source / "base_tier_validation").mkdir(parents=True)
+                (source / "base_tier_validation" / "__manifest__.py").write_text("{'name': 'Tier'}")
+                self.git("init", "-q", "-b", "17.0", cwd=source)
+                self.git("add", "-A", cwd=source)
+                with patch.dict(os.environ, {"GIT_COMMITTER_DATE": "2024-01-01T00:00:00"}):
+                    self.git("commit", "-q", "-m", "init", cwd=source)
+                
+                # Deux clients sur des commits différents du même dépôt
+                for name in ("client_a", "client_b"):
+                    client = tmp / "root" / "clients" / name
+                    (client / "addons").mkdir(parents=True)
+                    (client / "docker-compose.yml").write_text("services:\n  odoo:\n    image: odoo:17.0\n")
+                    self.git("clone", "-q", str(source), "addons/server-ux", cwd=client)
+                    if name == "client_a":
+                        (source / "date_range").mkdir()
+                        (source / "date_range" / "__manifest__.py").write_text("{'name': 'Date range'}")
+                        self.git("add", "-A", cwd=source)
+                        self.git("commit", "-q", "-m", "date_range", cwd=source)
+                
+                index = oca_addon_index.AddonIndex(tmp / "addons.db")
+                with patch.object(oca_addon_index, "ROOT_DIR", tmp / "root"), \
+                     patch.object(oca_addon_index, "REPOS_CACHE_DIR", tmp / "repos"):
+                    first = oca_addon_index.update_index(index, ["17.0"])
+                    second = oca_addon_index.update_index(index, ["17.0"])
+                    newest = bool(index.find("date_range", "17.0"))
+                    # Un miroir bare (ici au commit le plus ancien) passe devant les checkouts
+                    self.git("clone", "-q", "--bare", str(tmp / "root" / "clients" / "client_a" / "addons" / "server-ux"),
+                             str(tmp / "repos" / "server-ux.git"), cwd=tmp)
+                    mirrored = oca_addon_index.update_index(index, ["17.0"])
+                    again = oca_addon_index.update_index(index, ["17.0"])
+                    mirror_commit = not index.find("date_range", "17.0")
+                index.close()
+            
+            if (len(first["indexed"]) == 1 and newest and not second["indexed"] and second["unchanged"] == 1
+                    and mirrored["addons"] == 1 and mirror_commit and not again["indexed"] and again["unchanged"] == 1):
+                self.log_test("OCA Addon Index Sources", True, "Une source par dépôt, pas de réindexation en boucle")
+            else:
+                self.log_test("OCA Addon Index Sources", False, f"Résultat inattendu: {first} / {second} / {mirrored} / {again}")
+                
+        except Exception as e:
+            self.log_test("OCA Addon Index Sources", False, f"Erreur: {e}")
+    
+    async def test_list_oca_modules_search(self):
+        """Test de la recherche floue des modules OCA"""
+        try:
+            server = OdooClientMCPServer(str(self.repo_path))
+            
+            result = await server._list_oca_modules("acount analytic", 5)
+            data = json.loads(result[0].text)
+            names = [r["name"] for r in data["results"]]
+            
+            # Avec l'index des addons : l'élagage des candidats ne change pas le classement
+            import benchmark
+            import oca_search
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                engine = oca_search.OcaSearchEngine(self.repo_path / "config",
+                                                    benchmark.make_addon_index(Path(tmp_dir) / "addons.db", 2000))
+                differences = []
+                for query in benchmark.SEARCH_QUERIES:
+                    normalized = oca_search.normalize(query)
+                    pruned = [r["name"] for r in engine._fuzzy_search(normalized, 10, None, None)]
+                    exhaustive = [r["name"] for r in engine._fuzzy_search(normalized, 10, None, None, prune=False)]
+                    if pruned != exhaustive:
+                        differences.append(query)
+            
+            if "account-analytic" in names[:3] and not differences:
+                self.log_test("List OCA Modules Search", True, f"Recherche floue tolérante aux fautes: {names[:3]}")
+            else:
+                self.log_test("List OCA Modules Search", False, f"Résultats inattendus: {names} / élagage: {differences}")
+                
+        except Exception as e:
+            self.log_test("List OCA Modules Search", False, f"Erreur: {e}")
+    
+    async def test_dependency_resolver(self):
+        """Test de la résolution transitive des dépendances OCA"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import oca_addon_index
+            import oca_dependency_resolver
+            
+            def addon(depends):
+                return oca_addon_index._normalize_manifest({"depends": depends, "installable": True})
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                index = oca_addon_index.AddonIndex(Path(tmp_dir) / "addons.db")
+                index.replace_repository("server-ux", "17.0", "a1", {
+                    "base_tier_validation": addon(["base_setup", "mail", "l10n_fr", "private_addon"]),
+                    "base_setup": addon(["base"]),
+                })
+                index.replace_repository("server-tools", "17.0", "b1", {
+                    "base_setup": addon(["base"]),
+                    "cycle_a": addon(["cycle_b"]),
+                    "cycle_b": addon(["cycle_a"]),
+                })
+                plan = oca_dependency_resolver.resolve(["base_tier_validation", "cycle_a"], "17.0", index=index)
+                index.close()
+                
+                # Application : un module personnalisé et un lien vers un autre dépôt sont préservés
+                client_dir = Path(tmp_dir) / "clients" / "acme"
+                for addon_name in ("base_setup", "base_tier_validation", "cycle_a"):
+                    (client_dir / "addons" / "server-ux" / addon_name).mkdir(parents=True)
+                    (client_dir / "addons" / "server-ux" / addon_name / "__manifest__.py").write_text("{}")
+                (client_dir / "extra-addons" / "base_tier_validation").mkdir(parents=True)
+                (client_dir / "extra-addons" / "cycle_a").symlink_to("../addons/server-tools/cycle_a")
+                (client_dir / "extra-addons" / "base_setup").symlink_to("../addons/server-ux/base_setup")
+                to_apply = {"client": "acme", "version": "17.0", "repositories_to_add": [], "modules_to_link": [
+                    {"addon": name, "repository": "server-ux"} for name in ("base_setup", "base_tier_validation", "cycle_a")
+                ]}
+                with patch.object(oca_dependency_resolver, "CLIENTS_DIR", Path(tmp_dir) / "clients"):
+                    applied = oca_dependency_resolver.apply_plan(to_apply)
+                kept = (os.readlink(client_dir / "extra-addons" / "cycle_a") == "../addons/server-tools/cycle_a"
+                        and not (client_dir / "extra-addons" / "base_tier_validation").is_symlink())
+            
+            repos = sorted(r["name"] for r in plan["repositories_to_add"])
+            linked = [m["addon"] for m in plan["modules_to_link"]]
+            if (repos == ["server-tools", "server-ux"]
+                    and plan["addons"]["base_setup"]["repository"] in repos
+                    and linked.index("base_setup") < linked.index("base_tier_validation")
+                    and {"base", "mail", "l10n_fr"} <= set(plan["core"])
+                    and plan["unresolved"] == {"private_addon": ["base_tier_validation"]}
+                    and applied["linked"] == ["base_setup"] and len(applied["errors"]) == 2 and kept
+                    and plan["cycles"]):
+                self.log_test("Dependency Resolver", True, f"Plan minimal: {repos}, cycle détecté, modules standard séparés")
+            else:
+                self.log_test("Dependency Resolver", False, f"Plan inattendu: {plan}")
+                
+        except Exception as e:
+            self.log_test("Dependency Resolver", False, f"Erreur: {e}")
+    
+    async def test_resolve_dependencies_tool(self):
+        """Test de l'outil resolve_dependencies (plan incomplet non appliqué) et de add_module --all"""
+        try:
+            server = OdooClientMCPServer(str(self.repo_path))
+            import oca_dependency_resolver
+            
+            plan = {"addons": {}, "repositories_to_add": [], "modules_to_link": [], "core": [],
+                    "unresolved": {"private_addon": ["sale_extra"]}, "cycles": []}
+            apply_plan = Mock(return_value={"added": [], "linked": [], "errors": ["sale_extra: introuvable"]})
+            with patch.object(oca_dependency_resolver, "resolve_for_client", side_effect=lambda *a: dict(plan)), \
+                 patch.object(oca_dependency_resolver, "apply_plan", apply_plan):
+                refused = (await server._resolve_dependencies("acme", "sale_extra", apply=True))[0].text
+                refused_calls = apply_plan.call_count
+                forced = (await server._resolve_dependencies("acme", "sale_extra", apply=True, force=True))[0].text
+            
+            # add_module --all + with_dependencies : résolution sur tous les addons du dépôt
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                repository = Path(tmp_dir) / "clients" / "acme" / "addons" / "server-ux"
+                for addon_name in ("base_tier_validation", "date_range"):
+                    (repository / addon_name).mkdir(parents=True)
+                    (repository / addon_name / "__manifest__.py").write_text("{}")
+                (repository / "setup").mkdir()
+                resolve = AsyncMock(return_value=[Mock(text="ok")])
+                with patch.object(server, "repo_path", Path(tmp_dir)), \
+                     patch.object(server, "_run_command", return_value={"success": True, "stdout": "", "stderr": ""}), \
+                     patch.object(server, "_resolve_dependencies", resolve):
+                    await server._add_module("acme", "server-ux", link_all=True, with_dependencies=True)
+            
+            if (refused_calls == 0 and "Plan not applied" in refused and "private_addon" in refused
+                    and "sale_extra: introuvable" in forced
+                    and resolve.call_args[0][1] == "base_tier_validation,date_range"):
+                self.log_test("Resolve Dependencies Tool", True, "Plan incomplet appliqué uniquement avec force, erreurs remontées")
+            else:
+                self.log_test("Resolve Dependencies Tool", False, f"Résultat inattendu: {refused} / {forced}")
+                
+        except Exception as e:
+            self.log_test("Resolve Dependencies Tool", False, f"Erreur: {e}")
+    
+    async def test_incremental_catalog_refresh(self):
+        """Test de la mise à jour incrémentale du catalogue OCA"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import oca_catalog_refresh
+            
+            listing = [
+                {"name": "server-ux", "url": "https://github.com/OCA/server-ux.git", "description": "",
+                 "stars": 10, "updated_at": "2025-01-01T00:00:00Z", "pushed_at": "2025-01-02T00:00:00Z", "archived": False},
+                {"name": "web", "url": "https://github.com/OCA/web.git", "description": "",
+                 "stars": 20, "updated_at": "2025-03-01T00:00:00Z", "pushed_at": "2025-03-01T00:00:00Z", "archived": False},
+                {"name": "pylint-odoo", "url": "https://github.com/OCA/pylint-odoo.git", "description": "",
+                 "stars": 5, "updated_at": "2025-03-01T00:00:00Z", "pushed_at": "2025-03-01T00:00:00Z", "archived": False},
+            ]
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                tmp = Path(tmp_dir)
+                (tmp / "repositories.json").write_text(json.dumps({
+                    "oca_repositories": {
+                        "server-ux": {"url": "", "description": "", "stars": 1, "last_updated": "2025-01-01T00:00:00Z"},
+                        "archived-repo": {"url": "", "description": "", "stars": 1, "last_updated": "2024-01-01T00:00:00Z"}
+                    },
+                    "external_repositories": {"custom": {"url": "x"}}
+                }))
+                verify = Mock(return_value=(oca_catalog_refresh.ADDONS_FOUND, "some_addon"))
+                with patch.object(oca_catalog_refresh, "REPOSITORIES_FILE", tmp / "repositories.json"), \
+                     patch.object(oca_catalog_refresh, "DESCRIPTIONS_FILE", tmp / "descriptions.json"), \
+                     patch.object(oca_catalog_refresh, "STATE_FILE", tmp / "state.json"), \
+                     patch.object(oca_catalog_refresh, "fetch_organization_repositories", return_value=(listing, 0)), \
+                     patch.object(oca_catalog_refresh, "verify_odoo_addons", verify):
+                    first = oca_catalog_refresh.refresh_catalog()
+                    second = oca_catalog_refresh.refresh_catalog()
+                    config = json.loads((tmp / "repositories.json").read_text())
+                    
+                    # Erreur API sur un dépôt modifié : entrée conservée, re-vérifiée au passage suivant
+                    listing[1] = dict(listing[1], updated_at="2025-04-01T00:00:00Z", pushed_at="2025-04-01T00:00:00Z")
+                    verify.return_value = (oca_catalog_refresh.ADDONS_UNKNOWN, None)
+                    third = oca_catalog_refresh.refresh_catalog()
+                    fourth = oca_catalog_refresh.refresh_catalog()
+                    after_error = json.loads((tmp / "repositories.json").read_text())
+            
+            def client_for(status):
+                return Mock(get=Mock(return_value=Mock(status_code=status, json=Mock(return_value=[]))))
+            statuses = [oca_catalog_refresh.verify_odoo_addons(client_for(code), "web")[0] for code in (404, 503)]
+            
+            if (first["added"] == ["web"] and first["removed"] == ["archived-repo"]
+                    and second["verified"] == 0 and sorted(config["oca_repositories"]) == ["server-ux", "web"]
+                    and config["external_repositories"] == {"custom": {"url": "x"}}
+                    and third["unknown"] == ["web"] and third["removed"] == []
+                    and fourth["verified"] == 1 and verify.call_count == 3
+                    and after_error["oca_repositories"]["web"] == config["oca_repositories"]["web"]
+                    and statuses == [oca_catalog_refresh.ADDONS_ABSENT, oca_catalog_refresh.ADDONS_UNKNOWN]):
+                self.log_test("Incremental Catalog Refresh", True, "Seuls les dépôts nouveaux ou modifiés sont vérifiés")
+            else:
+                self.log_test("Incremental Catalog Refresh", False, f"Résultat inattendu: {first} / {second} / {third}")
+                
+        except Exception as e:
+            self.log_test("Incremental Catalog Refresh", False, f"Erreur: {e}")
+    
+    async def test_github_client_rate_limit(self):
+        """Test du client GitHub (Retry-After et en-têtes de quota)"""
+        try:
+            import time
+            OdooClientMCPServer(str(self.repo_path))
+            import github_client
+            
+            def response(status, headers):
+                return Mock(status_code=status, headers=headers, text="")
+            
+            session = Mock(headers={})
+            session.request.side_effect = [
+                response(429, {"Retry-After": "0"}),
+                response(200, {"X-RateLimit-Remaining": "4321", "X-RateLimit-Limit": "5000",
+                               "X-RateLimit-Reset": str(int(time.time()) + 3600)}),
+            ]
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                client = github_client.GitHubClient(
+                    token="dummy", session=session, state_file=Path(tmp_dir) / "rate.json"
+                )
+                result = client.get("/user")
+                client._save_state()
+                reloaded = github_client.GitHubClient(
+                    token="dummy", session=Mock(headers={}), state_file=Path(tmp_dir) / "rate.json"
+                )
+                
+                # Un POST n'est pas rejoué après une erreur 5xx, sauf demande explicite
+                unsafe = Mock(headers={})
+                unsafe.request.side_effect = [response(502, {}), response(502, {}), response(201, {})]
+                client = github_client.GitHubClient(
+                    token="dummy", session=unsafe, state_file=Path(tmp_dir) / "rate.json"
+                )
+                with patch.object(github_client.time, "sleep"):
+                    posted = client.post("/repos/owner/repo/forks")
+                    first_calls = unsafe.request.call_count
+                    opted_in = client.post("/repos/owner/repo/forks", retry_unsafe=True)
+                    
+                    # Délai de lecture dépassé : un GET est rejoué, un POST non
+                    timeouts = Mock(headers={})
+                    timeouts.request.side_effect = [github_client.requests.ReadTimeout("slow"), response(200, {})]
+                    client = github_client.GitHubClient(
+                        token="dummy", session=timeouts, state_file=Path(tmp_dir) / "rate.json"
+                    )
+                    after_timeout = client.get("/orgs/OCA/repos")
+                    timeouts.request.side_effect = [github_client.requests.ReadTimeout("slow"), response(201, {})]
+                    try:
+                        client.post("/repos/owner/repo/forks")
+                        post_timeout_raised = False
+                    except github_client.requests.Timeout:
+                        post_timeout_raised = True
+            
+            if (result.status_code == 200 and session.request.call_count == 2
+                    and reloaded.rate_state.get("remaining") == 4321
+                    and posted.status_code == 502 and first_calls == 1 and opted_in.status_code == 201
+                    and after_timeout.status_code == 200 and post_timeout_raised and timeouts.request.call_count == 3):
+                self.log_test("GitHub Client Rate Limit", True, "Nouvel essai après Retry-After, quota persistant, POST non rejoué")
+            else:
+                self.log_test("GitHub Client Rate Limit", False, f"Résultat inattendu: {reloaded.rate_state}")
+                
+        except Exception as e:
+            self.log_test("GitHub Client Rate Limit", False, f"Erreur: {e}")
+    
+    async def test_translation_cache(self):
+        """Test du cache persistant des traductions"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import translate_description
+            import translation_glossary
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                db_path = Path(tmp_dir) / "translations.db"
+                # Glossaire vide : "Server tools" y figure et court-circuiterait le cache
+                with patch.object(translate_description, "TRANSLATION_CACHE_DB", db_path), \
+                     patch.object(translate_description, "load_glossary", return_value=translation_glossary.Glossary()):
+                    class FakeService(translate_description.TranslationService):
+                        name = "fake"
+                        translate = Mock(return_value="Outils serveur")
+                    
+                    service = FakeService()
+                    first = translate_description.TranslationManager()
+                    first.services = [service]
+                    first.translate("Server tools", "fr")
+                    
+                    # Nouvelle instance (= nouvelle invocation du script) sans service disponible
+                    second = translate_description.TranslationManager()
+                    second.services = []
+                    translated = second.translate("Server tools", "fr")
+            
+            if translated == "Outils serveur" and service.translate.call_count == 1:
+                self.log_test("Translation Cache", True, "Traduction réutilisée entre invocations")
+            else:
+                self.log_test("Translation Cache", False, f"Résultat inattendu: {translated}")
+                
+        except Exception as e:
+            self.log_test("Translation Cache", False, f"Erreur: {e}")
+    
+    async def test_translation_batch(self):
+        """Test de la traduction en lot"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import translate_description
+            import translation_glossary
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                # Glossaire vide : "web tools" et "server tools" y figurent
+                with patch.object(translate_description, "TRANSLATION_CACHE_DB", Path(tmp_dir) / "t.db"), \
+                     patch.object(translate_description, "load_glossary", return_value=translation_glossary.Glossary()):
+                    class FakeService(translate_description.TranslationService):
+                        name = "fake"
+                        translate_batch = Mock(side_effect=lambda texts, target, source: [t.upper() for t in texts])
+                    
+                    service = FakeService()
+                    manager = translate_description.TranslationManager()
+                    manager.services = [service]
+                    result = manager.translate_batch(["web tools", "server tools", "web tools"], "fr")
+            
+            sent = service.translate_batch.call_args[0][0]
+            if result == ["WEB TOOLS", "SERVER TOOLS", "WEB TOOLS"] and sent == ["web tools", "server tools"]:
+                self.log_test("Translation Batch", True, "Une requête groupée, doublons dédupliqués")
+            else:
+                self.log_test("Translation Batch", False, f"Résultat inattendu: {result} / {sent}")
+                
+        except Exception as e:
+            self.log_test("Translation Batch", False, f"Erreur: {e}")
+    
+    async def test_oca_mirror_cache(self):
+        """Test du cache de miroirs partagé entre clients (--reference + alternates relatifs)"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import oca_mirror_cache
+            
+            with self.git_sandbox() as tmp:
+                source = tmp / "source"
+                (source / "partner_firstname").mkdir(parents=True)
+                (source / "partner_firstname" / "__manifest__.py").write_text("{}")
+                self.git("init", "-q", "-b", "17.0", cwd=source)
+                self.git("add", ".", cwd=source)
+                self.git("commit", "-q", "-m", "init", cwd=source)
+                url = str(tmp / "remote" / "OCA" / "partner-contact.git")
+                self.git("clone", "-q", "--bare", str(source), url, cwd=tmp)
+                
+                with patch.object(oca_mirror_cache, "MIRROR_DIR", tmp / "root" / ".cache" / "mirrors"):
+                    clients = []
+                    for name in ("client_a", "client_b"):
+                        client = tmp / "root" / "clients" / name
+                        client.mkdir(parents=True)
+                        self.git("init", "-q", cwd=client)
+                        mirror = oca_mirror_cache.ensure_mirror(url)
+                        self.git("submodule", "add", "-q", "--reference", str(mirror), "-b", "17.0", url, "addons/partner-contact", cwd=client)
+                        oca_mirror_cache.relativize_alternates(client)
+                        clients.append(client)
+                    mirrors = list((tmp / "root" / ".cache" / "mirrors").glob("*/*.git"))
+                
+                alternates = [
+                    (c / ".git" / "modules" / "addons" / "partner-contact" / "objects" / "info" / "alternates").read_text().strip()
+                    for c in clients
+                ]
+                checked_out = all((c / "addons" / "partner-contact" / "partner_firstname" / "__manifest__.py").exists() for c in clients)
+            
+            if len(mirrors) == 1 and checked_out and all(a.startswith("../") and a.endswith("mirrors/OCA/partner-contact.git/objects") for a in alternates):
+                self.log_test("OCA Mirror Cache", True, "Un miroir partagé, alternates relatifs")
+            else:
+                self.log_test("OCA Mirror Cache", False, f"Résultat inattendu: {mirrors} / {alternates}")
+                
+        except Exception as e:
+            self.log_test("OCA Mirror Cache", False, f"Erreur: {e}")
+    
+    async def test_parallel_submodule_update(self):
+        """Test de la mise à jour parallèle des submodules (submodules inchangés ignorés)"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import oca_mirror_cache
+            import parallel_submodule_update
+            
+            with self.git_sandbox() as tmp, patch.object(oca_mirror_cache, "MIRROR_DIR", tmp / "mirrors"):
+                client = tmp / "client"
+                client.mkdir()
+                self.git("init", "-q", cwd=client)
+                remotes = {}
+                for name in ("web", "server-ux"):
+                    source = tmp / "src" / name
+                    source.mkdir(parents=True)
+                    self.git("init", "-q", "-b", "17.0", cwd=source)
+                    self.git("commit", "-q", "--allow-empty", "-m", "init", cwd=source)
+                    remotes[name] = str(tmp / "remote" / "OCA" / f"{name}.git")
+                    self.git("clone", "-q", "--bare", str(source), remotes[name], cwd=tmp)
+                    self.git("submodule", "add", "-q", "-b", "17.0", remotes[name], f"addons/{name}", cwd=client)
+                
+                # Nouveau commit en amont sur un seul des deux dépôts
+                self.git("commit", "-q", "--allow-empty", "-m", "fix", cwd=tmp / "src" / "web")
+                self.git("push", "-q", remotes["web"], "17.0", cwd=tmp / "src" / "web")
+                
+                report = parallel_submodule_update.update_client(client, jobs=2)
+            
+            statuses = {entry["path"]: entry["status"] for entry in report["submodules"]}
+            if statuses == {"addons/web": "updated", "addons/server-ux": "unchanged"}:
+                self.log_test("Parallel Submodule Update", True, f"Rapport: {report['summary']}")
+            else:
+                self.log_test("Parallel Submodule Update", False, f"Rapport inattendu: {report}")
+                
+        except Exception as e:
+            self.log_test("Parallel Submodule Update", False, f"Erreur: {e}")
+    
+    async def test_client_sparse_checkout(self):
+        """Test du checkout partiel : addons liés et leurs dépendances uniquement"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import client_sparse_checkout
+            
+            addons = {
+                "partner-contact": {"partner_firstname": ["base", "date_range"], "partner_contact_gender": ["base"]},
+                "server-ux": {"date_range": ["web"], "base_tier_validation": ["base"]},
+            }
+            with self.git_sandbox() as tmp:
+                client = tmp / "client"
+                client.mkdir()
+                self.git("init", "-q", cwd=client)
+                for repo, manifests in addons.items():
+                    source = tmp / "src" / repo
+                    for addon, depends in manifests.items():
+                        (source / addon).mkdir(parents=True)
+                        (source / addon / "__manifest__.py").write_text(f"{{'name': '{addon}', 'depends': {depends}}}")
+                    self.git("init", "-q", "-b", "17.0", cwd=source)
+                    self.git("add", "-A", cwd=source)
+                    self.git("commit", "-q", "-m", "init", cwd=source)
+                    self.git("submodule", "add", "-q", "-b", "17.0", str(source), f"addons/{repo}", cwd=client)
+                (client / "extra-addons").mkdir()
+                (client / "extra-addons" / "partner_firstname").symlink_to("../addons/partner-contact/partner_firstname")
+                
+                disabled = client_sparse_checkout.apply(client)
+                enabled = client_sparse_checkout.enable(client)
+                narrowed = sorted(p.name for p in (client / "addons" / "server-ux").iterdir() if p.name != ".git")
+                client_sparse_checkout.apply(client, {"server-ux": ["base_tier_validation"]})
+                widened = (client / "addons" / "server-ux" / "base_tier_validation").exists()
+                client_sparse_checkout.disable(client)
+                restored = (client / "addons" / "partner-contact" / "partner_contact_gender").exists()
+            
+            checked_out = {repo: info["addons"] for repo, info in enabled["repositories"].items()}
+            expected = {"partner-contact": ["partner_firstname"], "server-ux": ["date_range"]}
+            if not disabled["repositories"] and checked_out == expected and narrowed == ["date_range"] and widened and restored:
+                self.log_test("Client Sparse Checkout", True, f"Addons extraits: {checked_out}")
+            else:
+                self.log_test("Client Sparse Checkout", False, f"Résultat inattendu: {disabled} / {enabled} / {narrowed} / {widened} / {restored}")
+                
+        except Exception as e:
+            self.log_test("Client Sparse Checkout", False, f"Erreur: {e}")
+    
+    async def test_remote_branch_cache(self):
+        """Test du cache des branches distantes (lecture sans réseau, rafraîchissement en arrière-plan)"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import oca_addon_index
+            import remote_branch_cache
+            
+            with self.git_sandbox() as tmp:
+                source = tmp / "web"
+                source.mkdir()
+                self.git("init", "-q", "-b", "17.0", cwd=source)
+                self.git("commit", "-q", "--allow-empty", "-m", "init", cwd=source)
+                self.git("branch", "16.0", cwd=source)
+                catalog = {"web": {"url": str(source)}, "missing-repo": {"url": str(tmp / "missing")}}
+                
+                with patch.object(oca_addon_index, "load_oca_repositories", return_value=catalog), \
+                     patch.object(remote_branch_cache, "spawn_refresh") as spawn:
+                    cache = remote_branch_cache.RemoteBranchCache(tmp / "branches.db", ttl=3600, stale_ttl=86400)
+                    result = remote_branch_cache.validate("17.0", ["web", "missing-repo"], cache)
+                    versions = (cache.lookup("web", "16.0"), cache.lookup("web", "18.0"))
+                    
+                    # Entrée périmée : réponse depuis le cache, rafraîchissement délégué
+                    cache.conn.execute("UPDATE remote_repositories SET checked_at = checked_at - 7200")
+                    with patch.object(remote_branch_cache, "ls_remote_branches") as ls_remote:
+                        stale = cache.lookup("web", "17.0")
+                    network_calls = ls_remote.call_count
+                    revalidated = spawn.call_args_list[-1][0][0]
+                    cache.close()
+            
+            if (result == {"valid": ["web"], "invalid": ["missing-repo"], "unknown": []}
+                    and versions == (True, False) and stale is True and network_calls == 0
+                    and revalidated == ["web"]):
+                self.log_test("Remote Branch Cache", True, f"Validation: {result}")
+            else:
+                self.log_test("Remote Branch Cache", False, f"Résultat inattendu: {result} / {versions} / {stale} / {network_calls} / {revalidated}")
+                
+        except Exception as e:
+            self.log_test("Remote Branch Cache", False, f"Erreur: {e}")
+    
+    async def test_client_backup(self):
+        """Test des sauvegardes incrémentales (submodules par commit, blocs dédupliqués)"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import client_backup
+            import oca_mirror_cache
+            
+            with self.git_sandbox() as tmp:
+                source = tmp / "src" / "web"
+                (source / "web_widget").mkdir(parents=True)
+                (source / "web_widget" / "__manifest__.py").write_text("{'name': 'web_widget'}")
+                self.git("init", "-q", "-b", "17.0", cwd=source)
+                self.git("add", "-A", cwd=source)
+                self.git("commit", "-q", "-m", "init", cwd=source)
+                
+                client = tmp / "clients" / "acme"
+                client.mkdir(parents=True)
+                self.git("init", "-q", cwd=client)
+                self.git("submodule", "add", "-q", "-b", "17.0", str(source), "addons/web", cwd=client)
+                (client / "config").mkdir()
+                (client / "config" / "odoo.conf").write_text("[options]\n")
+                (client / "extra-addons").mkdir()
+                (client / "extra-addons" / "web_widget").symlink_to("../addons/web/web_widget")
+                
+                with patch.object(client_backup, "CLIENTS_DIR", tmp / "clients"), \
+                     patch.object(oca_mirror_cache, "MIRROR_DIR", tmp / "mirrors"):
+                    store = client_backup.ChunkStore(tmp / "backups")
+                    first = client_backup.snapshot("acme", store)
+                    second = client_backup.snapshot("acme", store)
+                    (client / "config" / "odoo.conf").write_text("[options]\nworkers = 2\n")
+                    third = client_backup.snapshot("acme", store)
+                    pruned = client_backup.prune("acme", 1, store)
+                    restored = client_backup.restore("acme", target=tmp / "restored", store=store)
+                
+                paths = {entry["path"] for entry in first["entries"]}
+                restored_conf = (tmp / "restored" / "config" / "odoo.conf").read_text()
+                restored_link = (tmp / "restored" / "extra-addons" / "web_widget" / "__manifest__.py").exists()
+            
+            submodule_excluded = not any(p.startswith(("addons/web/", ".git/modules")) for p in paths)
+            if (submodule_excluded and first["submodules"][0]["commit"]
+                    and second["stats"]["read_bytes"] == 0 and third["stats"]["new_chunks"] == 1
+                    and len(pruned["removed"]) == 2 and not restored["errors"]
+                    and restored_conf.endswith("workers = 2\n") and restored_link):
+                self.log_test("Client Backup", True, f"Incrémentale: {third['stats']}")
+            else:
+                self.log_test("Client Backup", False, f"Résultat inattendu: {second['stats']} / {third['stats']} / {pruned} / {restored}")
+                
+        except Exception as e:
+            self.log_test("Client Backup", False, f"Erreur: {e}")
+    
+    async def test_client_db_backup(self):
+        """Test de la sauvegarde en flux des bases et du filestore (docker simulé)"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import client_backup
+            import client_db_backup
+            
+            # Faux docker : pg_dump émet un flux, createdb/pg_restore enregistrent dans FAKE_DOCKER_STATE
+            fake_docker = textwrap.dedent("""\
+                #!/usr/bin/env python3
+                import os, shutil, sys
+                from pathlib import Path
+                state = Path(os.environ["FAKE_DOCKER_STATE"])
+                args = sys.argv[2:]
+                if args[0] == "-i":
+                    args = args[1:]
+                command, rest = args[1], args[2:]
+                if command == "psql":
+                    print("acme_prod")
+                elif command == "pg_dump":
+                    sys.stdout.buffer.write((f"DUMP {rest[-1]}\\n" * 50000).encode())
+                elif command == "createdb":
+                    (state / rest[-1]).mkdir(parents=True)
+                elif command == "dropdb":
+                    # Odoo garde des connexions ouvertes : seul --force permet la suppression
+                    if "--force" not in rest or os.environ.get("FAKE_DROPDB_ERROR"):
+                        sys.exit(os.environ.get("FAKE_DROPDB_ERROR") or "database is being accessed by other users")
+                    shutil.rmtree(state / rest[-1], ignore_errors=True)
+                elif command == "pg_restore":
+                    database = rest[rest.index("-d") + 1]
+                    (state / database / "restored").write_bytes(sys.stdin.buffer.read())
+                elif command == "test":
+                    sys.exit(1)
+            """)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                tmp = Path(tmp_dir)
+                (tmp / "bin").mkdir()
+                (tmp / "bin" / "docker").write_text(fake_docker)
+                (tmp / "bin" / "docker").chmod(0o755)
+                filestore = tmp / "clients" / "acme" / "data" / "filestore" / "acme_prod"
+                (filestore / "ab").mkdir(parents=True)
+                (filestore / "ab" / "attachment").write_bytes(b"pdf" * 1000)
+                env = {"PATH": f"{tmp / 'bin'}:{os.environ['PATH']}", "FAKE_DOCKER_STATE": str(tmp / "state")}
+                
+                with patch.dict(os.environ, env), \
+                     patch.object(client_backup, "CLIENTS_DIR", tmp / "clients"), \
+                     patch.object(client_backup, "BACKUP_DIR", tmp / "backups"):
+                    manifest = client_db_backup.backup("acme")
+                    shutil.rmtree(filestore)
+                    report = client_db_backup.restore("acme", jobs=1)
+                    replaced = client_db_backup.restore("acme", jobs=1, drop=True)
+                    with patch.dict(os.environ, {"FAKE_DROPDB_ERROR": "permission denied to drop database"}):
+                        refused = client_db_backup.restore("acme", jobs=1, drop=True)
+                
+                entry = manifest["databases"][0]
+                restored_dump = (tmp / "state" / "acme_prod" / "restored").read_bytes()
+                restored_file = (filestore / "ab" / "attachment").read_bytes()
+            
+            if (entry["dump"]["bytes"] == len("DUMP acme_prod\n") * 50000
+                    and entry["dump"]["stored_bytes"] < entry["dump"]["bytes"] / 10
+                    and entry["filestore"] and report["databases"][0]["status"] == "restored"
+                    and restored_dump == b"DUMP acme_prod\n" * 50000 and restored_file == b"pdf" * 1000
+                    and replaced["databases"][0]["status"] == "restored"
+                    and refused["databases"][0]["error"] == "acme_prod: permission denied to drop database"):
+                self.log_test("Client DB Backup", True, f"Dump {entry['dump']['bytes']} -> {entry['dump']['stored_bytes']} octets")
+            else:
+                self.log_test("Client DB Backup", False, f"Résultat inattendu: {manifest} / {report} / {replaced} / {refused}")
+                
+        except Exception as e:
+            self.log_test("Client DB Backup", False, f"Erreur: {e}")
+    
+    async def test_diagnostics_engine(self):
+        """Test des diagnostics en parallèle avec délai par vérification (docker simulé)"""
+        try:
+            from diagnostics import DiagnosticsEngine
+            
+            # Faux docker : pg_isready répond, le health check d'Odoo ne répond jamais
+            fake_docker = textwrap.dedent("""\
+                #!/usr/bin/env python3
+                import os, sys, time
+                args = sys.argv[1:]
+                if args[0] == "ps":
+                    print("odoo-acme\\trunning\\tUp 2 hours")
+                    print("postgresql-acme\\trunning\\tUp 2 hours")
+                elif args[0] == "exec" and args[2] == "pg_isready":
+                    time.sleep(0.5)
+                    print("/var/run/postgresql:5432 - accepting connections")
+                elif args[0] == "exec":
+                    with open(os.environ["FAKE_DOCKER_PID_FILE"], "w") as f:
+                        f.write(str(os.getpid()))
+                    time.sleep(30)
+            """)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                tmp = Path(tmp_dir)
+                (tmp / "bin").mkdir()
+                (tmp / "bin" / "docker").write_text(fake_docker)
+                (tmp / "bin" / "docker").chmod(0o755)
+                (tmp / "clients" / "acme").mkdir(parents=True)
+                (tmp / "clients" / "acme" / "docker-compose.yml").write_text("services: {}\n")
+                (tmp / "clients" / "beta").mkdir()
+                
+                with patch.dict(os.environ, {"PATH": f"{tmp / 'bin'}:{os.environ['PATH']}",
+                                             "FAKE_DOCKER_PID_FILE": str(tmp / "hung.pid")}):
+                    engine = DiagnosticsEngine(tmp, timeout=1.0, traefik_url="http://127.0.0.1:9")
+                    fleet = await engine.diagnose_all()
+                
+                # Le `docker exec` bloqué a été tué (et réclamé) à l'expiration du délai
+                try:
+                    os.kill(int((tmp / "hung.pid").read_text()), 0)
+                    hung_killed = False
+                except ProcessLookupError:
+                    hung_killed = True
+            
+            acme = {check["name"]: check for check in fleet["reports"][0]["checks"]}
+            beta = fleet["reports"][1]
+            if (acme["postgresql"]["status"] == "ok" and acme["odoo"]["message"].startswith("Timed out")
+                    and acme["traefik"]["status"] == "error" and fleet["reports"][0]["exit_code"] == 2
+                    and beta["checks"][0]["status"] == "error" and fleet["summary"] == {"error": 2}
+                    and fleet["duration"] < 2.5 and hung_killed):
+                self.log_test("Diagnostics Engine", True, f"2 clients diagnostiqués en {fleet['duration']}s, processus bloqué tué")
+            else:
+                self.log_test("Diagnostics Engine", False, f"Résultat inattendu (processus tué: {hung_killed}): {fleet}")
+                
+        except Exception as e:
+            self.log_test("Diagnostics Engine", False, f"Erreur: {e}")
+    
+    async def test_metrics(self):
+        """Test du registre de métriques et du format texte Prometheus"""
+        try:
+            from metrics import Metrics, container_families
+            
+            registry = Metrics()
+            with registry.track_tool("list_clients"):
+                await asyncio.sleep(0.01)
+            with registry.track_tool("list_clients") as call:
+                call.failed = True
+            try:
+                with registry.track_tool("create_client"):
+                    raise RuntimeError("boom")
+            except RuntimeError:
+                pass
+            registry.record_subprocess("make")
+            registry.register_cache("oca_search", lambda: (3, 1))
+            states = {
+                "odoo-acme": {"state": "running", "status": "Up 2 hours (healthy)"},
+                "postgresql-acme": {"state": "exited", "status": "Exited (0) 1 hour ago"},
+            }
+            text = registry.render(container_families(states, ["acme"]))
+            
+            expected = [
+                'mcp_tool_calls_total{tool="list_clients",status="success"} 1',
+                'mcp_tool_calls_total{tool="list_clients",status="failed"} 1',
+                'mcp_tool_calls_total{tool="create_client",status="error"} 1',
+                'mcp_tool_duration_seconds_bucket{tool="list_clients",le="+Inf"} 2',
+                'mcp_tool_duration_seconds_count{tool="list_clients"} 2',
+                'mcp_tool_in_flight{tool="create_client"} 0',
+                'mcp_subprocesses_total{program="make"} 1',
+                'mcp_cache_lookups_total{cache="oca_search",result="hit"} 3',
+                'odoo_client_container_up{client="acme",service="odoo"} 1',
+                'odoo_client_container_up{client="acme",service="postgresql"} 0',
+                'odoo_client_container_health{client="acme",service="odoo",health="healthy"} 1',
+                "# TYPE mcp_tool_duration_seconds histogram",
+            ]
+            missing = [line for line in expected if line not in text.splitlines()]
+            if not missing:
+                self.log_test("Metrics", True, f"{len(text.splitlines())} lignes exposées")
+            else:
+                self.log_test("Metrics", False, f"Lignes manquantes: {missing}")
+                
+        except Exception as e:
+            self.log_test("Metrics", False, f"Erreur: {e}")
+    
+    async def test_profiling(self):
+        """Test du profilage par échantillonnage et de la détection des blocages de la boucle"""
+        try:
+            import time
+            import profiling
+            
+            def blocking_call():
+                time.sleep(0.4)
+            
+            async def busy_loop():
+                deadline = time.monotonic() + 0.3
+                while time.monotonic() < deadline:
+                    sum(range(500000))
+                    await asyncio.sleep(0)
+            
+            monitor = profiling.LoopLagMonitor(threshold=0.1)
+            monitor.start()
+            await asyncio.sleep(0.1)
+            blocking_call()
+            await asyncio.sleep(0.1)
+            monitor.stop()
+            
+            result, _ = await asyncio.gather(profiling.profile(0.3, loop_only=True), busy_loop())
+            stalls = monitor.stats()["recent_stalls"]
+            
+            if (stalls and any("blocking_call" in frame for frame in stalls[0]["stack"])
+                    and result["samples"] > 0 and "busy_loop" in result["collapsed"]):
+                self.log_test("Profiling", True, f"{result['samples']} échantillons, blocage de {stalls[0]['blocked_for']}s détecté")
+            else:
+                self.log_test("Profiling", False, f"Résultat inattendu: {stalls} / {result}")
+                
+        except Exception as e:
+            self.log_test("Profiling", False, f"Erreur: {e}")
+    
+    async def test_benchmark_helpers(self):
+        """Test des statistiques et de la comparaison des benchmarks"""
+        try:
+            import subprocess
+            import benchmark
+            
+            stats = benchmark.latency_stats([i / 1000 for i in range(1, 101)])
+            previous = {"workloads": {"clients": {"throughput": 100.0, "latency": {"p95": 20.0}},
+                                      "terminal": {"throughput_mib_s": 2.0, "round_trip": {"p95": 10.0}}}}
+            current = {"workloads": {"clients": {"throughput": 150.0, "latency": {"p95": 10.0}},
+                                     "terminal": {"throughput_mib_s": 1.0, "round_trip": {"p95": 10.0}}}}
+            rows = {row["workload"]: row for row in benchmark.compare(previous, current)}
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                repo = benchmark.make_fake_repository(Path(tmp_dir), 3)
+                env = {"BENCH_CLIENTS_DIR": str(repo / "clients"), "PATH": os.environ["PATH"]}
+                output = subprocess.run([str(Path(tmp_dir) / "bin" / "make"), "list-clients"],
+                                        env=env, capture_output=True, text=True).stdout
+                has_makefile = (repo / "Makefile").exists()
+                search = benchmark.bench_oca_search(Path(tmp_dir), 200, rounds=1)
+            
+            if (stats["p50"] == 50.0 and stats["p95"] == 95.0 and stats["max"] == 100.0
+                    and rows["clients"]["throughput"]["change"] == 50.0 and rows["clients"]["p95"]["change"] == -50.0
+                    and rows["terminal"]["throughput"]["change"] == -50.0
+                    and "- client-02" in output and has_makefile
+                    and search["addons"] > 0 and search["queries"] == len(benchmark.SEARCH_QUERIES)):
+                self.log_test("Benchmark Helpers", True, "Percentiles, comparaison et commandes simulées corrects")
+            else:
+                self.log_test("Benchmark Helpers", False, f"Résultat inattendu: {stats} / {rows} / {output}")
+                
+        except Exception as e:
+            self.log_test("Benchmark Helpers", False, f"Erreur: {e}")
+    
+    async def test_lazy_http_imports(self):
+        """Test que le mode stdio ne charge ni FastAPI ni les modules du terminal"""
+        try:
+            import subprocess
+            
+            mcp_dir = Path(__file__).resolve().parent.parent
+            code = textwrap.dedent(f"""\
+                import json, sys
+                sys.path.insert(0, {str(mcp_dir)!r})
+                import mcp_server
+                server = mcp_server.OdooClientMCPServer({str(self.repo_path)!r})
+                print(json.dumps({{name: name in sys.modules for name in ("fastapi", "pty", "termios")}}))
+            """)
+            result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+            loaded = json.loads(result.stdout.strip().splitlines()[-1])
+            
+            if not any(loaded.values()):
+                self.log_test("Lazy HTTP Imports", True, "Aucune dépendance HTTP chargée en mode stdio")
+            else:
+                self.log_test("Lazy HTTP Imports", False, f"Modules chargés: {loaded}")
+                
+        except Exception as e:
+            self.log_test("Lazy HTTP Imports", False, f"Erreur: {e}")
+    
+    async def test_tool_batch(self):
+        """Test des appels groupés : parallélisme, dépendances et validation"""
+        try:
+            import time
+            from batch import BatchError, run_batch, validate_batch
+            
+            started_at = {}
+            
+            async def execute(name, arguments):
+                started_at[name] = time.monotonic()
+                await asyncio.sleep(0.2)
+                if name == "broken":
+                    raise RuntimeError("boom")
+                return {"content": name}, name == "failing"
+            
+            calls = validate_batch([
+                {"id": "a", "name": "first"},
+                {"id": "b", "name": "second"},
+                {"id": "c", "name": "after_a", "depends_on": ["a"]},
+                {"id": "d", "name": "broken"},
+                {"id": "e", "name": "after_d", "depends_on": ["d"]},
+                {"name": "failing"},
+            ])
+            begin = time.monotonic()
+            order = [result async for result in run_batch(calls, execute, concurrency=8)]
+            elapsed = time.monotonic() - begin
+            results = {result["id"]: result for result in order}
+            
+            rejected = []
+            for invalid in ([{"id": "x", "name": "t", "depends_on": ["y"]}, {"id": "y", "name": "t", "depends_on": ["x"]}],
+                            [{"id": "x", "name": "t"}, {"id": "x", "name": "t"}],
+                            [{"id": "x", "name": "t", "depends_on": ["missing"]}]):
+                try:
+                    validate_batch(invalid)
+                except BatchError:
+                    rejected.append(True)
+            
+            if (len(order) == 6 and elapsed < 0.55
+                    and started_at["second"] - started_at["first"] < 0.1
+                    and started_at["after_a"] - started_at["first"] >= 0.19
+                    and results["c"]["success"] and results["d"]["error"] == "boom"
+                    and results["e"].get("skipped") and "after_d" not in started_at
+                    and results["5"]["success"] is False and len(rejected) == 3):
+                self.log_test("Tool Batch", True, f"6 appels en {elapsed:.2f}s (dépendances respectées)")
+            else:
+                self.log_test("Tool Batch", False, f"Résultat inattendu: {results} en {elapsed:.2f}s, rejets {rejected}")
+                
+        except Exception as e:
+            self.log_test("Tool Batch", False, f"Erreur: {e}")
+    
+    async def test_admin_tools_http(self):
+        """Test du jeton d'administration sur profile_server appelé via /tools/call et /tools/batch"""
+        try:
+            import httpx
+            import mcp_server as mcp_module
+            
+            server = OdooClientMCPServer(str(self.repo_path))
+            if server.http_app is None:
+                self.log_test("Admin Tools HTTP", True, "FastAPI absent, test ignoré")
+                return
+            profile = AsyncMock(return_value=[mcp_module.types.TextContent(type="text", text="profiled")])
+            transport = httpx.ASGITransport(app=server.http_app)
+            call = {"name": "profile_server", "arguments": {"duration": 0.1}}
+            
+            with patch.dict(os.environ, {"MCP_ADMIN_TOKEN": "secret"}), patch.object(server, "_profile_server", profile):
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    anonymous = await client.post("/tools/call", json=call)
+                    batched = await client.post("/tools/batch", json={"calls": [call]})
+                    allowed = await client.post("/tools/call", json=call, headers={"X-Admin-Token": "secret"})
+            
+            if (anonymous.status_code == 403 and batched.status_code == 403 and profile.call_count == 1
+                    and allowed.json()["result"]["content"] == "profiled"):
+                self.log_test("Admin Tools HTTP", True, "profile_server refusé sans jeton via /tools/call et /tools/batch")
+            else:
+                self.log_test("Admin Tools HTTP", False,
+                              f"Résultat inattendu: {anonymous.status_code} / {batched.status_code} / {allowed.text}")
+                
+        except Exception as e:
+            self.log_test("Admin Tools HTTP", False, f"Erreur: {e}")
+    
+    async def test_single_flight(self):
+        """Test de la mutualisation des appels identiques simultanés"""
+        try:
+            from singleflight import SingleFlight, call_key
+            
+            executions = []
+            
+            async def list_clients(tag):
+                executions.append(tag)
+                await asyncio.sleep(0.1)
+                return f"result {len(executions)}"
+            
+            flight = SingleFlight()
+            key = call_key("list_clients", {})
+            concurrent = await asyncio.gather(*(flight.do(key, lambda: list_clients("a")) for _ in range(5)))
+            other = await flight.do(call_key("check_client", {"client": "acme"}), lambda: list_clients("b"))
+            again = await flight.do(key, lambda: list_clients("c"))
+            
+            same_key = call_key("check_client", {"client": "acme", "verbose": None}) == call_key("check_client", {"client": "acme"})
+            shared = sum(1 for _, was_shared in concurrent if was_shared)
+            
+            if (executions == ["a", "b", "c"] and {result for result, _ in concurrent} == {"result 1"}
+                    and shared == 4 and other == ("result 2", False) and again == ("result 3", False)
+                    and same_key and len(flight) == 0):
+                self.log_test("Single Flight", True, "5 appels identiques pour 1 exécution")
+            else:
+                self.log_test("Single Flight", False, f"Résultat inattendu: {executions} / {concurrent}")
+                
+        except Exception as e:
+            self.log_test("Single Flight", False, f"Erreur: {e}")
+    
+    async def test_output_store(self):
+        """Test du stockage sur disque et de la pagination des sorties volumineuses"""
+        try:
+            from output_store import OutputStore, OutputNotFoundError, parse_range
+            
+            temp_dir = tempfile.mkdtemp()
+            try:
+                store = OutputStore(temp_dir, threshold=4096, max_bytes=250000)
+                small = store.spill_text("ok")
+                
+                # Caractères multi-octets pour couper des pages au milieu d'un caractère
+                text = "".join(f"ligne {i} — état ✅ déployé\n" for i in range(2000))
+                summary = store.spill_text(text, source="get_client_logs")
+                handle = summary.split("handle ")[1].split(":")[0]
+                pages = [store.page(handle, 0, 1024)]
+                while pages[-1]["page"] + 1 < pages[-1]["pages"]:
+                    pages.append(store.page(handle, pages[-1]["page"] + 1, 1024))
+                reassembled = "".join(page["content"] for page in pages)
+                
+                with tempfile.TemporaryFile() as stream:
+                    stream.write(text.encode("utf-8"))
+                    file_summary = store.spill_file(stream, "make stdout")
+                file_handle = file_summary.split("handle ")[1].split(":")[0]
+                
+                # Dépassement de la taille maximale : les sorties les plus anciennes sont supprimées
+                store.spill_text(text * 2)
+                try:
+                    store.page(handle)
+                    evicted = False
+                except OutputNotFoundError:
+                    evicted = True
+                
+                ranges = (parse_range("bytes=0-99", 1000), parse_range("bytes=900-", 1000), parse_range("bytes=-10", 1000))
+                try:
+                    parse_range("bytes=2000-", 1000)
+                    unsatisfiable = False
+                except ValueError:
+                    unsatisfiable = True
+                
+                if (small == "ok" and len(summary) < len(text) and summary.startswith("ligne 0")
+                        and summary.rstrip().endswith("ligne 1999 — état ✅ déployé")
+                        and reassembled == text and len(pages) > 10
+                        and store.read_range(file_handle, 0, 7) == b"ligne 0"
+                        and evicted and ranges == ((0, 100), (900, 1000), (990, 1000)) and unsatisfiable):
+                    self.log_test("Output Store", True, f"{len(pages)} pages recomposées, éviction et plages OK")
+                else:
+                    self.log_test("Output Store", False, f"Résultat inattendu: {summary[:200]} / {evicted} / {ranges}")
+                store.close()
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                
+        except Exception as e:
+            self.log_test("Output Store", False, f"Erreur: {e}")
+    
+    async def test_translation_glossary(self):
+        """Test du glossaire hors ligne consulté avant les services"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import translate_description
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                with patch.object(translate_description, "TRANSLATION_CACHE_DB", Path(tmp_dir) / "t.db"):
+                    class FakeService(translate_description.TranslationService):
+                        name = "fake"
+                        translate = Mock(return_value="traduction du service")
+                        translate_batch = Mock(side_effect=lambda texts, target, source: [f"[{t}]" for t in texts])
+                    
+                    service = FakeService()
+                    manager = translate_description.TranslationManager()
+                    manager.services = [service]
+                    # Le glossaire l'emporte aussi sur une entrée de cache plus ancienne
+                    text = "Project supervised by the Banking PSC"
+                    key = manager._get_cache_key(text, "fr", "en")
+                    manager.cache.set(key, text, "en", "fr", "ancienne traduction", "fake")
+                    single = manager.translate(text, "fr")
+                    batch = manager.translate_batch(["OCA module", "Tools for accounting and invoicing", "Nothing known"], "fr")
+            
+            sent = service.translate_batch.call_args[0][0]
+            expected = ["Module OCA", "Outils de comptabilité et facturation", "[Nothing known]"]
+            if (single == "Projet supervisé par le PSC Banking" and service.translate.call_count == 0
+                    and batch == expected and sent == ["Nothing known"]):
+                self.log_test("Translation Glossary", True, "Phrases récurrentes traduites hors ligne")
+            else:
+                self.log_test("Translation Glossary", False, f"Résultat inattendu: {single} / {batch} / {sent}")
+                
+        except Exception as e:
+            self.log_test("Translation Glossary", False, f"Erreur: {e}")
+    
+    async def test_fill_oca_descriptions(self):
+        """Test du pipeline de complétion des descriptions OCA"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import fill_oca_descriptions
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                descriptions_file = Path(tmp_dir) / "oca_descriptions.json"
+                descriptions_file.write_text(json.dumps({
+                    "web": {"fr": "", "en": "OCA module"},
+                    "stock-logistics-workflow": {"fr": "Module OCA", "en": ""},
+                    "server-tools": {"fr": "Outils serveur", "en": "Server tools"},
+                }))
+                sources = {"web": "Web addons", "stock-logistics-workflow": None}
+                translate = lambda self, text, lang: f"{lang}:{text}"
+                
+                with patch.object(fill_oca_descriptions, "GitHubClient"), \
+                     patch.object(fill_oca_descriptions, "get_github_description", side_effect=lambda repo, client: sources[repo]), \
+                     patch.object(fill_oca_descriptions.DescriptionPipeline, "_translate", translate):
+                    report = await fill_oca_descriptions.fill_descriptions_async(["fr", "en"], descriptions_file=descriptions_file)
+                
+                result = json.loads(descriptions_file.read_text())
+                backups = list(Path(tmp_dir).glob("oca_descriptions.json.backup.*"))
+            
+            expected = {
+                "web": {"fr": "fr:Web addons", "en": "en:Web addons"},
+                "stock-logistics-workflow": {"fr": "Gestion de stock", "en": "Stock management"},
+                "server-tools": {"fr": "Outils serveur", "en": "Server tools"},
+            }
+            if result == expected and report["missing"] == 4 and report["remaining"] == 0 and len(backups) == 1:
+                self.log_test("Fill OCA Descriptions", True, "Entrées manquantes et génériques complétées en une écriture")
+            else:
+                self.log_test("Fill OCA Descriptions", False, f"Résultat inattendu: {result} / {report}")
+                
+        except Exception as e:
+            self.log_test("Fill OCA Descriptions", False, f"Erreur: {e}")
+    
+    async def test_translation_hedged(self):
+        """Test du mode concurrent avec de faux serveurs LibreTranslate locaux"""
+        try:
+            import threading
+            import time
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+            OdooClientMCPServer(str(self.repo_path))
+            import translate_description
+            
+            def fake_server(delay, status=200):
+                class Handler(BaseHTTPRequestHandler):
+                    def do_POST(self):
+                        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                        time.sleep(delay)
+                        payload = json.dumps({"translatedText": f"[{delay}] {body['q']}"}).encode()
+                        self.send_response(status)
+                        self.send_header("Content-Type", "application/json")
+                        self.send_header("Content-Length", str(len(payload)))
+                        self.end_headers()
+                        self.wfile.write(payload)
+                    
+                    def log_message(self, *args):
+                        pass
+                
+                server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                return server, f"http://127.0.0.1:{server.server_port}"
+            
+            broken, broken_url = fake_server(0, status=500)
+            slow, slow_url = fake_server(3)
+            fast, fast_url = fake_server(0.05)
+            try:
+                with tempfile.TemporaryDirectory() as tmp_dir, \
+                     patch.object(translate_description, "TRANSLATION_CACHE_DB", Path(tmp_dir) / "t.db"), \
+                     patch.dict(os.environ, {"TRANSLATION_SERVICES": "libretranslate",
+                                             "TRANSLATION_LIBRETRANSLATE_URLS": f"{broken_url},{slow_url},{fast_url}"}):
+                    manager = translate_description.TranslationManager(hedged=True)
+                    manager.hedge_delay = 0.2
+                    start = time.time()
+                    first = manager.translate("web", "fr")
+                    elapsed = time.time() - start
+                    # Relégué dès son premier échec, le point d'accès cassé ne serait plus
+                    # sollicité : le disjoncteur s'ouvre sur le taux de succès moyen
+                    broken_id = f"libretranslate:{broken_url}"
+                    breaker_open = not manager.health.allow(broken_id)
+                    order = [e.id for e in manager._endpoints()]
+                    # Délai écoulé : semi-ouvert, il repasse en tête pour une tentative
+                    manager.health.state[broken_id][1] = time.time() - 1
+                    probe_first = manager._endpoints()[0].id == broken_id
+            finally:
+                for server in (broken, slow, fast):
+                    server.shutdown()
+            
+            if (first == "[0.05] web" and elapsed < 2 and breaker_open
+                    and f"libretranslate:{broken_url}" not in order and probe_first):
+                self.log_test("Translation Hedged", True, f"Réponse la plus rapide en {elapsed:.2f}s, disjoncteur ouvert puis semi-ouvert")
+            else:
+                self.log_test("Translation Hedged", False, f"Résultat inattendu: {first} en {elapsed:.2f}s, disjoncteur {breaker_open}, ordre {order}")
+                
+        except Exception as e:
+            self.log_test("Translation Hedged", False, f"Erreur: {e}")
+    
+    async def test_translation_adaptive_order(self):
+        """Test de l'ordre adaptatif des services de traduction"""
+        try:
+            OdooClientMCPServer(str(self.repo_path))
+            import translate_description
+            
+            class FakeService(translate_description.TranslationService):
+                def __init__(self, name):
+                    self.name = name
+                
+                def translate(self, text, target_lang, source_lang="en"):
+                    return text
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                with patch.object(translate_description, "TRANSLATION_CACHE_DB", Path(tmp_dir) / "t.db"):
+                    manager = translate_description.TranslationManager()
+                    manager.services = [FakeService("slow"), FakeService("fast")]
+                    for _ in range(3):
+                        manager.stats.record("slow", 2.0, True)
+                        manager.stats.record("fast", 0.2, True)
+                    manager.stats.record("slow", 5.0, None)  # requête abandonnée
+                    
+                    # Les statistiques sont relues par une nouvelle instance
+                    reloaded = translate_description.TranslationManager()
+                    reloaded.services = manager.services
+                    order = [endpoint.id for endpoint in reloaded._endpoints()]
+            
+            if order == ["fast", "slow"]:
+                self.log_test("Translation Adaptive Order", True, "Le service le plus rapide passe en tête")
+            else:
+                self.log_test("Translation Adaptive Order", False, f"Ordre inattendu: {order}")
+                
+        except Exception as e:
+            self.log_test("Translation Adaptive Order", False, f"Erreur: {e}")
+    
     async def run_all_tests(self):
         """Lance tous les tests"""
         print("🧪 Démarrage des tests unitaires du serveur MCP...")
@@ -392,7 +1610,35 @@ class TestMCPServer:
             self.test_tool_calls_mapping,
             self.test_delete_client_workflow,
             self.test_performance,
-            self.test_error_handling
+            self.test_error_handling,
+            self.test_oca_addon_index,
+            self.test_oca_addon_index_sources,
+            self.test_list_oca_modules_search,
+            self.test_dependency_resolver,
+            self.test_resolve_dependencies_tool,
+            self.test_incremental_catalog_refresh,
+            self.test_github_client_rate_limit,
+            self.test_translation_cache,
+            self.test_translation_batch,
+            self.test_translation_hedged,
+            self.test_translation_adaptive_order,
+            self.test_fill_oca_descriptions,
+            self.test_translation_glossary,
+            self.test_oca_mirror_cache,
+            self.test_parallel_submodule_update,
+            self.test_client_sparse_checkout,
+            self.test_remote_branch_cache,
+            self.test_client_backup,
+            self.test_client_db_backup,
+            self.test_diagnostics_engine,
+            self.test_metrics,
+            self.test_profiling,
+            self.test_benchmark_helpers,
+            self.test_lazy_http_imports,
+            self.test_tool_batch,
+            self.test_admin_tools_http,
+            self.test_single_flight,
+            self.test_output_store
         ]
         
         # Exécuter chaque test
@@ -105,7 +105,25 @@ if [ -d "$SUBMODULE_PATH" ]; then
     exit 1
 fi
 
-git submodule add -b "$ODOO_VERSION" "$MODULE_URL" "$SUBMODULE_PATH"
+# Dépôts OCA : objets partagés avec le miroir local (un seul téléchargement pour tous les clients)
+MIRRORED=false
+if MIRROR_PATH=$(python3 "$SCRIPT_DIR/oca_mirror_cache.py" path "$MODULE_URL" 2>/dev/null); then
+    if git submodule add --reference "$MIRROR_PATH" -b "$ODOO_VERSION" "$MODULE_URL" "$SUBMODULE_PATH"; then
+        MIRRORED=true
+    else
+        echo_warning "Échec via le miroir local, clonage direct depuis $MODULE_URL"
+        # Restes de l'ajout interrompu : .git/modules/<chemin> bloquerait le nouvel essai
+        git rm --cached --quiet -- "$SUBMODULE_PATH" 2>/dev/null || true
+        git config -f .gitmodules --remove-section "submodule.$SUBMODULE_PATH" 2>/dev/null || true
+        git config --remove-section "submodule.$SUBMODULE_PATH" 2>/dev/null || true
+        rm -rf -- "$SUBMODULE_PATH" ".git/modules/$SUBMODULE_PATH"
+    fi
+fi
+
+if [ "$MIRRORED" = false ]; then
+    git submodule add -b "$ODOO_VERSION" "$MODULE_URL" "$SUBMODULE_PATH"
+fi
+python3 "$SCRIPT_DIR/oca_mirror_cache.py" relativize . >/dev/null || true
 
 echo_success "Submodule '$MODULE_KEY' ajouté avec succès"
 
@@ -167,3 +185,6 @@ else
     echo_info "  ./scripts/link_modules.sh $SUBMODULE_PATH <nom_du_module>"
     echo_info "Ou relancez ce script avec --all ou --link module1,module2"
 fi
+
+# Checkout partiel (si activé pour ce client) : ne garder que les addons liés et leurs dépendances
+python3 "$SCRIPT_DIR/client_sparse_checkout.py" apply . >/dev/null || true
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Sauvegardes incrémentales des clients dans un magasin adressé par contenu
+
+Le contenu des submodules (Odoo, dépôts OCA, Enterprise) n'est pas copié : il
+est re-téléchargeable, seuls l'URL, la branche et le commit extrait sont
+enregistrés, et .git/modules est ignoré. Les fichiers bruts de PostgreSQL
+(data/postgresql) le sont aussi : les bases sont sauvegardées par pg_dump
+(client_db_backup.py). Le reste du client (configuration, scripts, historique
+git du client...) est découpé en blocs de CHUNK_SIZE octets, stockés une
+seule fois dans backups/chunks sous leur empreinte SHA-256 et compressés en
+zstd (module zstandard) ou, à défaut, en zlib.
+
+Une sauvegarde est un manifeste JSON (backups/snapshots/<client>/<id>.json).
+Les fichiers dont la taille, la date et le mode n'ont pas changé depuis la
+sauvegarde précédente ne sont pas relus : leurs blocs sont repris tels quels.
+
+Usage :
+    client_backup.py snapshot CLIENT [--json]
+    client_backup.py list [CLIENT] [--json]
+    client_backup.py prune CLIENT [--keep N]
+    client_backup.py restore CLIENT [--snapshot ID] [--target DIR]
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import stat
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import oca_mirror_cache
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CLIENTS_DIR = ROOT_DIR / "clients"
+BACKUP_DIR = Path(os.environ.get("CLIENT_BACKUP_DIR", ROOT_DIR / "backups"))
+CHUNK_SIZE = 1024 * 1024
+POSTGRES_DATA_DIR = os.path.join("data", "postgresql")
+DEFAULT_KEEP = 7
+DEFAULT_JOBS = 4
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+# Premier octet de chaque bloc stocké : algorithme de compression
+CODEC_ZSTD = b"Z"
+CODEC_ZLIB = b"z"
+
+
+class BackupError(Exception):
+    """Sauvegarde ou restauration impossible"""
+
+
+def compression_name() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def compress(data: bytes) -> bytes:
+    if zstandard is not None:
+        return CODEC_ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return CODEC_ZLIB + zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(blob: bytes) -> bytes:
+    codec, payload = blob[:1], blob[1:]
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(payload)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise BackupError("Bloc compressé en zstd : installez le module zstandard (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise BackupError("Bloc corrompu (algorithme de compression inconnu)")
+
+
+class ChunkStore:
+    """Magasin de blocs adressés par leur SHA-256, et manifestes des sauvegardes"""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or BACKUP_DIR)
+        self.chunks_dir = self.root / "chunks"
+        self.snapshots_dir = self.root / "snapshots"
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest[2:]
+
+    @contextmanager
+    def locked(self, exclusive: bool = False) -> Iterator[None]:
+        """Verrou partagé pour les sauvegardes, exclusif pour le nettoyage des blocs"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """Stocke un bloc s'il est nouveau ; renvoie son empreinte et la taille ajoutée"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        if path.exists():
+            return digest, 0
+        blob = compress(data)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)
+        return digest, len(blob)
+
+    def get(self, digest: str) -> bytes:
+        try:
+            data = decompress(self._chunk_path(digest).read_bytes())
+        except FileNotFoundError:
+            raise BackupError(f"Bloc manquant dans le magasin: {digest}")
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise BackupError(f"Bloc corrompu: {digest}")
+        return data
+
+    def manifests(self, client: Optional[str] = None) -> List[Path]:
+        """Manifestes, du plus ancien au plus récent"""
+        pattern = f"{client}/*.json" if client else "*/*.json"
+        return sorted(self.snapshots_dir.glob(pattern), key=lambda p: (p.parent.name, p.stem))
+
+    def load(self, client: str, snapshot_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Manifeste d'une sauvegarde (la plus récente par défaut)"""
+        if snapshot_id:
+            path = self.snapshots_dir / client / f"{snapshot_id}.json"
+        else:
+            manifests = self.manifests(client)
+            path = manifests[-1] if manifests else None
+        if path is None or not path.exists():
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def save(self, manifest: Dict[str, Any]) -> Path:
+        directory = self.snapshots_dir / manifest["client"]
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{manifest['id']}.json"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return path
+
+
+def _git(args: List[str], cwd: Path) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, timeout=600)
+
+
+def submodule_states(client_dir: Path) -> List[Dict[str, Any]]:
+    """Submodules du client avec le commit actuellement extrait"""
+    states = []
+    for submodule in oca_mirror_cache.list_submodules(client_dir):
+        path = client_dir / submodule["path"]
+        commit = None
+        if (path / ".git").exists():
+            result = _git(["rev-parse", "HEAD"], path)
+            commit = result.stdout.strip() if result.returncode == 0 else None
+        states.append({
+            "name": submodule["name"],
+            "path": submodule["path"],
+            "url": submodule["url"],
+            "branch": submodule.get("branch"),
+            "commit": commit,
+        })
+    return states
+
+
+def _scan(client_dir: Path, excluded: Set[str]) -> Iterator[Tuple[str, os.stat_result]]:
+    """Chemins relatifs (hors exclusions) avec leur stat, sans suivre les liens"""
+    for current, dirnames, filenames in os.walk(client_dir):
+        relative_dir = os.path.relpath(current, client_dir)
+        kept = []
+        for name in sorted(dirnames):
+            relative = os.path.normpath(os.path.join(relative_dir, name))
+            if relative in excluded:
+                continue
+            path = os.path.join(current, name)
+            if os.path.islink(path):
+                filenames.append(name)  # lien vers un dossier : enregistré comme lien
+            else:
+                kept.append(name)
+                yield relative, os.lstat(path)
+        dirnames[:] = kept
+        for name in sorted(filenames):
+            relative = os.path.normpath(os.path.join(relative_dir, name))
+            if relative not in excluded:
+                yield relative, os.lstat(os.path.join(current, name))
+
+
+def snapshot(client: str, store: Optional[ChunkStore] = None, jobs: int = DEFAULT_JOBS) -> Dict[str, Any]:
+    """Sauvegarde incrémentale d'un client ; renvoie le manifeste écrit"""
+    store = store or ChunkStore()
+    client_dir = CLIENTS_DIR / client
+    if not client_dir.is_dir():
+        raise BackupError(f"Client '{client}' introuvable dans {CLIENTS_DIR}")
+
+    started = time.monotonic()
+    submodules = submodule_states(client_dir)
+    excluded = {os.path.normpath(s["path"]) for s in submodules} | {os.path.join(".git", "modules"), POSTGRES_DATA_DIR}
+    parent = store.load(client)
+    previous = {
+        entry["path"]: entry for entry in (parent or {}).get("entries", []) if entry["type"] == "file"
+    }
+    stats = {"files": 0, "bytes": 0, "read_bytes": 0, "reused_files": 0, "new_chunks": 0, "stored_bytes": 0}
+    stats_lock = threading.Lock()
+
+    def read(entry: Dict[str, Any]) -> Dict[str, Any]:
+        chunks, read_bytes, new_chunks, stored_bytes = [], 0, 0, 0
+        with open(client_dir / entry["path"], "rb") as f:
+            for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest, stored = store.put(block)
+                chunks.append(digest)
+                read_bytes += len(block)
+                if stored:
+                    new_chunks += 1
+                    stored_bytes += stored
+        entry["chunks"] = chunks
+        with stats_lock:
+            stats["read_bytes"] += read_bytes
+            stats["new_chunks"] += new_chunks
+            stats["stored_bytes"] += stored_bytes
+        return entry
+
+    entries: List[Dict[str, Any]] = []
+    to_read: List[Dict[str, Any]] = []
+    with store.locked():
+        for relative, st in _scan(client_dir, excluded):
+            if stat.S_ISDIR(st.st_mode):
+                entries.append({"path": relative, "type": "dir", "mode": stat.S_IMODE(st.st_mode)})
+            elif stat.S_ISLNK(st.st_mode):
+                entries.append({"path": relative, "type": "symlink", "target": os.readlink(client_dir / relative)})
+            elif stat.S_ISREG(st.st_mode):
+                entry = {
+                    "path": relative, "type": "file", "mode": stat.S_IMODE(st.st_mode),
+                    "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                }
+                stats["files"] += 1
+                stats["bytes"] += st.st_size
+                known = previous.get(relative)
+                if known and (known["size"], known["mtime_ns"], known["mode"]) == (st.st_size, st.st_mtime_ns, entry["mode"]):
+                    entry["chunks"] = known["chunks"]
+                    stats["reused_files"] += 1
+                else:
+                    to_read.append(entry)
+                entries.append(entry)
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            list(executor.map(read, to_read))
+
+        snapshot_id = time.strftime("%Y%m%dT%H%M%S")
+        suffix = 1
+        while (store.snapshots_dir / client / f"{snapshot_id}.json").exists():
+            snapshot_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{suffix}"
+            suffix += 1
+        stats["duration"] = round(time.monotonic() - started, 2)
+        manifest = {
+            "id": snapshot_id,
+            "client": client,
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "parent": parent["id"] if parent else None,
+            "compression": compression_name(),
+            "chunk_size": CHUNK_SIZE,
+            "stats": stats,
+            "submodules": submodules,
+            "entries": entries,
+        }
+        store.save(manifest)
+    return manifest
+
+
+def list_snapshots(client: Optional[str] = None, store: Optional[ChunkStore] = None) -> List[Dict[str, Any]]:
+    store = store or ChunkStore()
+    snapshots = []
+    for path in store.manifests(client):
+        with open(path, "r") as f:
+            manifest = json.load(f)
+        snapshots.append({
+            "client": manifest["client"],
+            "id": manifest["id"],
+            "created_at": manifest["created_at"],
+            "submodules": len(manifest["submodules"]),
+            **manifest["stats"],
+        })
+    return snapshots
+
+
+def prune(client: str, keep: int = DEFAULT_KEEP, store: Optional[ChunkStore] = None) -> Dict[str, Any]:
+    """Ne garde que les `keep` dernières sauvegardes du client, puis supprime les blocs orphelins"""
+    store = store or ChunkStore()
+    manifests = store.manifests(client)
+    removed = manifests[:-keep] if keep > 0 else manifests
+    report = {"client": client, "removed": [path.stem for path in removed], "freed_chunks": 0, "freed_bytes": 0}
+
+    with store.locked(exclusive=True):
+        for path in removed:
+            path.unlink()
+        referenced: Set[str] = set()
+        for path in store.manifests():
+            with open(path, "r") as f:
+                for entry in json.load(f)["entries"]:
+                    referenced.update(entry.get("chunks", ()))
+        for chunk in store.chunks_dir.glob("*/*"):
+            if chunk.parent.name + chunk.name not in referenced:
+                report["freed_bytes"] += chunk.stat().st_size
+                report["freed_chunks"] += 1
+                chunk.unlink()
+    return report
+
+
+def restore(
+    client: str,
+    snapshot_id: Optional[str] = None,
+    target: Optional[Path] = None,
+    store: Optional[ChunkStore] = None,
+    jobs: int = DEFAULT_JOBS,
+) -> Dict[str, Any]:
+    """Restaure une sauvegarde puis ré-extrait les submodules aux commits enregistrés"""
+    store = store or ChunkStore()
+    manifest = store.load(client, snapshot_id)
+    if manifest is None:
+        raise BackupError(f"Aucune sauvegarde '{snapshot_id or 'récente'}' pour le client '{client}'")
+    target = Path(target or CLIENTS_DIR / client)
+    if target.exists() and any(target.iterdir()):
+        raise BackupError(f"{target} existe déjà et n'est pas vide")
+
+    started = time.monotonic()
+    target.mkdir(parents=True, exist_ok=True)
+    entries = manifest["entries"]
+    for entry in entries:
+        if entry["type"] == "dir":
+            (target / entry["path"]).mkdir(parents=True, exist_ok=True)
+
+    def write(entry: Dict[str, Any]):
+        path = target / entry["path"]
+        with open(path, "wb") as f:
+            for digest in entry["chunks"]:
+                f.write(store.get(digest))
+        os.chmod(path, entry["mode"])
+        os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        list(executor.map(write, [entry for entry in entries if entry["type"] == "file"]))
+    for entry in entries:
+        if entry["type"] == "symlink":
+            (target / entry["path"]).symlink_to(entry["target"])
+    for entry in reversed(entries):
+        if entry["type"] == "dir":
+            os.chmod(target / entry["path"], entry["mode"])
+
+    # Submodules : re-téléchargés (via les miroirs locaux) puis replacés sur le commit sauvegardé
+    report: Dict[str, Any] = {"client": client, "snapshot": manifest["id"], "target": str(target), "errors": []}
+    initialized = oca_mirror_cache.init_submodules(target, jobs)
+    report["errors"].extend(initialized["errors"])
+    for submodule in manifest["submodules"]:
+        path = target / submodule["path"]
+        if not submodule["commit"] or not (path / ".git").exists():
+            continue
+        if submodule["branch"]:
+            args = ["checkout", "-q", "-B", submodule["branch"], submodule["commit"]]
+        else:
+            args = ["checkout", "-q", submodule["commit"]]
+        result = _git(args, path)
+        if result.returncode != 0:
+            report["errors"].append({"path": submodule["path"], "error": result.stderr.strip()})
+
+    import client_sparse_checkout
+
+    client_sparse_checkout.apply(target)
+    report["files"] = manifest["stats"]["files"]
+    report["submodules"] = len(manifest["submodules"])
+    report["duration"] = round(time.monotonic() - started, 2)
+    return report
+
+
+def _size(value: int) -> str:
+    return f"{value / 1024 / 1024:.1f} Mo"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sauvegardes incrémentales des clients")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="Sauvegarder un client")
+    snapshot_parser.add_argument("client")
+    snapshot_parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Fichiers traités en parallèle")
+    snapshot_parser.add_argument("--json", action="store_true", help="Sortie JSON")
+
+    list_parser = subparsers.add_parser("list", help="Lister les sauvegardes")
+    list_parser.add_argument("client", nargs="?")
+    list_parser.add_argument("--json", action="store_true", help="Sortie JSON")
+
+    prune_parser = subparsers.add_parser("prune", help="Supprimer les anciennes sauvegardes d'un client")
+    prune_parser.add_argument("client")
+    prune_parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help=f"Sauvegardes conservées (défaut: {DEFAULT_KEEP})")
+
+    restore_parser = subparsers.add_parser("restore", help="Restaurer une sauvegarde")
+    restore_parser.add_argument("client")
+    restore_parser.add_argument("--snapshot", help="Identifiant de la sauvegarde (défaut: la plus récente)")
+    restore_parser.add_argument("--target", help="Répertoire de destination (défaut: clients/<client>)")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "snapshot":
+            manifest = snapshot(args.client, jobs=args.jobs)
+            summary = {key: manifest[key] for key in ("id", "client", "created_at", "parent", "compression", "stats")}
+            if args.json:
+                print(json.dumps(summary, indent=2, ensure_ascii=False))
+                return
+            stats = manifest["stats"]
+            print(f"✅ Sauvegarde {manifest['id']} du client {args.client} ({stats['duration']}s)")
+            print(f"   {stats['files']} fichiers ({_size(stats['bytes'])}), {stats['reused_files']} inchangés depuis la précédente")
+            print(f"   {stats['new_chunks']} nouveaux blocs, {_size(stats['stored_bytes'])} ajoutés au magasin ({manifest['compression']})")
+            print(f"   {len(manifest['submodules'])} submodules enregistrés par commit")
+        elif args.command == "list":
+            snapshots = list_snapshots(args.client)
+            if args.json:
+                print(json.dumps(snapshots, indent=2, ensure_ascii=False))
+                return
+            if not snapshots:
+                print("Aucune sauvegarde trouvée")
+            for entry in snapshots:
+                print(f"   {entry['client']}/{entry['id']} - {entry['created_at']} - {entry['files']} fichiers, {_size(entry['stored_bytes'])} ajoutés")
+        elif args.command == "prune":
+            report = prune(args.client, args.keep)
+            print(f"🧹 {len(report['removed'])} sauvegarde(s) supprimée(s), {report['freed_chunks']} blocs libérés ({_size(report['freed_bytes'])})")
+        elif args.command == "restore":
+            report = restore(args.client, args.snapshot, Path(args.target) if args.target else None)
+            print(f"✅ Sauvegarde {report['snapshot']} restaurée dans {report['target']} ({report['duration']}s)")
+            for error in report["errors"]:
+                print(f"⚠️  {error['path']}: {error['error']}", file=sys.stderr)
+            sys.exit(1 if report["errors"] else 0)
+    except BackupError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Sauvegarde en flux des bases PostgreSQL et du filestore d'un client
+
+`pg_dump` (format custom, sans compression interne) est lancé dans le
+conteneur postgresql-<client> et sa sortie est compressée à la volée (zstd
+multithread avec le module zstandard, gzip à défaut) : aucun fichier
+temporaire de la taille de la base n'est créé. Le filestore de chaque base
+(data/filestore/<base>, ou /data/filestore dans le conteneur odoo-<client> si
+le dossier de l'hôte n'est pas lisible) est archivé en tar, lui aussi en flux.
+Les bases sont traitées en parallèle.
+
+Chaque sauvegarde est un dossier backups/databases/<client>/<id>/ ; son
+manifest.json (écrit en dernier) donne tailles, durées et débits.
+
+La restauration recrée les bases en parallèle ; avec --jobs > 1, le dump est
+décompressé dans le conteneur pour permettre `pg_restore --jobs`.
+
+Usage :
+    client_db_backup.py backup CLIENT [--database DB ...] [--jobs N] [--json]
+    client_db_backup.py list CLIENT [--json]
+    client_db_backup.py restore CLIENT [--backup ID] [--database DB ...] [--jobs N] [--drop]
+    client_db_backup.py prune CLIENT [--keep N]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+import client_backup
+from client_backup import DEFAULT_KEEP, BackupError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DB_USER = "odoo"
+BLOCK_SIZE = 1024 * 1024
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+DEFAULT_JOBS = 4
+DOCKER_TIMEOUT = 30
+DB_ADMIN_TIMEOUT = 900  # dropdb/createdb : longs sur les grosses bases
+
+
+def database_backup_dir(client: str) -> Path:
+    return client_backup.BACKUP_DIR / "databases" / client
+
+
+def _pg_container(client: str) -> str:
+    return f"postgresql-{client}"
+
+
+def _odoo_container(client: str) -> str:
+    return f"odoo-{client}"
+
+
+def _docker(args: List[str], timeout: float = DOCKER_TIMEOUT) -> subprocess.CompletedProcess:
+    return subprocess.run(["docker", *args], capture_output=True, text=True, timeout=timeout)
+
+
+def list_databases(client: str) -> List[str]:
+    """Bases de l'instance PostgreSQL du client (hors modèles et base postgres)"""
+    result = _docker([
+        "exec", _pg_container(client), "psql", "-U", DB_USER, "-d", "postgres", "-At", "-c",
+        "SELECT datname FROM pg_database WHERE NOT datistemplate AND datname <> 'postgres' ORDER BY datname",
+    ])
+    if result.returncode != 0:
+        raise BackupError(f"PostgreSQL du client '{client}' inaccessible: {result.stderr.strip()}")
+    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+
+class _CountingWriter:
+    """Compte les octets écrits dans le fichier compressé"""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.bytes = 0
+
+    def write(self, data: bytes) -> int:
+        self.bytes += len(data)
+        return self.raw.write(data)
+
+    def flush(self):
+        self.raw.flush()
+
+
+def compressed_suffix() -> str:
+    return ".zst" if zstandard is not None else ".gz"
+
+
+@contextmanager
+def compressed_writer(path: Path, stats: Dict[str, int]) -> Iterator[Any]:
+    """Flux d'écriture compressé ; stats["stored_bytes"] est renseigné à la fermeture"""
+    with open(path, "wb") as raw:
+        counter = _CountingWriter(raw)
+        if zstandard is not None:
+            compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+            writer = compressor.stream_writer(counter, closefd=False)
+        else:
+            writer = gzip.GzipFile(fileobj=counter, mode="wb", compresslevel=GZIP_LEVEL)
+        try:
+            yield writer
+        finally:
+            writer.close()
+            stats["stored_bytes"] = counter.bytes
+
+
+@contextmanager
+def compressed_reader(path: Path) -> Iterator[BinaryIO]:
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise BackupError(f"{path.name} est compressé en zstd : installez le module zstandard")
+        with open(path, "rb") as raw, zstandard.ZstdDecompressor().stream_reader(raw) as reader:
+            yield reader
+    else:
+        with gzip.open(path, "rb") as reader:
+            yield reader
+
+
+def _pump(source: BinaryIO, destination: Any) -> int:
+    """Copie par blocs ; renvoie le nombre d'octets non compressés"""
+    total = 0
+    for block in iter(lambda: source.read(BLOCK_SIZE), b""):
+        destination.write(block)
+        total += len(block)
+    return total
+
+
+def _stream_command(command: List[str], path: Path) -> Dict[str, int]:
+    """Compresse en flux la sortie d'une commande dans `path`"""
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # stderr lu en parallèle : un message volumineux ne doit pas bloquer la commande
+    errors: List[bytes] = []
+    reader = threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True)
+    reader.start()
+    stats: Dict[str, int] = {}
+    with compressed_writer(path, stats) as writer:
+        stats["bytes"] = _pump(process.stdout, writer)
+    process.wait()
+    reader.join()
+    if process.returncode != 0:
+        path.unlink(missing_ok=True)
+        raise BackupError(f"{command[-1]}: {b''.join(errors).decode(errors='replace').strip()}")
+    return stats
+
+
+def _dump_filestore(client: str, database: str, path: Path) -> Optional[Dict[str, int]]:
+    """Archive tar du filestore de la base (None si la base n'a pas de filestore)"""
+    host_dir = client_backup.CLIENTS_DIR / client / "data" / "filestore" / database
+    if host_dir.is_dir() and os.access(host_dir, os.R_OK | os.X_OK):
+        stats: Dict[str, int] = {}
+        with compressed_writer(path, stats) as writer:
+            counter = _CountingWriter(writer)
+            with tarfile.open(fileobj=counter, mode="w|") as archive:
+                archive.add(str(host_dir), arcname=".")
+        stats["bytes"] = counter.bytes
+        return stats
+    check = _docker(["exec", _odoo_container(client), "test", "-d", f"/data/filestore/{database}"])
+    if check.returncode != 0:
+        return None
+    return _stream_command(
+        ["docker", "exec", _odoo_container(client), "tar", "-C", f"/data/filestore/{database}", "-cf", "-", "."],
+        path,
+    )
+
+
+def backup(client: str, databases: Optional[List[str]] = None, jobs: int = DEFAULT_JOBS) -> Dict[str, Any]:
+    """Sauvegarde les bases (toutes par défaut) et leurs filestores ; renvoie le manifeste"""
+    started = time.monotonic()
+    databases = databases or list_databases(client)
+    if not databases:
+        raise BackupError(f"Aucune base de données pour le client '{client}'")
+
+    backup_id = time.strftime("%Y%m%dT%H%M%S")
+    suffix_number = 1
+    while (database_backup_dir(client) / backup_id).exists():
+        backup_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{suffix_number}"
+        suffix_number += 1
+    target = database_backup_dir(client) / backup_id
+    target.mkdir(parents=True)
+    suffix = compressed_suffix()
+
+    def dump(database: str) -> Dict[str, Any]:
+        database_started = time.monotonic()
+        dump_file = f"{database}.dump{suffix}"
+        dump_stats = _stream_command(
+            ["docker", "exec", _pg_container(client), "pg_dump", "-U", DB_USER, "-Fc", "-Z0", database],
+            target / dump_file,
+        )
+        filestore_file = f"{database}.filestore.tar{suffix}"
+        filestore_stats = _dump_filestore(client, database, target / filestore_file)
+        duration = time.monotonic() - database_started
+        raw_bytes = dump_stats["bytes"] + (filestore_stats or {}).get("bytes", 0)
+        return {
+            "database": database,
+            "dump": {"file": dump_file, **dump_stats},
+            "filestore": {"file": filestore_file, **filestore_stats} if filestore_stats else None,
+            "duration": round(duration, 2),
+            "throughput_mb_s": round(raw_bytes / 1024 / 1024 / duration, 1) if duration else None,
+        }
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            results = list(executor.map(dump, databases))
+    except BaseException:
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+
+    manifest = {
+        "id": backup_id,
+        "client": client,
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "compression": "zstd" if suffix == ".zst" else "gzip",
+        "databases": results,
+        "bytes": sum(r["dump"]["bytes"] + ((r["filestore"] or {}).get("bytes", 0)) for r in results),
+        "stored_bytes": sum(r["dump"]["stored_bytes"] + ((r["filestore"] or {}).get("stored_bytes", 0)) for r in results),
+        "duration": round(time.monotonic() - started, 2),
+    }
+    with open(target / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def list_backups(client: str) -> List[Dict[str, Any]]:
+    """Sauvegardes complètes (avec manifeste), de la plus ancienne à la plus récente"""
+    backups = []
+    for manifest_path in sorted(database_backup_dir(client).glob("*/manifest.json")):
+        with open(manifest_path, "r") as f:
+            backups.append(json.load(f))
+    return backups
+
+
+def prune(client: str, keep: int = DEFAULT_KEEP) -> Dict[str, Any]:
+    directories = sorted(path for path in database_backup_dir(client).glob("*") if path.is_dir())
+    complete = [path for path in directories if (path / "manifest.json").exists()]
+    removed = complete[:-keep] if keep > 0 else complete
+    freed = 0
+    for path in removed:
+        freed += sum(f.stat().st_size for f in path.iterdir())
+        shutil.rmtree(path)
+    return {"client": client, "removed": [path.name for path in removed], "freed_bytes": freed}
+
+
+def _feed(process: subprocess.Popen, path: Path):
+    with compressed_reader(path) as reader:
+        try:
+            _pump(reader, process.stdin)
+        finally:
+            process.stdin.close()
+
+
+def _run_fed(command: List[str], path: Path) -> str:
+    """Lance une commande alimentée par le contenu décompressé de `path` ; renvoie stderr en cas d'échec"""
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    errors: List[bytes] = []
+    reader = threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True)
+    reader.start()
+    try:
+        _feed(process, path)
+    except BrokenPipeError:
+        pass  # la commande a échoué : son code de retour et stderr le diront
+    process.wait()
+    reader.join()
+    return b"".join(errors).decode(errors="replace").strip() if process.returncode != 0 else ""
+
+
+def _restore_filestore(client: str, database: str, path: Path, drop: bool):
+    host_dir = client_backup.CLIENTS_DIR / client / "data" / "filestore" / database
+    filestore_root = host_dir.parent
+    if filestore_root.is_dir() and os.access(filestore_root, os.W_OK):
+        if host_dir.exists() and any(host_dir.iterdir()):
+            if not drop:
+                raise BackupError(f"Le filestore {host_dir} existe déjà (utilisez --drop pour le remplacer)")
+            shutil.rmtree(host_dir)
+        host_dir.mkdir(parents=True, exist_ok=True)
+        with compressed_reader(path) as reader, tarfile.open(fileobj=reader, mode="r|") as archive:
+            if hasattr(tarfile, "data_filter"):
+                archive.extractall(str(host_dir), filter="data")
+            else:
+                archive.extractall(str(host_dir))
+        return
+    container_dir = f"/data/filestore/{database}"
+    # Arguments passés tels quels (pas de shell) : le nom de la base n'est jamais interprété
+    for command in ([["rm", "-rf", "--", container_dir]] if drop else []) + [["mkdir", "-p", "--", container_dir]]:
+        result = _docker(["exec", _odoo_container(client), *command])
+        if result.returncode != 0:
+            raise BackupError(f"Filestore de {database}: {result.stderr.strip()}")
+    error = _run_fed(["docker", "exec", "-i", _odoo_container(client), "tar", "-C", container_dir, "-xf", "-"], path)
+    if error:
+        raise BackupError(f"Filestore de {database}: {error}")
+
+
+def restore(
+    client: str,
+    backup_id: Optional[str] = None,
+    databases: Optional[List[str]] = None,
+    jobs: int = DEFAULT_JOBS,
+    drop: bool = False,
+) -> Dict[str, Any]:
+    """Restaure les bases d'une sauvegarde (la plus récente par défaut) et leurs filestores"""
+    backups = list_backups(client)
+    if backup_id:
+        backups = [b for b in backups if b["id"] == backup_id]
+    if not backups:
+        raise BackupError(f"Aucune sauvegarde de base '{backup_id or 'récente'}' pour le client '{client}'")
+    manifest = backups[-1]
+    source = database_backup_dir(client) / manifest["id"]
+    entries = [e for e in manifest["databases"] if not databases or e["database"] in databases]
+    if not entries:
+        raise BackupError(f"Bases absentes de la sauvegarde {manifest['id']}: {', '.join(databases or [])}")
+
+    container = _pg_container(client)
+    # Les bases sont restaurées en parallèle ; les jobs de pg_restore se partagent le reste
+    restore_jobs = max(1, jobs // len(entries))
+    started = time.monotonic()
+
+    def restore_one(entry: Dict[str, Any]) -> Dict[str, Any]:
+        database = entry["database"]
+        database_started = time.monotonic()
+        result: Dict[str, Any] = {"database": database}
+        try:
+            if drop:
+                # --force (PostgreSQL 13+) : ferme les connexions encore ouvertes par Odoo
+                dropped = _docker(
+                    ["exec", container, "dropdb", "-U", DB_USER, "--if-exists", "--force", database],
+                    timeout=DB_ADMIN_TIMEOUT,
+                )
+                if dropped.returncode != 0:
+                    raise BackupError(f"{database}: {dropped.stderr.strip()}")
+            created = _docker(
+                ["exec", container, "createdb", "-U", DB_USER, "-O", DB_USER, database],
+                timeout=DB_ADMIN_TIMEOUT,
+            )
+            if created.returncode != 0:
+                raise BackupError(f"{database}: {created.stderr.strip()} (utilisez --drop pour remplacer la base)")
+
+            dump = source / entry["dump"]["file"]
+            if restore_jobs > 1:
+                # pg_restore --jobs exige un fichier : décompression dans le conteneur
+                staged = f"/tmp/restore_{database}_{manifest['id']}.dump"
+                error = _run_fed(["docker", "exec", "-i", container, "sh", "-c", 'cat > "$1"', "sh", staged], dump)
+                if not error:
+                    restored = subprocess.run(
+                        ["docker", "exec", container, "pg_restore", "-U", DB_USER, "-d", database,
+                         "--no-owner", "--jobs", str(restore_jobs), staged],
+                        capture_output=True, text=True,
+                    )
+                    error = restored.stderr.strip() if restored.returncode != 0 else ""
+                _docker(["exec", container, "rm", "-f", staged])
+            else:
+                error = _run_fed(
+                    ["docker", "exec", "-i", container, "pg_restore", "-U", DB_USER, "-d", database, "--no-owner"],
+                    dump,
+                )
+            if error:
+                raise BackupError(f"{database}: {error}")
+
+            if entry.get("filestore"):
+                _restore_filestore(client, database, source / entry["filestore"]["file"], drop)
+            result["status"] = "restored"
+        except (BackupError, OSError, subprocess.SubprocessError) as e:
+            result.update(status="failed", error=str(e))
+        result["duration"] = round(time.monotonic() - database_started, 2)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(entries)))) as executor:
+        results = list(executor.map(restore_one, entries))
+    return {
+        "client": client,
+        "backup": manifest["id"],
+        "databases": results,
+        "duration": round(time.monotonic() - started, 2),
+    }
+
+
+def _size(value: int) -> str:
+    return f"{value / 1024 / 1024:.1f} Mo"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sauvegarde en flux des bases et du filestore d'un client")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backup_parser = subparsers.add_parser("backup", help="Sauvegarder les bases du client")
+    backup_parser.add_argument("client")
+    backup_parser.add_argument("--database", action="append", help="Base à sauvegarder (toutes par défaut)")
+    backup_parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Bases sauvegardées en parallèle")
+    backup_parser.add_argument("--json", action="store_true", help="Sortie JSON")
+
+    list_parser = subparsers.add_parser("list", help="Lister les sauvegardes de bases")
+    list_parser.add_argument("client")
+    list_parser.add_argument("--json", action="store_true", help="Sortie JSON")
+
+    restore_parser = subparsers.add_parser("restore", help="Restaurer les bases d'une sauvegarde")
+    restore_parser.add_argument("client")
+    restore_parser.add_argument("--backup", help="Identifiant de la sauvegarde (défaut: la plus récente)")
+    restore_parser.add_argument("--database", action="append", help="Base à restaurer (toutes par défaut)")
+    restore_parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Parallélisme de la restauration")
+    restore_parser.add_argument("--drop", action="store_true", help="Remplacer les bases et filestores existants")
+
+    prune_parser = subparsers.add_parser("prune", help="Supprimer les anciennes sauvegardes de bases")
+    prune_parser.add_argument("client")
+    prune_parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help=f"Sauvegardes conservées (défaut: {DEFAULT_KEEP})")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "backup":
+            manifest = backup(args.client, args.database, args.jobs)
+            if args.json:
+                print(json.dumps(manifest, indent=2))
+                return
+            print(f"✅ Sauvegarde {manifest['id']} des bases du client {args.client} ({manifest['duration']}s, {manifest['compression']})")
+            for entry in manifest["databases"]:
+                filestore = entry["filestore"]
+                print(
+                    f"   {entry['database']}: dump {_size(entry['dump']['bytes'])} -> {_size(entry['dump']['stored_bytes'])}, "
+                    f"filestore {_size(filestore['bytes']) + ' -> ' + _size(filestore['stored_bytes']) if filestore else 'absent'} "
+                    f"({entry['duration']}s, {entry['throughput_mb_s']} Mo/s)"
+                )
+        elif args.command == "list":
+            backups = list_backups(args.client)
+            if args.json:
+                print(json.dumps(backups, indent=2))
+                return
+            if not backups:
+                print("Aucune sauvegarde de base trouvée")
+            for entry in backups:
+                names = ", ".join(d["database"] for d in entry["databases"])
+                print(f"   {entry['id']} - {entry['created_at']} - {names} ({_size(entry['stored_bytes'])})")
+        elif args.command == "restore":
+            report = restore(args.client, args.backup, args.database, args.jobs, args.drop)
+            failed = [entry for entry in report["databases"] if entry["status"] == "failed"]
+            for entry in report["databases"]:
+                if entry["status"] == "failed":
+                    print(f"❌ {entry['database']}: {entry['error']}", file=sys.stderr)
+                else:
+                    print(f"✅ {entry['database']} restaurée ({entry['duration']}s)")
+            sys.exit(1 if failed else 0)
+        elif args.command == "prune":
+            report = prune(args.client, args.keep)
+            print(f"🧹 {len(report['removed'])} sauvegarde(s) de bases supprimée(s) ({_size(report['freed_bytes'])})")
+    except BackupError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
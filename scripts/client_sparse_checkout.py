@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Checkout partiel (sparse) des submodules OCA d'un client
+
+Mode optionnel, activé par client (clé `clientgen.sparse` de .git/config) :
+seuls les addons liés dans extra-addons et leurs dépendances (résolues à
+partir des manifestes lus dans les objets git, donc même pour des addons
+non extraits) sont extraits dans addons/<dépôt>. Les fichiers de premier
+niveau (requirements.txt, README...) restent présents (mode cone).
+
+L'ensemble est recalculé à chaque `apply` : après un ajout ou une
+suppression de liens (link_modules, add_module), les submodules sont
+élargis ou réduits en conséquence.
+
+Usage :
+    client_sparse_checkout.py enable CLIENT_DIR
+    client_sparse_checkout.py disable CLIENT_DIR
+    client_sparse_checkout.py apply CLIENT_DIR [--include DEPOT:addon1,addon2|all ...]
+    client_sparse_checkout.py status CLIENT_DIR [--json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from oca_addon_index import read_tree_manifests
+
+CONFIG_KEY = "clientgen.sparse"
+EXCLUDED_SUBMODULES = ("odoo", "enterprise")  # gérés séparément (cœur et liens enterprise)
+ALL = "all"
+
+
+def _git(args: List[str], cwd: Path) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, timeout=600)
+
+
+def is_enabled(client_dir: Path) -> bool:
+    result = _git(["config", "--bool", CONFIG_KEY], Path(client_dir))
+    return result.stdout.strip() == "true"
+
+
+def repositories(client_dir: Path) -> List[str]:
+    """Submodules OCA du client (addons/<dépôt> initialisés)"""
+    addons_dir = Path(client_dir) / "addons"
+    if not addons_dir.is_dir():
+        return []
+    return sorted(
+        path.name for path in addons_dir.iterdir()
+        if path.name not in EXCLUDED_SUBMODULES and (path / ".git").exists()
+    )
+
+
+def linked_modules(client_dir: Path) -> Dict[str, Set[str]]:
+    """Addons liés dans extra-addons, par dépôt (d'après la cible des liens)"""
+    client_dir = Path(client_dir).resolve()
+    extra_addons = client_dir / "extra-addons"
+    linked: Dict[str, Set[str]] = {}
+    if not extra_addons.is_dir():
+        return linked
+    for link in extra_addons.iterdir():
+        if not link.is_symlink():
+            continue
+        target = Path(os.path.normpath(extra_addons / os.readlink(link)))
+        try:
+            parts = target.relative_to(client_dir).parts
+        except ValueError:
+            continue
+        if len(parts) == 3 and parts[0] == "addons":
+            linked.setdefault(parts[1], set()).add(parts[2])
+    return linked
+
+
+def required_addons(client_dir: Path, include: Optional[Dict[str, Any]] = None) -> Dict[str, Set[str]]:
+    """Addons à extraire par dépôt : liens + `include` + dépendances transitives"""
+    client_dir = Path(client_dir)
+    repos = repositories(client_dir)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        manifests = dict(zip(repos, executor.map(lambda r: read_tree_manifests(client_dir / "addons" / r, "HEAD"), repos)))
+
+    # Addon -> dépôt qui le fournit (premier trouvé, par ordre alphabétique des dépôts)
+    provider: Dict[str, str] = {}
+    for repo in repos:
+        for addon in manifests[repo]:
+            provider.setdefault(addon, repo)
+
+    required: Dict[str, Set[str]] = {repo: set() for repo in repos}
+    queue = []
+    for repo, addons in linked_modules(client_dir).items():
+        queue.extend((repo, addon) for addon in addons)
+    for repo, addons in (include or {}).items():
+        if repo not in manifests:
+            continue
+        if addons == ALL:
+            addons = list(manifests[repo])
+        queue.extend((repo, addon) for addon in addons)
+
+    while queue:
+        repo, addon = queue.pop()
+        if repo not in required or addon in required[repo] or addon not in manifests[repo]:
+            continue
+        required[repo].add(addon)
+        for dependency in manifests[repo][addon]["depends"]:
+            # Dépendance du même dépôt en priorité, sinon du dépôt qui la fournit
+            dep_repo = repo if dependency in manifests[repo] else provider.get(dependency)
+            if dep_repo:
+                queue.append((dep_repo, dependency))
+    return required
+
+
+def _current_set(repo_dir: Path) -> Optional[Set[str]]:
+    """Dossiers actuellement extraits (None si le checkout est complet)"""
+    if _git(["config", "--bool", "core.sparseCheckout"], repo_dir).stdout.strip() != "true":
+        return None
+    return set(_git(["sparse-checkout", "list"], repo_dir).stdout.split())
+
+
+def apply(client_dir: Path, include: Optional[Dict[str, Any]] = None, jobs: int = 4) -> Dict[str, Any]:
+    """Restreint chaque submodule aux addons requis (sans effet si le mode est désactivé)"""
+    client_dir = Path(client_dir)
+    report: Dict[str, Any] = {"enabled": is_enabled(client_dir), "repositories": {}, "errors": []}
+    if not report["enabled"]:
+        return report
+
+    required = required_addons(client_dir, include)
+
+    def restrict(repo: str):
+        repo_dir = client_dir / "addons" / repo
+        addons = sorted(required[repo])
+        if _current_set(repo_dir) == set(addons):
+            return repo, addons, False, None
+        result = _git(["sparse-checkout", "set", "--cone", *addons], repo_dir)
+        return repo, addons, True, (result.stderr.strip() if result.returncode != 0 else None)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        for repo, addons, changed, error in executor.map(restrict, sorted(required)):
+            if error:
+                report["errors"].append({"repository": repo, "error": error})
+            report["repositories"][repo] = {"addons": addons, "changed": changed}
+    return report
+
+
+def enable(client_dir: Path) -> Dict[str, Any]:
+    _git(["config", CONFIG_KEY, "true"], Path(client_dir))
+    return apply(client_dir)
+
+
+def disable(client_dir: Path) -> Dict[str, Any]:
+    """Revient au checkout complet de tous les submodules"""
+    client_dir = Path(client_dir)
+    _git(["config", "--unset", CONFIG_KEY], client_dir)
+    report: Dict[str, Any] = {"enabled": False, "repositories": {}, "errors": []}
+    for repo in repositories(client_dir):
+        repo_dir = client_dir / "addons" / repo
+        if _current_set(repo_dir) is None:
+            continue
+        result = _git(["sparse-checkout", "disable"], repo_dir)
+        if result.returncode != 0:
+            report["errors"].append({"repository": repo, "error": result.stderr.strip()})
+        else:
+            report["repositories"][repo] = {"addons": ALL, "changed": True}
+    return report
+
+
+def status(client_dir: Path) -> Dict[str, Any]:
+    client_dir = Path(client_dir)
+    result: Dict[str, Any] = {"enabled": is_enabled(client_dir), "repositories": {}}
+    for repo in repositories(client_dir):
+        current = _current_set(client_dir / "addons" / repo)
+        result["repositories"][repo] = ALL if current is None else sorted(current)
+    return result
+
+
+def parse_include(values: List[str]) -> Dict[str, Any]:
+    """DEPOT:addon1,addon2 ou DEPOT:all"""
+    include: Dict[str, Any] = {}
+    for value in values or []:
+        repo, _, addons = value.partition(":")
+        if addons.strip() == ALL:
+            include[repo] = ALL
+        elif include.get(repo) != ALL:
+            include[repo] = include.get(repo, []) + [a.strip() for a in addons.split(",") if a.strip()]
+    return include
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkout partiel des submodules OCA d'un client")
+    parser.add_argument("command", choices=["enable", "disable", "apply", "status"])
+    parser.add_argument("client_dir", help="Répertoire du client")
+    parser.add_argument("--include", action="append", metavar="DEPOT:ADDONS",
+                        help="Addons à extraire en plus des liens (ex: partner-contact:partner_firstname)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_args()
+
+    client_dir = Path(args.client_dir)
+    if not (client_dir / ".git").exists():
+        print(f"❌ {client_dir} n'est pas un dépôt Git", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == "enable":
+        report = enable(client_dir)
+    elif args.command == "disable":
+        report = disable(client_dir)
+    elif args.command == "apply":
+        report = apply(client_dir, parse_include(args.include))
+    else:
+        report = status(client_dir)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    elif args.command == "status":
+        print(f"Mode sparse: {'activé' if report['enabled'] else 'désactivé'}")
+        for repo, addons in report["repositories"].items():
+            print(f"   {repo}: {'checkout complet' if addons == ALL else f'{len(addons)} addon(s)'}")
+    elif not report["enabled"] and args.command == "apply":
+        print("ℹ️  Mode sparse désactivé pour ce client, rien à faire")
+    else:
+        for repo, info in report["repositories"].items():
+            if info["changed"]:
+                addons = info["addons"]
+                print(f"✅ {repo}: {'checkout complet' if addons == ALL else f'{len(addons)} addon(s) extrait(s)'}")
+    for error in report.get("errors", []):
+        print(f"❌ {error['repository']}: {error['error']}", file=sys.stderr)
+    sys.exit(1 if report.get("errors") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Complète en une passe les descriptions manquantes de config/oca_descriptions.json
+
+Le fichier est lu une seule fois ; les entrées vides ou génériques ("Module
+OCA", "OCA module") sont identifiées pour chaque langue, les descriptions
+GitHub récupérées puis traduites en parallèle (parallélisme borné), et le
+fichier est réécrit une seule fois, de façon atomique.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from github_client import GitHubClient
+from translate_description import (
+    ORG_LISTING_THRESHOLD,
+    TranslationManager,
+    get_github_description,
+    get_github_descriptions,
+)
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DESCRIPTIONS_FILE = ROOT_DIR / "config" / "oca_descriptions.json"
+LANGUAGES = ("fr", "en")
+PLACEHOLDERS = {"", "module oca", "oca module", "description à compléter"}
+SOURCE_LANG = "en"  # les descriptions GitHub de l'OCA sont en anglais
+
+# Descriptions de repli par famille de dépôts (reprises de l'ancien auto_complete shell)
+FALLBACKS = [
+    (re.compile(r"^connector[-_]"), {"fr": "Connecteur pour intégrations externes", "en": "Connector for external integrations"}),
+    (re.compile(r"account"), {"fr": "Modules comptables", "en": "Accounting modules"}),
+    (re.compile(r"l10n"), {"fr": "Localisation", "en": "Localization"}),
+    (re.compile(r"stock"), {"fr": "Gestion de stock", "en": "Stock management"}),
+]
+
+
+def is_missing(value: Optional[str]) -> bool:
+    """Description absente ou générique"""
+    return value is None or value.strip().lower() in PLACEHOLDERS
+
+
+def find_missing(descriptions: Dict[str, Dict[str, str]], languages: List[str]) -> List[Tuple[str, str]]:
+    """Couples (dépôt, langue) à compléter, dans l'ordre du fichier"""
+    return [
+        (repo, lang)
+        for repo, entry in descriptions.items()
+        for lang in languages
+        if is_missing(entry.get(lang))
+    ]
+
+
+def fallback_description(repo: str, lang: str) -> Optional[str]:
+    for pattern, texts in FALLBACKS:
+        if pattern.search(repo):
+            return texts[lang]
+    return None
+
+
+def write_atomic(path: Path, data: Any):
+    """Écrit le fichier JSON via un fichier temporaire et os.replace"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def empty_report() -> Dict[str, Any]:
+    return {"updated": [], "fallback": [], "no_description": [], "failed": []}
+
+
+class DescriptionPipeline:
+    """Récupération et traduction concurrentes des descriptions manquantes"""
+
+    def __init__(self, concurrency: int = 8, hedged: Optional[bool] = None):
+        self.concurrency = max(1, concurrency)
+        self.hedged = hedged
+        # Un gestionnaire par thread : chacun a sa propre connexion au cache SQLite
+        self._local = threading.local()
+        self.done = 0
+        self.total = 0
+
+    def _translator(self) -> TranslationManager:
+        translator = getattr(self._local, "translator", None)
+        if translator is None:
+            translator = self._local.translator = TranslationManager(hedged=self.hedged)
+        return translator
+
+    def _translate(self, text: str, target_lang: str) -> Optional[str]:
+        translated = self._translator().translate(text, target_lang, SOURCE_LANG)
+        # translate() renvoie le texte original quand tous les services échouent
+        if target_lang != SOURCE_LANG and translated == text:
+            return None
+        return translated or None
+
+    def _progress(self, repo: str, lang: str, status: str):
+        self.done += 1
+        print(f"[{self.done}/{self.total}] {repo} ({lang}): {status}", file=sys.stderr)
+
+    async def fetch_sources(self, repos: List[str]) -> Dict[str, Optional[str]]:
+        """Descriptions GitHub : liste de l'organisation si nombreuses, sinon en parallèle"""
+        client = GitHubClient()
+        if len(repos) > ORG_LISTING_THRESHOLD:
+            return await asyncio.to_thread(get_github_descriptions, repos, client)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(repo: str):
+            async with semaphore:
+                return repo, await asyncio.to_thread(get_github_description, repo, client)
+
+        return dict(await asyncio.gather(*(fetch(repo) for repo in repos)))
+
+    async def run(self, descriptions: Dict[str, Dict[str, str]], missing: List[Tuple[str, str]]) -> Dict[str, Any]:
+        self.total = len(missing)
+        self.done = 0
+        sources = await self.fetch_sources(sorted({repo for repo, _ in missing}))
+        print(
+            f"🔍 {sum(1 for v in sources.values() if v)}/{len(sources)} description(s) GitHub récupérée(s)",
+            file=sys.stderr,
+        )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        report = empty_report()
+
+        async def fill(repo: str, lang: str):
+            source = sources.get(repo)
+            translated = None
+            if source:
+                async with semaphore:
+                    translated = await asyncio.to_thread(self._translate, source, lang)
+            if translated:
+                descriptions[repo][lang] = translated
+                report["updated"].append(f"{repo}:{lang}")
+                self._progress(repo, lang, f"✅ \"{translated}\"")
+                return
+
+            fallback = fallback_description(repo, lang)
+            if fallback:
+                descriptions[repo][lang] = fallback
+                report["fallback"].append(f"{repo}:{lang}")
+                self._progress(repo, lang, f"⚠️  \"{fallback}\" (fallback)")
+            elif not source:
+                report["no_description"].append(f"{repo}:{lang}")
+                self._progress(repo, lang, "⚠️  aucune description GitHub")
+            else:
+                report["failed"].append(f"{repo}:{lang}")
+                self._progress(repo, lang, "❌ échec de la traduction")
+
+        await asyncio.gather(*(fill(repo, lang) for repo, lang in missing))
+        return report
+
+
+async def fill_descriptions_async(
+    languages: List[str],
+    limit: Optional[int] = None,
+    concurrency: int = 8,
+    hedged: Optional[bool] = None,
+    dry_run: bool = False,
+    descriptions_file: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Complète les descriptions manquantes et réécrit le fichier une seule fois
+
+    Coroutine : à attendre depuis une boucle existante (serveur MCP, tests),
+    ou à lancer avec asyncio.run() depuis un contexte synchrone (cf. main).
+    """
+    path = Path(descriptions_file or DESCRIPTIONS_FILE)
+    start = time.monotonic()
+    with open(path, "r") as f:
+        descriptions = json.load(f)
+
+    missing = find_missing(descriptions, languages)
+    if limit:
+        missing = missing[:limit]
+    print(f"📋 {len(missing)} description(s) à compléter ({', '.join(languages)})", file=sys.stderr)
+
+    report = empty_report()
+    if missing:
+        report = await DescriptionPipeline(concurrency, hedged).run(descriptions, missing)
+
+    if (report["updated"] or report["fallback"]) and not dry_run:
+        backup_file = path.with_name(f"{path.name}.backup.{time.strftime('%Y%m%d_%H%M%S')}")
+        shutil.copy2(path, backup_file)
+        write_atomic(path, descriptions)
+        report["backup"] = str(backup_file)
+
+    report.update({
+        "missing": len(missing),
+        "remaining": len(find_missing(descriptions, languages)),
+        "dry_run": dry_run,
+        "duration": round(time.monotonic() - start, 2),
+    })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Complète les descriptions OCA manquantes en une passe")
+    parser.add_argument("--lang", default="fr,en", help="Langues à compléter, séparées par des virgules (défaut: fr,en)")
+    parser.add_argument("--limit", type=int, help="Nombre maximal de descriptions à traiter")
+    parser.add_argument("--concurrency", type=int, default=8, help="Traductions simultanées (défaut: 8)")
+    parser.add_argument("--hedged", action="store_true", help="Requêtes couvertes vers plusieurs services")
+    parser.add_argument("--dry-run", action="store_true", help="Ne pas écrire le fichier")
+    parser.add_argument("--json", action="store_true", help="Rapport JSON")
+    args = parser.parse_args()
+
+    languages = [lang.strip() for lang in args.lang.split(",") if lang.strip()]
+    unsupported = [lang for lang in languages if lang not in LANGUAGES]
+    if unsupported:
+        print(f"❌ Langue non supportée: {', '.join(unsupported)} (fr/en uniquement)", file=sys.stderr)
+        sys.exit(1)
+
+    report = asyncio.run(
+        fill_descriptions_async(languages, args.limit, args.concurrency, args.hedged or None, args.dry_run)
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    print()
+    print("✅ Complétion terminée !" if not args.dry_run else "✅ Simulation terminée (fichier inchangé)")
+    print("📊 Résultats:")
+    print(f"  - ✅ Descriptions complétées: {len(report['updated'])}")
+    print(f"  - ⚠️  Descriptions de fallback: {len(report['fallback'])}")
+    print(f"  - ⚠️  Sans description GitHub: {len(report['no_description'])}")
+    print(f"  - ❌ Échecs: {len(report['failed'])}")
+    print(f"  - 📋 Encore manquantes: {report['remaining']}")
+    print(f"  - ⏱️  Durée: {report['duration']}s")
+
+
+if __name__ == "__main__":
+    main()
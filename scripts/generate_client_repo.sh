@@ -171,6 +171,16 @@ add_submodules() {
             if [ "$url" != "null" ]; then
                 echo_info "Ajout du submodule: $module"
                 
+                # Miroir local partagé entre clients (dépôts OCA uniquement) : les objets ne sont téléchargés qu'une fois
+                local mirror
+                if mirror=$(python3 "$SCRIPT_DIR/oca_mirror_cache.py" path "$url" 2>/dev/null); then
+                    if git submodule add --reference "$mirror" -b "$ODOO_VERSION" "$url" "addons/$module"; then
+                        continue
+                    fi
+                    # Échec partiel : .git/modules/addons/<module> empêcherait le fallback
+                    remove_partial_submodule "addons/$module"
+                fi
+                
                 # Essayer d'abord le clonage optimisé
                 if clone_repository_optimized "$module" "$ODOO_VERSION" "addons/$module"; then
                     # Convertir en submodule git
@@ -191,6 +201,19 @@ add_submodules() {
             fi
         fi
     done
+    
+    # Alternates relatifs : le client reste valide monté ailleurs (conteneur MCP)
+    python3 "$SCRIPT_DIR/oca_mirror_cache.py" relativize "$CLIENT_DIR" >/dev/null || true
+}
+
+# Supprimer les restes d'un `git submodule add` interrompu (index, .gitmodules, .git/modules)
+remove_partial_submodule() {
+    local path="$1"
+    
+    git rm --cached --quiet -- "$path" 2>/dev/null || true
+    git config -f .gitmodules --remove-section "submodule.$path" 2>/dev/null || true
+    git config --remove-section "submodule.$path" 2>/dev/null || true
+    rm -rf -- "$path" ".git/modules/$path"
 }
 
 # Traiter les modules du template avec la nouvelle structure
@@ -1337,12 +1360,26 @@ EOF
     chmod +x "$build_script"
 }
 
+# Checkout partiel des submodules OCA (SPARSE=true) : addons liés et dépendances uniquement
+enable_sparse_checkout() {
+    if [ "${SPARSE:-false}" != "true" ]; then
+        return 0
+    fi
+    echo_info "Activation du checkout partiel des submodules..."
+    if python3 "$SCRIPT_DIR/client_sparse_checkout.py" enable "$CLIENT_DIR"; then
+        echo_success "Checkout partiel activé"
+    else
+        echo_warning "Checkout partiel non appliqué sur certains submodules"
+    fi
+}
+
 # Fonction principale
 main() {
     validate_parameters
     create_client_structure
     add_submodules
     apply_automatic_linking
+    enable_sparse_checkout
     add_enterprise
     create_enterprise_links
     create_config_files
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Client GitHub partagé, respectueux des limites de l'API
+
+- une seule session HTTP (connexions réutilisées) ;
+- seau à jetons pour lisser le débit des traitements en masse ;
+- lecture de X-RateLimit-Remaining / X-RateLimit-Reset : le débit est étalé
+  jusqu'à la remise à zéro quand le quota restant devient faible ;
+- Retry-After et limites secondaires : attente puis nouvel essai avec
+  backoff exponentiel ;
+- état du quota conservé dans le cache pour que les invocations successives
+  de la CLI (scripts shell) en tiennent compte.
+
+Utilisable en module (GitHubClient) ou en CLI :
+    github_client.py request GET /repos/OCA/web [--http-code]
+    github_client.py request POST /orgs/ORG/repos --data '{"name": "x"}'
+    github_client.py rate-limit
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+
+from oca_addon_index import CACHE_DIR
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+GITHUB_CONFIG_FILE = ROOT_DIR / "config" / "github_config.json"
+RATE_STATE_FILE = CACHE_DIR / "github_rate_limit.json"
+
+DEFAULT_BASE_URL = "https://api.github.com"
+DEFAULT_RATE = float(os.environ.get("GITHUB_CLIENT_RPS", "10"))  # requêtes/seconde en régime établi
+DEFAULT_BURST = 20
+DEFAULT_MAX_WAIT = float(os.environ.get("GITHUB_CLIENT_MAX_WAIT", "900"))  # attente maximale acceptée (s)
+LOW_REMAINING = 50  # en dessous, le quota restant est étalé jusqu'au reset
+SECONDARY_BACKOFF = 60.0  # GitHub recommande d'attendre au moins une minute
+MAX_RETRIES = 5
+# Méthodes rejouables sans risque après une coupure réseau ou une erreur 5xx
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class RateLimitExceeded(Exception):
+    """Quota épuisé et remise à zéro trop lointaine pour être attendue"""
+
+
+class TokenBucket:
+    """Seau à jetons thread-safe"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+def _load_config() -> Dict[str, Any]:
+    try:
+        with open(GITHUB_CONFIG_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class GitHubClient:
+    """Client de l'API REST GitHub avec régulation du débit"""
+
+    def __init__(self, token: Optional[str] = None, base_url: Optional[str] = None,
+                 rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 max_wait: float = DEFAULT_MAX_WAIT, state_file: Optional[Path] = None,
+                 session: Optional[requests.Session] = None):
+        config = _load_config()
+        self.token = token if token is not None else (os.environ.get("GITHUB_TOKEN") or config.get("github_token") or "")
+        self.base_url = (base_url or config.get("github_base_url") or DEFAULT_BASE_URL).rstrip("/")
+        self.max_wait = max_wait
+        self.bucket = TokenBucket(rate, burst)
+        self.state_file = state_file or RATE_STATE_FILE
+        self.lock = threading.Lock()
+        self._last_save = 0.0
+
+        self.session = session or requests.Session()
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "odoo-client-generator",
+        })
+        if self.token:
+            self.session.headers["Authorization"] = f"token {self.token}"
+
+        # Le quota dépend de l'identité : un état par token (haché), "anonymous" sinon
+        self.identity = hashlib.sha256(self.token.encode()).hexdigest()[:16] if self.token else "anonymous"
+        self.rate_state = self._load_state()
+
+    # État du quota ----------------------------------------------------------
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_file, "r") as f:
+                state = json.load(f).get(self.identity, {})
+        except (OSError, ValueError):
+            state = {}
+        if state.get("reset", 0) <= time.time():
+            state.pop("remaining", None)  # quota remis à zéro depuis
+        return state
+
+    def _save_state(self):
+        self._last_save = time.time()
+        try:
+            with open(self.state_file, "r") as f:
+                all_states = json.load(f)
+        except (OSError, ValueError):
+            all_states = {}
+        all_states[self.identity] = self.rate_state
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.state_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(all_states, f)
+            os.replace(tmp_path, self.state_file)
+        except OSError:
+            pass  # l'état persistant n'est qu'une optimisation
+
+    def _record(self, response: requests.Response):
+        headers = response.headers
+        with self.lock:
+            if "X-RateLimit-Remaining" in headers:
+                self.rate_state.update({
+                    "remaining": int(headers["X-RateLimit-Remaining"]),
+                    "limit": int(headers.get("X-RateLimit-Limit", 0)),
+                    "reset": int(headers.get("X-RateLimit-Reset", 0)),
+                    "resource": headers.get("X-RateLimit-Resource", "core"),
+                })
+            now = time.time()
+            self.rate_state["updated"] = now
+            # Écriture limitée : toutes les 5 s, ou à chaque réponse quand le quota s'épuise
+            if now - self._last_save > 5 or self.rate_state.get("remaining", LOW_REMAINING) < LOW_REMAINING:
+                self._save_state()
+
+    def _pause_before_request(self):
+        """Attente imposée par un backoff secondaire ou un quota presque épuisé"""
+        with self.lock:
+            now = time.time()
+            delay = self.rate_state.get("blocked_until", 0) - now
+            remaining = self.rate_state.get("remaining")
+            reset = self.rate_state.get("reset", 0)
+            if remaining is not None and reset > now:
+                if remaining <= 0:
+                    delay = max(delay, reset - now + 1)
+                elif remaining < LOW_REMAINING:
+                    delay = max(delay, (reset - now) / remaining)
+                # Réserver la requête pour que les threads concurrents ralentissent aussi
+                self.rate_state["remaining"] = remaining - 1
+        if delay > self.max_wait:
+            raise RateLimitExceeded(
+                f"Limite de taux API GitHub atteinte, remise à zéro dans {int(delay)}s"
+            )
+        if delay > 0:
+            print(f"⏸️  Pause API GitHub de {delay:.1f}s (limite de taux)", file=sys.stderr)
+            time.sleep(delay)
+        self.bucket.acquire()
+
+    def _backoff(self, seconds: float):
+        with self.lock:
+            self.rate_state["blocked_until"] = max(self.rate_state.get("blocked_until", 0), time.time() + seconds)
+            self._save_state()
+
+    # Requêtes ---------------------------------------------------------------
+
+    def request(self, method: str, path: str, retry_unsafe: bool = False, **kwargs) -> requests.Response:
+        """Requête HTTP ; `path` est relatif à l'API (/repos/...) ou une URL complète
+
+        Les limites de taux (403/429) sont toujours rejouées : la requête n'a pas
+        été traitée. Les coupures réseau, délais dépassés et 502/503/504 ne le sont que pour
+        les méthodes idempotentes, sauf si l'appelant le demande (`retry_unsafe`).
+        """
+        url = path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
+        kwargs.setdefault("timeout", 30)
+        retry_errors = retry_unsafe or method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(MAX_RETRIES + 1):
+            self._pause_before_request()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == MAX_RETRIES or not retry_errors:
+                    raise
+                time.sleep(2 ** attempt)
+                continue
+            self._record(response)
+
+            if attempt == MAX_RETRIES:
+                return response
+
+            if response.status_code in (403, 429):
+                retry_after = response.headers.get("Retry-After")
+                if retry_after is not None:
+                    self._backoff(float(retry_after))
+                    continue
+                if response.headers.get("X-RateLimit-Remaining") == "0":
+                    continue  # _pause_before_request attend la remise à zéro
+                if "secondary rate limit" in response.text.lower():
+                    self._backoff(SECONDARY_BACKOFF * 2 ** attempt)
+                    continue
+            elif response.status_code in (502, 503, 504) and retry_errors:
+                time.sleep(2 ** attempt)
+                continue
+            return response
+        return response
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def head(self, path: str, **kwargs) -> requests.Response:
+        return self.request("HEAD", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def paginate(self, path: str, params: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Parcourt toutes les pages d'une liste en suivant l'en-tête Link"""
+        params = dict(params or {}, per_page=100)
+        url: Optional[str] = path
+        while url:
+            response = self.get(url, params=params)
+            response.raise_for_status()
+            yield from response.json()
+            url = response.links.get("next", {}).get("url")
+            params = None  # l'URL `next` contient déjà les paramètres
+
+    def rate_limit(self) -> Dict[str, Any]:
+        """Quota courant (l'appel à /rate_limit n'est pas décompté)"""
+        response = self.session.get(f"{self.base_url}/rate_limit", timeout=30)
+        self._record(response)
+        response.raise_for_status()
+        return response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client GitHub respectueux des limites de l'API")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    request_parser = subparsers.add_parser("request", help="Effectuer une requête sur l'API")
+    request_parser.add_argument("method", help="Méthode HTTP (GET, POST, ...)")
+    request_parser.add_argument("path", help="Chemin de l'API (ex: /repos/OCA/web)")
+    request_parser.add_argument("--data", help="Corps JSON de la requête ('-' pour lire l'entrée standard)")
+    request_parser.add_argument("--http-code", action="store_true", help="Afficher le code HTTP en première ligne")
+    request_parser.add_argument("--retry-unsafe", action="store_true",
+                                help="Rejouer aussi POST/PATCH après une coupure réseau ou une erreur 5xx")
+
+    subparsers.add_parser("rate-limit", help="Afficher le quota courant")
+
+    args = parser.parse_args()
+    client = GitHubClient()
+
+    try:
+        if args.command == "rate-limit":
+            print(json.dumps({"rate": client.rate_limit()["rate"], "state": client.rate_state}, indent=2))
+            return
+
+        data = sys.stdin.read() if args.data == "-" else args.data
+        kwargs = {"data": data, "headers": {"Content-Type": "application/json"}} if data else {}
+        response = client.request(args.method.upper(), args.path, retry_unsafe=args.retry_unsafe, **kwargs)
+    except (RateLimitExceeded, requests.RequestException) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.http_code:
+        # Le code HTTP est interprété par l'appelant (cf. github_operations.sh)
+        print(response.status_code)
+        print(response.text)
+        return
+    print(response.text)
+    sys.exit(0 if response.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
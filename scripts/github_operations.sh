@@ -8,6 +8,21 @@ GITHUB_CONFIG="$REPO_ROOT/config/github_config.json"
 # Source des fonctions de configuration
 source "$SCRIPT_DIR/setup_github.sh"
 
+# Requête sur l'API GitHub via scripts/github_client.py
+# Sortie : code HTTP en première ligne, puis le corps de la réponse
+github_api_request() {
+    local method="$1"
+    local path="$2"
+    local token="$3"
+    local payload="$4"
+    
+    if [ -n "$payload" ]; then
+        GITHUB_TOKEN="$token" python3 "$SCRIPT_DIR/github_client.py" request "$method" "$path" --http-code --data "$payload"
+    else
+        GITHUB_TOKEN="$token" python3 "$SCRIPT_DIR/github_client.py" request "$method" "$path" --http-code
+    fi
+}
+
 check_repository_exists() {
     local client_name="$1"
     local organization="$2"
@@ -18,12 +33,13 @@ check_repository_exists() {
         return 2
     fi
     
-    local repo_url="https://api.github.com/repos/$organization/$client_name"
-    
     echo "🔍 Vérification de l'existence du dépôt: $organization/$client_name"
     
-    response=$(curl -s -H "Authorization: token $token" "$repo_url")
-    http_code=$(curl -s -o /dev/null -w "%{http_code}" -H "Authorization: token $token" "$repo_url")
+    # Une seule requête via le client partagé (limites de taux et nouvelles tentatives gérées)
+    local output
+    output=$(github_api_request GET "/repos/$organization/$client_name" "$token")
+    http_code=$(echo "$output" | head -n 1)
+    response=$(echo "$output" | tail -n +2)
     
     case "$http_code" in
         200)
@@ -58,7 +74,6 @@ create_github_repository() {
     echo "🚀 Création du dépôt GitHub: $organization/$client_name"
     
     # Créer le dépôt dans l'organisation
-    local api_url="https://api.github.com/orgs/$organization/repos"
     local payload=$(jq -n \
         --arg name "$client_name" \
         --arg description "$description" \
@@ -72,12 +87,7 @@ create_github_repository() {
             auto_init: false
         }')
     
-    response=$(curl -s -X POST \
-        -H "Authorization: token $token" \
-        -H "Accept: application/vnd.github.v3+json" \
-        -H "Content-Type: application/json" \
-        -d "$payload" \
-        "$api_url")
+    response=$(github_api_request POST "/orgs/$organization/repos" "$token" "$payload" | tail -n +2)
     
     if echo "$response" | jq -e '.clone_url' >/dev/null 2>&1; then
         clone_url=$(echo "$response" | jq -r '.clone_url')
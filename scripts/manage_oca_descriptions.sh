@@ -31,8 +31,8 @@ COMMANDES:
   list                    Lister toutes les descriptions
   missing [fr|en]         Lister les descriptions manquantes pour une langue
   edit [REPO] [LANG]      Éditer une description spécifique
-  auto-complete [LANG]    Compléter automatiquement les descriptions manquantes via traduction dynamique
-  complete-missing [LANG] [--limit N] [--delay S]  Alias pour auto-complete avec options avancées
+  auto-complete [LANG|all]  Compléter automatiquement les descriptions manquantes via traduction dynamique
+  complete-missing [LANG|all] [--limit N]  Alias pour auto-complete avec options avancées
   test-translate [REPO] [LANG]  Tester la traduction d'un dépôt spécifique
   validate               Valider le format du fichier de descriptions
   stats                  Afficher les statistiques des descriptions
@@ -46,7 +46,7 @@ EXEMPLES:
   $0 edit account-analytic fr          # Éditer la description française de account-analytic
   $0 auto-complete en                  # Compléter automatiquement les descriptions anglaises
   $0 complete-missing fr --limit 10   # Compléter max 10 descriptions françaises
-  $0 complete-missing en --delay 3     # Compléter avec 3s de délai entre requêtes
+  $0 complete-missing all              # Compléter toutes les langues en une passe
   $0 test-translate server-tools fr    # Tester la traduction de server-tools en français
   $0 validate                          # Valider le fichier de descriptions
 
@@ -256,126 +256,26 @@ test_translate() {
 auto_complete() {
     local lang="${1:-fr}"
     local limit="${2:-}"
-    local delay="${3:-0.5}"
     
-    if [[ ! "$lang" =~ ^(fr|en)$ ]]; then
-        echo_error "Langue non supportée: $lang (fr/en uniquement)"
+    if [[ ! "$lang" =~ ^(fr|en|all)$ ]]; then
+        echo_error "Langue non supportée: $lang (fr/en/all uniquement)"
         exit 1
     fi
+    [ "$lang" = "all" ] && lang="fr,en"
     
-    echo_info "🤖 Complétion automatique des descriptions via traduction dynamique pour la langue '$lang'..."
-    echo_info "🌐 Récupération des descriptions GitHub et traduction en temps réel..."
-    
+    echo_info "🤖 Complétion automatique des descriptions via traduction dynamique pour '$lang'..."
+    echo_info "🌐 Récupération des descriptions GitHub et traduction en parallèle..."
     if [ -n "$limit" ]; then
         echo_info "⚙️  Limite fixée à $limit descriptions"
     fi
-    echo_info "⏱️  Délai entre requêtes: ${delay}s"
-    echo
-    
-    # Créer une sauvegarde
-    local backup_file="${DESCRIPTIONS_FILE}.backup.$(date +%Y%m%d_%H%M%S)"
-    cp "$DESCRIPTIONS_FILE" "$backup_file"
-    echo_info "Sauvegarde créée: $backup_file"
-    
-    local updated_count=0
-    local failed_count=0
-    local skipped_count=0
-    local descriptions=$(cat "$DESCRIPTIONS_FILE")
-    
-    # Parcourir tous les dépôts avec des descriptions manquantes
-    local missing_repos=$(echo "$descriptions" | jq -r --arg lang "$lang" 'to_entries[] | select(.value[$lang] == "" or (.value[$lang] | not)) | .key')
-    local total_missing=$(echo "$missing_repos" | wc -l)
-    
-    # Appliquer la limite si spécifiée
-    if [ -n "$limit" ] && [ "$limit" -lt "$total_missing" ]; then
-        missing_repos=$(echo "$missing_repos" | head -n "$limit")
-        total_missing="$limit"
-        echo_info "🔢 Traitement limité à $limit descriptions sur $(echo "$descriptions" | jq -r --arg lang "$lang" 'to_entries[] | select(.value[$lang] == "" or (.value[$lang] | not)) | .key' | wc -l) manquantes"
-    fi
-    
-    echo_info "🔍 $total_missing dépôts à traiter..."
     echo
     
-    local current=0
-    while IFS= read -r repo; do
-        if [ -n "$repo" ]; then
-            current=$((current + 1))
-            echo_info "[$current/$total_missing] Traitement de '$repo'..."
-            
-            # Appeler le script Python pour obtenir la description traduite
-            local translated_desc=$(python3 "$SCRIPT_DIR/translate_description.py" "$repo" "$lang" 2>/dev/null)
-            local exit_code=$?
-            
-            if [ $exit_code -eq 0 ] && [ -n "$translated_desc" ] && [ "$translated_desc" != "null" ]; then
-                # Mettre à jour le JSON avec la description traduite
-                descriptions=$(echo "$descriptions" | jq --arg repo "$repo" --arg lang "$lang" --arg desc "$translated_desc" '.[$repo][$lang] = $desc')
-                echo "  ✅ $repo: \"$translated_desc\""
-                updated_count=$((updated_count + 1))
-            else
-                # En cas d'échec, essayer une description de fallback basique
-                local fallback_desc=""
-                case "$repo" in
-                    connector-*|connector_*)
-                        if [ "$lang" = "fr" ]; then 
-                            fallback_desc="Connecteur pour intégrations externes"
-                        else 
-                            fallback_desc="Connector for external integrations"
-                        fi ;;
-                    *account*)
-                        if [ "$lang" = "fr" ]; then 
-                            fallback_desc="Modules comptables"
-                        else 
-                            fallback_desc="Accounting modules"
-                        fi ;;
-                    *l10n*)
-                        if [ "$lang" = "fr" ]; then 
-                            fallback_desc="Localisation"
-                        else 
-                            fallback_desc="Localization"
-                        fi ;;
-                    *stock*)
-                        if [ "$lang" = "fr" ]; then 
-                            fallback_desc="Gestion de stock"
-                        else 
-                            fallback_desc="Stock management"
-                        fi ;;
-                    *)
-                        if [ "$lang" = "fr" ]; then 
-                            fallback_desc="Module OCA"
-                        else 
-                            fallback_desc="OCA module"
-                        fi ;;
-                esac
-                
-                if [ -n "$fallback_desc" ] && [ "$fallback_desc" != "Module OCA" ] && [ "$fallback_desc" != "OCA module" ]; then
-                    descriptions=$(echo "$descriptions" | jq --arg repo "$repo" --arg lang "$lang" --arg desc "$fallback_desc" '.[$repo][$lang] = $desc')
-                    echo "  ⚠️  $repo: \"$fallback_desc\" (fallback)"
-                    skipped_count=$((skipped_count + 1))
-                else
-                    echo "  ❌ $repo: Échec de la traduction"
-                    failed_count=$((failed_count + 1))
-                fi
-            fi
-            
-            # Délai configurable pour éviter le rate limiting
-            if [ "$current" -lt "$total_missing" ]; then
-                sleep "$delay"
-            fi
-        fi
-    done <<< "$missing_repos"
-    
-    # Sauvegarder les modifications
-    echo "$descriptions" | jq '.' > "$DESCRIPTIONS_FILE"
+    # Pipeline Python : lecture unique du fichier, récupération et traductions
+    # concurrentes, écriture atomique (avec sauvegarde) en une seule fois
+    python3 "$SCRIPT_DIR/fill_oca_descriptions.py" --lang "$lang" ${limit:+--limit "$limit"}
     
     echo
-    echo_success "Complétion automatique terminée !"
-    echo "📊 Résultats:"
-    echo "  - ✅ Descriptions traduites: $updated_count"
-    echo "  - ⚠️  Descriptions de fallback: $skipped_count"
-    echo "  - ❌ Échecs: $failed_count"
-    echo "  - 📈 Total traité: $((updated_count + skipped_count + failed_count))"
-    echo
-    echo_info "💡 Utilisez '$0 missing $lang' pour voir les descriptions encore manquantes"
+    echo_info "💡 Utilisez '$0 missing ${1:-fr}' pour voir les descriptions encore manquantes"
     echo_info "💡 Les descriptions traduites sont mises en cache pour éviter les requêtes répétées"
 }
 
@@ -473,7 +373,6 @@ main() {
             # Parser les options pour complete-missing
             local lang="$2"
             local limit=""
-            local delay=""
             
             # Parser les arguments restants
             shift 2
@@ -484,7 +383,7 @@ main() {
                         shift 2
                         ;;
                     --delay)
-                        delay="$2"
+                        # Conservé pour compatibilité : le pipeline régule lui-même ses appels
                         shift 2
                         ;;
                     *)
@@ -494,7 +393,7 @@ main() {
                 esac
             done
             
-            auto_complete "$lang" "$limit" "$delay"
+            auto_complete "$lang" "$limit"
             ;;
         "test-translate")
             check_dependencies
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+Index local (SQLite) des addons OCA par version d'Odoo
+
+Les manifestes `__manifest__.py` sont lus directement dans les arbres git en
+cache (dépôts bare dans le cache local et checkouts des submodules clients),
+analysés avec `ast` sans jamais être exécutés, et réindexés uniquement lorsque
+le commit de la branche a changé.
+"""
+
+import argparse
+import ast
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CONFIG_DIR = ROOT_DIR / "config"
+CACHE_DIR = Path(
+    os.environ.get(
+        "ODOO_CLIENT_GENERATOR_CACHE",
+        Path.home() / ".cache" / "odoo_client_generator",
+    )
+)
+DEFAULT_DB_PATH = CACHE_DIR / "oca_addons.db"
+REPOS_CACHE_DIR = CACHE_DIR / "repos"
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repositories (
+    repo TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    commit_sha TEXT NOT NULL,
+    addon_count INTEGER NOT NULL DEFAULT 0,
+    indexed_at REAL NOT NULL,
+    PRIMARY KEY (repo, branch)
+);
+CREATE TABLE IF NOT EXISTS addons (
+    name TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    version TEXT NOT NULL DEFAULT '',
+    license TEXT NOT NULL DEFAULT '',
+    depends TEXT NOT NULL DEFAULT '[]',
+    external_dependencies TEXT NOT NULL DEFAULT '{}',
+    installable INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (name, repo, branch)
+);
+CREATE INDEX IF NOT EXISTS idx_addons_branch_name ON addons (branch, name);
+"""
+
+
+def parse_manifest(source: str) -> Optional[Dict[str, Any]]:
+    """Extrait le dictionnaire d'un manifeste Odoo sans l'exécuter"""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    for node in tree.body:
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Dict):
+            try:
+                manifest = ast.literal_eval(node.value)
+            except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+                return None
+            return manifest if isinstance(manifest, dict) else None
+    return None
+
+
+def _normalize_manifest(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """Ne conserve que les champs indexés, avec des types homogènes"""
+    depends = manifest.get("depends") or []
+    external = manifest.get("external_dependencies") or {}
+    return {
+        "summary": str(manifest.get("summary") or manifest.get("name") or "").strip(),
+        "version": str(manifest.get("version") or ""),
+        "license": str(manifest.get("license") or ""),
+        "depends": [str(d) for d in depends] if isinstance(depends, (list, tuple)) else [],
+        "external_dependencies": {
+            str(kind): [str(dep) for dep in deps]
+            for kind, deps in (external.items() if isinstance(external, dict) else [])
+            if isinstance(deps, (list, tuple))
+        },
+        "installable": bool(manifest.get("installable", True)),
+    }
+
+
+def _git(git_dir: Path, *args: str, input_data: Optional[bytes] = None, timeout: int = 120) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", "-C", str(git_dir), *args],
+        input=input_data,
+        capture_output=True,
+        timeout=timeout,
+    )
+
+
+def resolve_commit(git_dir: Path, ref: str) -> Optional[str]:
+    """Retourne le SHA du commit pointé par `ref`, ou None"""
+    result = _git(git_dir, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")
+    if result.returncode != 0:
+        return None
+    return result.stdout.decode().strip() or None
+
+
+def commit_time(git_dir: Path, commit: str) -> int:
+    """Date (timestamp du committer) d'un commit, 0 si illisible"""
+    result = _git(git_dir, "show", "-s", "--format=%ct", commit)
+    try:
+        return int(result.stdout.decode().strip()) if result.returncode == 0 else 0
+    except ValueError:
+        return 0
+
+
+def read_tree_manifests(git_dir: Path, commit: str) -> Dict[str, Dict[str, Any]]:
+    """Lit tous les manifestes de premier niveau d'un commit
+
+    Un seul `git ls-tree` et un seul `git cat-file --batch` par dépôt, quelle
+    que soit la taille du dépôt.
+    """
+    listing = _git(git_dir, "ls-tree", "-z", commit)
+    if listing.returncode != 0:
+        return {}
+
+    directories = []
+    for entry in listing.stdout.split(b"\0"):
+        if not entry:
+            continue
+        meta, _, path = entry.partition(b"\t")
+        if meta.split(b" ")[1:2] == [b"tree"] and not path.startswith(b"."):
+            directories.append(path.decode("utf-8", errors="replace"))
+
+    if not directories:
+        return {}
+
+    requests_data = "".join(f"{commit}:{d}/__manifest__.py\n" for d in directories)
+    batch = _git(git_dir, "cat-file", "--batch", input_data=requests_data.encode())
+    if batch.returncode != 0:
+        return {}
+
+    manifests = {}
+    output = batch.stdout
+    offset = 0
+    for directory in directories:
+        header_end = output.index(b"\n", offset)
+        header = output[offset:header_end].split(b" ")
+        offset = header_end + 1
+        if len(header) != 3 or header[1] != b"blob":
+            # "<objet> missing" : ce dossier n'est pas un addon
+            continue
+        size = int(header[2])
+        content = output[offset:offset + size]
+        offset += size + 1  # contenu suivi d'un saut de ligne
+
+        manifest = parse_manifest(content.decode("utf-8", errors="replace"))
+        if manifest is not None:
+            manifests[directory] = _normalize_manifest(manifest)
+
+    return manifests
+
+
+class AddonIndex:
+    """Accès à l'index SQLite des addons"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.conn.executescript(
+                "DROP TABLE IF EXISTS addons; DROP TABLE IF EXISTS repositories;"
+            )
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def indexed_commit(self, repo: str, branch: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT commit_sha FROM repositories WHERE repo = ? AND branch = ?",
+            (repo, branch),
+        ).fetchone()
+        return row["commit_sha"] if row else None
+
+    def replace_repository(self, repo: str, branch: str, commit: str, addons: Dict[str, Dict[str, Any]]):
+        """Remplace atomiquement les addons d'un dépôt pour une branche"""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM addons WHERE repo = ? AND branch = ?", (repo, branch)
+            )
+            self.conn.executemany(
+                "INSERT INTO addons (name, repo, branch, summary, version, license,"
+                " depends, external_dependencies, installable)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        name, repo, branch, data["summary"], data["version"],
+                        data["license"], json.dumps(data["depends"]),
+                        json.dumps(data["external_dependencies"]),
+                        1 if data["installable"] else 0,
+                    )
+                    for name, data in addons.items()
+                ],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO repositories (repo, branch, commit_sha, addon_count, indexed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (repo, branch, commit, len(addons), time.time()),
+            )
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "name": row["name"],
+            "repository": row["repo"],
+            "version": row["branch"],
+            "summary": row["summary"],
+            "addon_version": row["version"],
+            "license": row["license"],
+            "depends": json.loads(row["depends"]),
+            "external_dependencies": json.loads(row["external_dependencies"]),
+            "installable": bool(row["installable"]),
+        }
+
+    def find(self, name: str, branch: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retourne les dépôts qui contiennent l'addon `name`"""
+        query = "SELECT * FROM addons WHERE name = ?"
+        params: Tuple[Any, ...] = (name,)
+        if branch:
+            query += " AND branch = ?"
+            params += (branch,)
+        query += " ORDER BY branch DESC, installable DESC, repo"
+        return [self._row_to_dict(row) for row in self.conn.execute(query, params)]
+
+    def search(self, text: str, branch: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Recherche simple (LIKE) sur le nom technique et le résumé"""
+        pattern = f"%{text}%"
+        query = "SELECT * FROM addons WHERE (name LIKE ? OR summary LIKE ?)"
+        params: Tuple[Any, ...] = (pattern, pattern)
+        if branch:
+            query += " AND branch = ?"
+            params += (branch,)
+        query += " ORDER BY (name = ?) DESC, (name LIKE ?) DESC, name LIMIT ?"
+        params += (text, f"{text}%", limit)
+        return [self._row_to_dict(row) for row in self.conn.execute(query, params)]
+
+    def iter_addons(self, branch: Optional[str] = None) -> Iterable[Dict[str, Any]]:
+        query = "SELECT * FROM addons"
+        params: Tuple[Any, ...] = ()
+        if branch:
+            query += " WHERE branch = ?"
+            params = (branch,)
+        for row in self.conn.execute(query, params):
+            yield self._row_to_dict(row)
+
+    def stats(self) -> Dict[str, Any]:
+        per_branch = {
+            row["branch"]: {"repositories": row["repos"], "addons": row["addons"]}
+            for row in self.conn.execute(
+                "SELECT branch, COUNT(*) AS repos, SUM(addon_count) AS addons"
+                " FROM repositories GROUP BY branch ORDER BY branch"
+            )
+        }
+        return {"database": str(self.db_path), "branches": per_branch}
+
+
+def load_versions() -> List[str]:
+    with open(CONFIG_DIR / "odoo_versions.json", "r") as f:
+        return list(json.load(f)["odoo_versions"].keys())
+
+
+def load_oca_repositories() -> Dict[str, Dict[str, Any]]:
+    with open(CONFIG_DIR / "repositories.json", "r") as f:
+        return json.load(f).get("oca_repositories", {})
+
+
+def fetch_repository(repo: str, url: str, versions: List[str]) -> Tuple[str, bool, str]:
+    """Met à jour le dépôt bare en cache (fetch superficiel des branches de version)"""
+    git_dir = REPOS_CACHE_DIR / f"{repo}.git"
+    if not git_dir.exists():
+        git_dir.parent.mkdir(parents=True, exist_ok=True)
+        init = subprocess.run(
+            ["git", "init", "--bare", "--quiet", str(git_dir)], capture_output=True, text=True
+        )
+        if init.returncode != 0:
+            return repo, False, init.stderr.strip()
+
+    refspecs = [f"+refs/heads/{v}:refs/heads/{v}" for v in versions]
+    result = subprocess.run(
+        ["git", "-C", str(git_dir), "fetch", "--quiet", "--depth", "1", "--no-tags", url, *refspecs],
+        capture_output=True,
+        text=True,
+        timeout=600,
+    )
+    if result.returncode == 0:
+        return repo, True, ""
+
+    # Certaines branches n'existent pas pour ce dépôt : on les récupère une par une
+    fetched = []
+    for refspec, version in zip(refspecs, versions):
+        single = subprocess.run(
+            ["git", "-C", str(git_dir), "fetch", "--quiet", "--depth", "1", "--no-tags", url, refspec],
+            capture_output=True,
+            text=True,
+            timeout=600,
+        )
+        if single.returncode == 0:
+            fetched.append(version)
+    if fetched:
+        return repo, True, f"branches disponibles: {', '.join(fetched)}"
+    return repo, False, result.stderr.strip()
+
+
+def fetch_repositories(repos: Optional[List[str]] = None, versions: Optional[List[str]] = None, jobs: int = 8) -> Dict[str, Any]:
+    """Récupère en parallèle les dépôts OCA dans le cache local"""
+    versions = versions or load_versions()
+    catalog = load_oca_repositories()
+    selected = repos or sorted(catalog.keys())
+
+    fetched, failed = [], {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = [
+            executor.submit(fetch_repository, repo, catalog[repo]["url"], versions)
+            for repo in selected
+            if repo in catalog
+        ]
+        for future in as_completed(futures):
+            repo, ok, message = future.result()
+            if ok:
+                fetched.append(repo)
+            else:
+                failed[repo] = message
+            print(f"{'✅' if ok else '❌'} {repo} {message}".rstrip(), file=sys.stderr)
+
+    return {"fetched": sorted(fetched), "failed": failed}
+
+
+def iter_git_sources(versions: List[str], repos: Optional[List[str]] = None) -> Iterable[Tuple[str, str, Path, str]]:
+    """Énumère les arbres git disponibles localement : (dépôt, branche, git_dir, ref)"""
+    wanted = set(repos) if repos else None
+
+    if REPOS_CACHE_DIR.is_dir():
+        for git_dir in sorted(REPOS_CACHE_DIR.glob("*.git")):
+            repo = git_dir.name[:-len(".git")]
+            if wanted is not None and repo not in wanted:
+                continue
+            for version in versions:
+                yield repo, version, git_dir, f"refs/heads/{version}"
+
+    # Les submodules des clients sont aussi des arbres git utilisables
+    clients_dir = ROOT_DIR / "clients"
+    if clients_dir.is_dir():
+        for client_dir in sorted(p for p in clients_dir.iterdir() if p.is_dir()):
+            version = detect_client_version(client_dir)
+            if version not in versions:
+                continue
+            addons_dir = client_dir / "addons"
+            if not addons_dir.is_dir():
+                continue
+            for checkout in sorted(addons_dir.iterdir()):
+                if not (checkout / ".git").exists():
+                    continue
+                if wanted is not None and checkout.name not in wanted:
+                    continue
+                yield checkout.name, version, checkout, "HEAD"
+
+
+def select_git_sources(versions: List[str], repos: Optional[List[str]] = None) -> List[Tuple[str, str, Path, str]]:
+    """Choisit un seul arbre git par (dépôt, branche) : (dépôt, branche, git_dir, commit)
+
+    Le miroir bare est prioritaire ; à défaut, le checkout client au commit le
+    plus récent. Indexer chaque source tour à tour ferait alterner le commit
+    enregistré d'une exécution à l'autre et tout réindexer à chaque fois.
+    """
+    selected: Dict[Tuple[str, str], Tuple[bool, int, Path, str]] = {}
+    for repo, branch, git_dir, ref in iter_git_sources(versions, repos):
+        commit = resolve_commit(git_dir, ref)
+        if not commit:
+            continue
+        key = (repo, branch)
+        mirror = ref != "HEAD"
+        current = selected.get(key)
+        if current is not None and (current[0] or (current[3] == commit and not mirror)):
+            continue
+        candidate = (mirror, 0 if mirror else commit_time(git_dir, commit), git_dir, commit)
+        if current is None or candidate[:2] > current[:2]:
+            selected[key] = candidate
+    return [(repo, branch, git_dir, commit) for (repo, branch), (_, _, git_dir, commit) in selected.items()]
+
+
+def detect_client_version(client_dir: Path) -> Optional[str]:
+    """Détecte la version Odoo d'un client (même logique que add_oca_module.sh)"""
+    compose_file = client_dir / "docker-compose.yml"
+    if not compose_file.exists():
+        return None
+    for line in compose_file.read_text(errors="replace").splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#") or not stripped.startswith("image:") or "odoo" not in stripped:
+            continue
+        tag = stripped.rsplit(":", 1)[-1].strip()
+        if tag.replace(".", "").isdigit():
+            return tag
+    return None
+
+
+def update_index(index: AddonIndex, versions: Optional[List[str]] = None, repos: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+    """Réindexe les arbres git dont le commit a changé depuis la dernière indexation"""
+    versions = versions or load_versions()
+    report = {"indexed": [], "unchanged": 0, "addons": 0}
+
+    for repo, branch, git_dir, commit in select_git_sources(versions, repos):
+        if not force and index.indexed_commit(repo, branch) == commit:
+            report["unchanged"] += 1
+            continue
+
+        addons = read_tree_manifests(git_dir, commit)
+        index.replace_repository(repo, branch, commit, addons)
+        report["indexed"].append({"repository": repo, "version": branch, "commit": commit, "addons": len(addons)})
+        report["addons"] += len(addons)
+
+    return report
+
+
+def _print_addons(addons: List[Dict[str, Any]]):
+    if not addons:
+        print("Aucun addon trouvé")
+        return
+    for addon in addons:
+        flag = "" if addon["installable"] else " (non installable)"
+        print(f"📦 {addon['name']} [{addon['version']}] - {addon['repository']}{flag}")
+        if addon["summary"]:
+            print(f"     {addon['summary']}")
+        if addon["depends"]:
+            print(f"     depends: {', '.join(addon['depends'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index local des addons OCA par version d'Odoo")
+    parser.add_argument("--db", help="Chemin de la base SQLite (défaut: cache utilisateur)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fetch_parser = subparsers.add_parser("fetch", help="Récupérer les dépôts OCA dans le cache git local")
+    fetch_parser.add_argument("--version", action="append", help="Version(s) Odoo (défaut: toutes)")
+    fetch_parser.add_argument("--repo", action="append", help="Dépôt(s) à récupérer (défaut: tous)")
+    fetch_parser.add_argument("--jobs", type=int, default=8, help="Nombre de récupérations parallèles")
+
+    update_parser = subparsers.add_parser("update", help="Mettre à jour l'index depuis les arbres git en cache")
+    update_parser.add_argument("--version", action="append", help="Version(s) Odoo (défaut: toutes)")
+    update_parser.add_argument("--repo", action="append", help="Dépôt(s) à indexer (défaut: tous)")
+    update_parser.add_argument("--force", action="store_true", help="Réindexer même si le commit n'a pas changé")
+
+    find_parser = subparsers.add_parser("find", help="Trouver le dépôt contenant un addon")
+    find_parser.add_argument("addon")
+    find_parser.add_argument("--version")
+
+    search_parser = subparsers.add_parser("search", help="Rechercher des addons par nom ou résumé")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--version")
+    search_parser.add_argument("--limit", type=int, default=20)
+
+    subparsers.add_parser("stats", help="Statistiques de l'index")
+
+    args = parser.parse_args()
+
+    if args.command == "fetch":
+        result = fetch_repositories(args.repo, args.version, args.jobs)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print(f"✅ {len(result['fetched'])} dépôts récupérés, ❌ {len(result['failed'])} échecs")
+        sys.exit(0 if not result["failed"] else 1)
+
+    index = AddonIndex(args.db)
+    try:
+        if args.command == "update":
+            result = update_index(index, args.version, args.repo, args.force)
+            if args.json:
+                print(json.dumps(result, indent=2))
+            else:
+                for entry in result["indexed"]:
+                    print(f"🔄 {entry['repository']} ({entry['version']}): {entry['addons']} addons")
+                print(f"✅ {len(result['indexed'])} arbres indexés, {result['unchanged']} inchangés")
+        elif args.command == "find":
+            result = index.find(args.addon, args.version)
+            if args.json:
+                print(json.dumps(result, indent=2, ensure_ascii=False))
+            else:
+                _print_addons(result)
+        elif args.command == "search":
+            result = index.search(args.query, args.version, args.limit)
+            if args.json:
+                print(json.dumps(result, indent=2, ensure_ascii=False))
+            else:
+                _print_addons(result)
+        elif args.command == "stats":
+            print(json.dumps(index.stats(), indent=2))
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
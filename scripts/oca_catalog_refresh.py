@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Mise à jour incrémentale du catalogue des dépôts OCA (config/repositories.json)
+
+Alternative rapide à update_oca_repositories.sh : la liste des dépôts de
+l'organisation est récupérée avec des requêtes conditionnelles (ETag, les
+réponses 304 ne consomment pas de quota), puis seuls les dépôts nouveaux ou
+dont `pushed_at` a changé depuis le dernier passage sont re-vérifiés. Les
+dépôts archivés ou disparus sont retirés. L'état par dépôt est conservé dans
+le cache (catalog_state.json).
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import requests
+
+from github_client import GitHubClient, RateLimitExceeded
+from oca_addon_index import CACHE_DIR
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CONFIG_DIR = ROOT_DIR / "config"
+REPOSITORIES_FILE = CONFIG_DIR / "repositories.json"
+DESCRIPTIONS_FILE = CONFIG_DIR / "oca_descriptions.json"
+STATE_FILE = CACHE_DIR / "catalog_state.json"
+
+ORGANIZATION = "OCA"
+PER_PAGE = 100
+STATE_VERSION = 1
+
+# Mêmes règles de filtrage que filter_odoo_repositories() dans update_oca_repositories.sh
+EXCLUDED_REPOSITORIES = {
+    "odoo-sphinx-autodoc", "pylint-odoo", "odoo-test-helper", "openupgradelib",
+    "openupgrade-addons", "maintainer-tools", "maintainer-quality-tools",
+    "oca-addons-repo-template", "odoo-addon-template", "oca-port", "oca-github-bot",
+    "odoo-pre-commit-hooks", "setuptools-odoo", "oca-custom", ".github",
+    "repo-maintainer", "repo-maintainer-conf", "oca-ci", "oca-weblate-deployment",
+    "mirrors-flake8",
+}
+EXCLUDED_PREFIX = re.compile(r"^(odoo|addons|modules)")
+EXCLUDED_SUFFIX = re.compile(r"(tools?|helper|template|bot|sphinx|pylint|test|upgrade|setup|hook|custom|maintainer|mirror|\.github)$")
+MAX_VERIFIED_DIRS = 5
+
+# Résultats de verify_odoo_addons()
+ADDONS_FOUND = "found"
+ADDONS_ABSENT = "absent"
+ADDONS_UNKNOWN = "unknown"  # erreur réseau/API : ne rien conclure
+
+
+def is_odoo_repository(repo: Dict[str, Any]) -> bool:
+    """Dépôt non archivé et susceptible de contenir des addons Odoo"""
+    name = repo["name"]
+    return not (
+        repo.get("archived")
+        or name in EXCLUDED_REPOSITORIES
+        or EXCLUDED_PREFIX.search(name)
+        or EXCLUDED_SUFFIX.search(name)
+    )
+
+
+def _write_json_atomic(path: Path, data: Any):
+    """Écrit un fichier JSON de façon atomique (fichier temporaire + os.replace)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _load_json(path: Path, default: Any) -> Any:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def load_state() -> Dict[str, Any]:
+    state = _load_json(STATE_FILE, {})
+    if state.get("version") != STATE_VERSION:
+        state = {"version": STATE_VERSION, "pages": {}, "repos": {}}
+    return state
+
+
+def fetch_organization_repositories(client: GitHubClient, state: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """Liste les dépôts de l'organisation ; les pages inchangées (304) viennent du cache"""
+    repos: List[Dict[str, Any]] = []
+    unchanged_pages = 0
+    page = 1
+    while True:
+        cached = state["pages"].get(str(page))
+        headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+        response = client.get(
+            f"/orgs/{ORGANIZATION}/repos",
+            params={"page": page, "per_page": PER_PAGE, "sort": "full_name"},
+            headers=headers,
+        )
+
+        if response.status_code == 304 and cached:
+            items = cached["items"]
+            unchanged_pages += 1
+        else:
+            response.raise_for_status()
+            items = [
+                {
+                    "name": r["name"],
+                    "url": r["clone_url"],
+                    "description": r.get("description") or "",
+                    "stars": r.get("stargazers_count", 0),
+                    "updated_at": r.get("updated_at"),
+                    "pushed_at": r.get("pushed_at"),
+                    "archived": r.get("archived", False),
+                }
+                for r in response.json()
+            ]
+            state["pages"][str(page)] = {"etag": response.headers.get("ETag"), "items": items}
+
+        repos.extend(items)
+        if len(items) < PER_PAGE:
+            break
+        page += 1
+
+    # Oublier les pages qui n'existent plus (l'organisation a rétréci)
+    for stale in [p for p in state["pages"] if int(p) > page]:
+        del state["pages"][stale]
+    return repos, unchanged_pages
+
+
+def verify_odoo_addons(client: GitHubClient, repo_name: str) -> Tuple[str, Optional[str]]:
+    """Cherche un dossier contenant un __manifest__.py
+
+    Retourne (ADDONS_FOUND, dossier), (ADDONS_ABSENT, None) ou, si l'API n'a
+    pas permis de conclure (erreur réseau, 403, 5xx...), (ADDONS_UNKNOWN, None).
+    """
+    try:
+        response = client.get(f"/repos/{ORGANIZATION}/{repo_name}/contents")
+        if response.status_code == 404:
+            # Dépôt vide
+            return ADDONS_ABSENT, None
+        if response.status_code != 200:
+            return ADDONS_UNKNOWN, None
+        directories = [item["name"] for item in response.json() if item.get("type") == "dir"]
+        inconclusive = False
+        for directory in directories[:MAX_VERIFIED_DIRS]:
+            manifest = client.head(f"/repos/{ORGANIZATION}/{repo_name}/contents/{directory}/__manifest__.py")
+            if manifest.status_code == 200:
+                return ADDONS_FOUND, directory
+            if manifest.status_code != 404:
+                inconclusive = True
+    except requests.RequestException:
+        return ADDONS_UNKNOWN, None
+    return (ADDONS_UNKNOWN if inconclusive else ADDONS_ABSENT), None
+
+
+def _description_for(descriptions: Dict[str, Dict[str, str]], name: str, language: str) -> str:
+    """Même règle que manage_descriptions()/update_repositories_file() du script shell"""
+    entry = descriptions.get(name)
+    if entry is None:
+        return "Module OCA"
+    for lang in (language, "en", "fr"):
+        if entry.get(lang) is not None:
+            return entry[lang]
+    return "Description à compléter"
+
+
+def refresh_catalog(language: str = "fr", verify: bool = True, jobs: int = 4, dry_run: bool = False) -> Dict[str, Any]:
+    """Met à jour repositories.json en ne re-vérifiant que les dépôts modifiés"""
+    start = time.monotonic()
+    state = load_state()
+    config = _load_json(REPOSITORIES_FILE, {"oca_repositories": {}, "external_repositories": {}})
+    current = config.get("oca_repositories", {})
+    descriptions = _load_json(DESCRIPTIONS_FILE, {})
+    client = GitHubClient()
+
+    listing, unchanged_pages = fetch_organization_repositories(client, state)
+    candidates = [repo for repo in listing if is_odoo_repository(repo)]
+
+    to_verify = []
+    for repo in candidates:
+        known = state["repos"].get(repo["name"])
+        if known is not None:
+            changed = known.get("pushed_at") != repo["pushed_at"]
+        else:
+            # Pas encore d'état : on se fie au `last_updated` déjà enregistré
+            changed = current.get(repo["name"], {}).get("last_updated") != repo["updated_at"]
+            if not changed:
+                state["repos"][repo["name"]] = {"pushed_at": repo["pushed_at"], "has_addons": True}
+        if changed:
+            to_verify.append(repo)
+
+    unknown: Set[str] = set()
+    if verify and to_verify:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            results = executor.map(lambda r: verify_odoo_addons(client, r["name"]), to_verify)
+            for repo, (status, manifest_dir) in zip(to_verify, results):
+                if status == ADDONS_UNKNOWN:
+                    # État précédent conservé, pushed_at non enregistré : re-vérifié au prochain passage
+                    unknown.add(repo["name"])
+                    continue
+                state["repos"][repo["name"]] = {
+                    "pushed_at": repo["pushed_at"],
+                    "has_addons": status == ADDONS_FOUND,
+                    "manifest_dir": manifest_dir,
+                }
+    else:
+        for repo in to_verify:
+            state["repos"][repo["name"]] = {"pushed_at": repo["pushed_at"], "has_addons": True}
+
+    def has_addons(name: str) -> bool:
+        known = state["repos"].get(name)
+        if known is not None:
+            return bool(known.get("has_addons"))
+        # Vérification non concluante sans état antérieur : on garde le catalogue tel quel
+        return name in unknown and name in current
+
+    kept = [repo for repo in candidates if has_addons(repo["name"])]
+    kept_names = {repo["name"] for repo in kept}
+    listed_names = {repo["name"] for repo in listing}
+    state["repos"] = {name: info for name, info in state["repos"].items() if name in listed_names}
+
+    added = sorted(kept_names - set(current))
+    removed = sorted(set(current) - kept_names)
+
+    new_descriptions = 0
+    for name in added:
+        if name not in descriptions:
+            descriptions[name] = {"fr": "", "en": ""}
+            new_descriptions += 1
+
+    oca_repositories = {}
+    for repo in sorted(kept, key=lambda r: r["name"]):
+        if repo["name"] in unknown and repo["name"] in current:
+            # Entrée précédente intacte (last_updated compris) jusqu'à une vérification concluante
+            oca_repositories[repo["name"]] = current[repo["name"]]
+            continue
+        oca_repositories[repo["name"]] = {
+            "url": repo["url"],
+            "description": _description_for(descriptions, repo["name"], language),
+            "stars": repo["stars"],
+            "last_updated": repo["updated_at"],
+        }
+    config["oca_repositories"] = oca_repositories
+    config.setdefault("external_repositories", {})
+
+    if not dry_run:
+        _write_json_atomic(REPOSITORIES_FILE, config)
+        if new_descriptions:
+            _write_json_atomic(DESCRIPTIONS_FILE, descriptions)
+        state["last_run"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        _write_json_atomic(STATE_FILE, state)
+
+    return {
+        "listed": len(listing),
+        "unchanged_pages": unchanged_pages,
+        "candidates": len(candidates),
+        "verified": len(to_verify) if verify else 0,
+        "unknown": sorted(unknown),
+        "repositories": len(oca_repositories),
+        "added": added,
+        "removed": removed,
+        "new_descriptions": new_descriptions,
+        "dry_run": dry_run,
+        "duration": round(time.monotonic() - start, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mise à jour incrémentale du catalogue des dépôts OCA")
+    parser.add_argument("--lang", choices=["fr", "en"], default="fr", help="Langue des descriptions (défaut: fr)")
+    parser.add_argument("--no-verify", action="store_true", help="Ne pas vérifier la présence d'addons Odoo")
+    parser.add_argument("--jobs", type=int, default=4, help="Vérifications parallèles")
+    parser.add_argument("--dry-run", action="store_true", help="Afficher les changements sans écrire les fichiers")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_args()
+
+    try:
+        report = refresh_catalog(args.lang, not args.no_verify, args.jobs, args.dry_run)
+    except (RateLimitExceeded, requests.RequestException) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    print(f"✅ {report['repositories']} dépôts OCA ({report['listed']} listés, "
+          f"{report['unchanged_pages']} page(s) inchangée(s), {report['verified']} re-vérifié(s)) "
+          f"en {report['duration']}s")
+    for name in report["added"]:
+        print(f"   ✨ {name}")
+    for name in report["removed"]:
+        print(f"   🗑️  {name}")
+    if report["unknown"]:
+        print(f"⚠️  Vérification non concluante (entrée conservée): {', '.join(report['unknown'])}")
+    if report["new_descriptions"]:
+        print(f"⚠️  {report['new_descriptions']} nouvelle(s) description(s) à compléter "
+              "(./scripts/manage_oca_descriptions.sh complete-missing)")
+
+
+if __name__ == "__main__":
+    main()
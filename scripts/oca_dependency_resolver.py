@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Résolution transitive des dépendances d'addons OCA
+
+À partir d'une liste d'addons cibles et d'une version d'Odoo, calcule la
+fermeture transitive des `depends` à l'aide de l'index local des addons
+(oca_addon_index.py) et des manifestes déjà présents chez le client, puis
+produit un plan : dépôts minimaux à ajouter en submodules et modules à lier
+dans extra-addons. Le plan peut être appliqué en une seule opération groupée.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import client_sparse_checkout
+import oca_addon_index
+import oca_mirror_cache
+from oca_addon_index import AddonIndex, detect_client_version, parse_manifest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CONFIG_DIR = ROOT_DIR / "config"
+CLIENTS_DIR = ROOT_DIR / "clients"
+
+# Dossiers du client contenant le code Odoo lui-même (cf. addons_path de odoo.conf)
+CORE_ADDON_DIRS = ("addons/odoo/addons", "addons/odoo/odoo/addons", "addons/enterprise")
+# Liste des modules standard par version, à défaut de sources Odoo chez le client
+CORE_ADDONS_FILE = CONFIG_DIR / "odoo_core_addons.json"
+
+
+class ResolutionError(Exception):
+    """Plan impossible à établir (addon cible introuvable, version inconnue...)"""
+
+
+def _read_local_manifest(addon_dir: Path) -> Optional[Dict[str, Any]]:
+    manifest_file = addon_dir / "__manifest__.py"
+    try:
+        manifest = parse_manifest(manifest_file.read_text(errors="replace"))
+    except OSError:
+        return None
+    return oca_addon_index._normalize_manifest(manifest) if manifest else None
+
+
+def load_core_addons(version: str) -> Tuple[Set[str], Tuple[str, ...]]:
+    """Modules standard d'Odoo pour `version` et préfixes réservés (l10n_...)"""
+    try:
+        with open(CORE_ADDONS_FILE, "r") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return set(), ()
+    return set(data.get("versions", {}).get(version, [])), tuple(data.get("prefixes", []))
+
+
+class ClientState:
+    """Ce qui est déjà présent chez un client : submodules, addons et liens"""
+
+    def __init__(self, client_dir: Optional[Path]):
+        self.client_dir = client_dir
+        self.repositories: Set[str] = set()
+        self.linked: Set[str] = set()
+        self.local_addons: Dict[str, Dict[str, Any]] = {}
+        self.core_addons: Set[str] = set()
+
+        if client_dir is None:
+            return
+
+        addons_dir = client_dir / "addons"
+        if addons_dir.is_dir():
+            for repo_dir in addons_dir.iterdir():
+                if not repo_dir.is_dir() or repo_dir.name in ("odoo", "enterprise"):
+                    continue
+                self.repositories.add(repo_dir.name)
+                for addon_dir in repo_dir.iterdir():
+                    manifest = _read_local_manifest(addon_dir) if addon_dir.is_dir() else None
+                    if manifest and manifest["installable"]:
+                        self.local_addons[addon_dir.name] = dict(manifest, repository=repo_dir.name)
+
+        for core_dir in CORE_ADDON_DIRS:
+            path = client_dir / core_dir
+            if path.is_dir():
+                self.core_addons.update(p.name for p in path.iterdir() if (p / "__manifest__.py").exists())
+
+        extra_addons = client_dir / "extra-addons"
+        if extra_addons.is_dir():
+            self.linked.update(p.name for p in extra_addons.iterdir())
+
+
+def _load_repository_catalog() -> Dict[str, Dict[str, Any]]:
+    with open(CONFIG_DIR / "repositories.json", "r") as f:
+        return json.load(f).get("oca_repositories", {})
+
+
+def resolve(targets: List[str], version: str, client: Optional[str] = None, index: Optional[AddonIndex] = None) -> Dict[str, Any]:
+    """Calcule le plan d'installation des addons `targets` et de leurs dépendances"""
+    client_dir = CLIENTS_DIR / client if client else None
+    if client_dir is not None and not client_dir.is_dir():
+        raise ResolutionError(f"Client '{client}' non trouvé")
+
+    state = ClientState(client_dir)
+    core_addons, core_prefixes = load_core_addons(version)
+    core_addons |= state.core_addons
+    catalog = _load_repository_catalog()
+
+    own_index = index is None
+    index = index or AddonIndex()
+    try:
+        candidates: Dict[str, List[Dict[str, Any]]] = {}
+        for addon in index.iter_addons(version):
+            if addon["installable"]:
+                candidates.setdefault(addon["name"], []).append(addon)
+    finally:
+        if own_index:
+            index.close()
+
+    if not candidates and not state.local_addons:
+        raise ResolutionError(
+            f"L'index des addons est vide pour la version {version} "
+            "(lancez: make addons-index-fetch && make addons-index-update)"
+        )
+
+    def manifest_for(name: str) -> Optional[Dict[str, Any]]:
+        """Manifeste à utiliser : local d'abord, sinon dépôt déjà présent, sinon le premier"""
+        if name in state.local_addons:
+            return state.local_addons[name]
+        options = candidates.get(name)
+        if not options:
+            return None
+        for option in options:
+            if option["repository"] in state.repositories:
+                return option
+        return options[0]
+
+    # Fermeture transitive (parcours en largeur)
+    graph: Dict[str, List[str]] = {}
+    core: Set[str] = set()
+    unresolved: Set[str] = set()
+    required_by: Dict[str, Set[str]] = {}
+    queue = list(dict.fromkeys(targets))
+    missing_targets = [t for t in queue if manifest_for(t) is None]
+    if missing_targets:
+        raise ResolutionError(
+            f"Addon(s) introuvable(s) pour Odoo {version}: {', '.join(missing_targets)}"
+        )
+
+    while queue:
+        name = queue.pop(0)
+        if name in graph or name in core or name in unresolved:
+            continue
+        manifest = manifest_for(name)
+        if manifest is None:
+            if name in core_addons or name.startswith(core_prefixes):
+                core.add(name)
+            else:
+                # Ni OCA, ni Odoo standard : module enterprise, privé ou mal orthographié
+                unresolved.add(name)
+            continue
+        graph[name] = list(manifest["depends"])
+        for dependency in manifest["depends"]:
+            required_by.setdefault(dependency, set()).add(name)
+            queue.append(dependency)
+
+    cycles = _find_cycles(graph)
+
+    # Choix des dépôts : ceux déjà présents d'abord, puis couverture gloutonne
+    assignment: Dict[str, str] = {}
+    to_cover: Dict[str, Set[str]] = {}
+    for name in graph:
+        if name in state.local_addons:
+            assignment[name] = state.local_addons[name]["repository"]
+            continue
+        repos = {c["repository"] for c in candidates.get(name, [])}
+        present = sorted(repos & state.repositories)
+        if present:
+            assignment[name] = present[0]
+        else:
+            to_cover[name] = repos
+
+    selected_repos: List[str] = []
+    while to_cover:
+        coverage: Dict[str, Set[str]] = {}
+        for name, repos in to_cover.items():
+            for repo in repos:
+                coverage.setdefault(repo, set()).add(name)
+        best = max(
+            coverage,
+            key=lambda r: (len(coverage[r]), catalog.get(r, {}).get("stars") or 0, r in catalog, -len(r)),
+        )
+        selected_repos.append(best)
+        for name in coverage[best]:
+            assignment[name] = best
+            del to_cover[name]
+
+    order = _topological_order(graph)
+    repositories_to_add = [
+        {
+            "name": repo,
+            "url": catalog.get(repo, {}).get("url", f"https://github.com/OCA/{repo}.git"),
+            "addons": [n for n in order if assignment.get(n) == repo],
+        }
+        for repo in sorted(selected_repos)
+    ]
+    modules_to_link = [
+        {"addon": name, "repository": assignment[name]}
+        for name in order
+        if name not in state.linked
+    ]
+
+    return {
+        "version": version,
+        "client": client,
+        "targets": list(dict.fromkeys(targets)),
+        "addons": {name: {"repository": assignment[name], "depends": graph[name]} for name in order},
+        "repositories_to_add": repositories_to_add,
+        "repositories_present": sorted({assignment[n] for n in graph} & state.repositories),
+        "modules_to_link": modules_to_link,
+        "already_linked": sorted(set(graph) & state.linked),
+        "core": sorted(core),
+        "unresolved": {name: sorted(required_by.get(name, [])) for name in sorted(unresolved)},
+        "cycles": cycles,
+    }
+
+
+def _find_cycles(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """Détecte les cycles de dépendances (parcours en profondeur itératif)"""
+    WHITE, GREY, BLACK = 0, 1, 2
+    color = {name: WHITE for name in graph}
+    cycles = []
+
+    for root in sorted(graph):
+        if color[root] != WHITE:
+            continue
+        stack = [(root, iter(graph[root]))]
+        path = [root]
+        color[root] = GREY
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                path.pop()
+                color[node] = BLACK
+            elif child not in graph:
+                continue
+            elif color[child] == GREY:
+                cycles.append(path[path.index(child):] + [child])
+            elif color[child] == WHITE:
+                color[child] = GREY
+                path.append(child)
+                stack.append((child, iter(graph[child])))
+    return cycles
+
+
+def _topological_order(graph: Dict[str, List[str]]) -> List[str]:
+    """Ordre dépendances d'abord ; les cycles éventuels sont rompus arbitrairement"""
+    order: List[str] = []
+    visited: Set[str] = set()
+
+    def visit(node: str, trail: Set[str]):
+        if node in visited or node in trail or node not in graph:
+            return
+        trail.add(node)
+        for child in sorted(graph[node]):
+            visit(child, trail)
+        trail.discard(node)
+        visited.add(node)
+        order.append(node)
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    for node in sorted(graph):
+        visit(node, set())
+    return order
+
+
+def _run(command: List[str], cwd: Path, timeout: int = 900) -> subprocess.CompletedProcess:
+    return subprocess.run(command, cwd=cwd, capture_output=True, text=True, timeout=timeout)
+
+
+def apply_plan(plan: Dict[str, Any], jobs: int = 4) -> Dict[str, Any]:
+    """Applique un plan sur le client : clones en parallèle, submodules, puis liens"""
+    client = plan.get("client")
+    if not client:
+        raise ResolutionError("Un client est requis pour appliquer le plan")
+    client_dir = CLIENTS_DIR / client
+    version = plan["version"]
+    report = {"added": [], "linked": [], "errors": []}
+
+    def clone(repo: Dict[str, Any]):
+        target = client_dir / "addons" / repo["name"]
+        if target.exists():
+            return repo, None
+        # Objets partagés avec le miroir local quand il est disponible
+        reference = []
+        if oca_mirror_cache.is_mirrored(repo["url"]):
+            try:
+                reference = ["--reference", str(oca_mirror_cache.ensure_mirror(repo["url"]))]
+            except (oca_mirror_cache.MirrorError, OSError, subprocess.TimeoutExpired):
+                pass
+        result = _run(
+            ["git", "clone", "--quiet", *reference, "--branch", version, "--single-branch", repo["url"], str(target)],
+            client_dir,
+        )
+        return repo, (None if result.returncode == 0 else result.stderr.strip())
+
+    (client_dir / "addons").mkdir(exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        clones = list(executor.map(clone, plan["repositories_to_add"]))
+
+    for repo, error in clones:
+        if error:
+            report["errors"].append(f"{repo['name']}: {error}")
+            continue
+        # Le dépôt est déjà cloné : `submodule add` se contente de l'enregistrer
+        path = f"addons/{repo['name']}"
+        result = _run(["git", "submodule", "add", "-b", version, repo["url"], path], client_dir)
+        if result.returncode != 0 and "already exists in the index" not in result.stderr:
+            report["errors"].append(f"{repo['name']}: {result.stderr.strip()}")
+            continue
+        report["added"].append(repo["name"])
+
+    if report["added"]:
+        # Range les .git des nouveaux submodules dans .git/modules comme un `submodule add` classique
+        _run(["git", "submodule", "absorbgitdirs"], client_dir)
+        oca_mirror_cache.relativize_alternates(client_dir)
+
+    if client_sparse_checkout.is_enabled(client_dir):
+        # Checkout partiel : extraire les addons à lier avant de créer les liens
+        include: Dict[str, List[str]] = {}
+        for entry in plan["modules_to_link"]:
+            include.setdefault(entry["repository"], []).append(entry["addon"])
+        client_sparse_checkout.apply(client_dir, include, jobs)
+
+    extra_addons = client_dir / "extra-addons"
+    extra_addons.mkdir(exist_ok=True)
+    for entry in plan["modules_to_link"]:
+        source = client_dir / "addons" / entry["repository"] / entry["addon"]
+        link = extra_addons / entry["addon"]
+        if not (source / "__manifest__.py").exists():
+            report["errors"].append(f"{entry['addon']}: introuvable dans addons/{entry['repository']}")
+            continue
+        target = f"../addons/{entry['repository']}/{entry['addon']}"
+        if link.is_symlink():
+            if os.readlink(link) != target:
+                # Lien vers un autre dépôt : choix de l'utilisateur, on ne le remplace pas
+                report["errors"].append(f"{entry['addon']}: extra-addons/{entry['addon']} pointe déjà vers {os.readlink(link)}")
+                continue
+        elif link.exists():
+            report["errors"].append(f"{entry['addon']}: extra-addons/{entry['addon']} existe déjà et n'est pas un lien")
+            continue
+        else:
+            link.symlink_to(target)
+        report["linked"].append(entry["addon"])
+
+    return report
+
+
+def resolve_for_client(client: str, targets: List[str], version: Optional[str] = None) -> Dict[str, Any]:
+    """Résout en détectant la version Odoo du client si elle n'est pas fournie"""
+    if not version:
+        version = detect_client_version(CLIENTS_DIR / client)
+        if not version:
+            raise ResolutionError(f"Impossible de détecter la version Odoo du client '{client}'")
+    return resolve(targets, version, client)
+
+
+def _print_plan(plan: Dict[str, Any]):
+    print(f"🎯 Addons cibles: {', '.join(plan['targets'])} (Odoo {plan['version']})")
+    print(f"📦 {len(plan['addons'])} addons OCA nécessaires")
+    if plan["repositories_to_add"]:
+        print("➕ Dépôts à ajouter:")
+        for repo in plan["repositories_to_add"]:
+            print(f"   - {repo['name']} ({', '.join(repo['addons'])})")
+    if plan["modules_to_link"]:
+        print("🔗 Modules à lier dans extra-addons:")
+        for entry in plan["modules_to_link"]:
+            print(f"   - {entry['addon']} ({entry['repository']})")
+    if plan["core"]:
+        print(f"🧩 Modules standard Odoo: {', '.join(plan['core'])}")
+    if plan["unresolved"]:
+        print("❌ Dépendances introuvables (ni OCA, ni Odoo standard):")
+        for name, parents in plan["unresolved"].items():
+            print(f"   - {name} (requis par {', '.join(parents)})")
+    for cycle in plan["cycles"]:
+        print(f"⚠️  Cycle de dépendances: {' -> '.join(cycle)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Résolution transitive des dépendances d'addons OCA")
+    parser.add_argument("addons", nargs="+", help="Addons cibles (noms techniques, séparés par des espaces ou des virgules)")
+    parser.add_argument("--version", help="Version Odoo (détectée depuis le client si omise)")
+    parser.add_argument("--client", help="Client cible (tient compte des dépôts et liens existants)")
+    parser.add_argument("--apply", action="store_true", help="Appliquer le plan sur le client")
+    parser.add_argument("--force", action="store_true",
+                        help="Appliquer même en cas de cycle ou de dépendance introuvable")
+    parser.add_argument("--jobs", type=int, default=4, help="Clones parallèles lors de l'application")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_args()
+
+    targets = [a.strip() for arg in args.addons for a in arg.split(",") if a.strip()]
+    try:
+        if args.client:
+            plan = resolve_for_client(args.client, targets, args.version)
+        elif args.version:
+            plan = resolve(targets, args.version)
+        else:
+            raise ResolutionError("--version est requis sans --client")
+        if args.apply:
+            if (plan["cycles"] or plan["unresolved"]) and not args.force:
+                _print_plan(plan)
+                raise ResolutionError("Plan incomplet, non appliqué (--force pour l'appliquer quand même)")
+            plan["applied"] = apply_plan(plan, args.jobs)
+    except ResolutionError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(plan, indent=2, ensure_ascii=False))
+    else:
+        _print_plan(plan)
+        if "applied" in plan:
+            applied = plan["applied"]
+            print(f"✅ {len(applied['added'])} dépôt(s) ajouté(s), {len(applied['linked'])} module(s) lié(s)")
+            for error in applied["errors"]:
+                print(f"❌ {error}")
+
+    sys.exit(1 if plan.get("applied", {}).get("errors") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Cache local de miroirs nus (bare) des dépôts OCA, partagé entre les clients
+
+Chaque dépôt est téléchargé une seule fois dans .cache/mirrors/<org>/<repo>.git
+(OCA_MIRROR_DIR pour changer l'emplacement). Les submodules des clients sont
+créés avec `--reference` : leurs objets restent dans le miroir, via le fichier
+objects/info/alternates, qui est réécrit en chemin relatif pour rester valide
+quand le dépôt est monté ailleurs (conteneur du serveur MCP).
+
+Les miroirs ne sont jamais nettoyés par git (gc.auto=0) : des objets encore
+référencés par un client ne doivent pas disparaître.
+
+Usage :
+    oca_mirror_cache.py path URL [--no-refresh]      # chemin du miroir (créé/rafraîchi si besoin)
+    oca_mirror_cache.py refresh [URL ...] [--jobs N] # rafraîchit (tous les miroirs par défaut)
+    oca_mirror_cache.py init-submodules CLIENT_DIR   # initialise les submodules via les miroirs
+    oca_mirror_cache.py relativize CLIENT_DIR        # réécrit les alternates en chemins relatifs
+    oca_mirror_cache.py status [--json]
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+MIRROR_DIR = Path(os.environ.get("OCA_MIRROR_DIR", ROOT_DIR / ".cache" / "mirrors"))
+# Un miroir récupéré il y a moins de MIRROR_MAX_AGE secondes n'est pas re-fetché
+MIRROR_MAX_AGE = float(os.environ.get("OCA_MIRROR_MAX_AGE", "600"))
+FETCH_TIMEOUT = 1800
+# Organisations dont les dépôts sont mis en miroir par init-submodules
+MIRRORED_ORGANIZATIONS = {"oca"}
+
+_URL_PATH = re.compile(r"[:/]([^/:]+)/([^/]+?)(?:\.git)?/?$")
+
+
+class MirrorError(Exception):
+    """Création ou mise à jour d'un miroir impossible"""
+
+
+def _git(args: List[str], cwd: Optional[Path] = None, timeout: int = FETCH_TIMEOUT) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, timeout=timeout)
+
+
+def mirror_path(url: str) -> Path:
+    """Emplacement du miroir d'une URL (https ou ssh) : <org>/<repo>.git"""
+    match = _URL_PATH.search(url.strip())
+    if not match:
+        raise MirrorError(f"URL de dépôt non reconnue: {url}")
+    return MIRROR_DIR / match.group(1) / f"{match.group(2)}.git"
+
+
+def is_mirrored(url: str) -> bool:
+    """Dépôt d'une organisation mise en miroir automatiquement (OCA)"""
+    match = _URL_PATH.search(url.strip())
+    return bool(match) and match.group(1).lower() in MIRRORED_ORGANIZATIONS
+
+
+@contextmanager
+def _locked(mirror: Path) -> Iterator[None]:
+    """Verrou inter-processus : deux créations de client peuvent viser le même miroir"""
+    mirror.parent.mkdir(parents=True, exist_ok=True)
+    with open(mirror.with_name(mirror.name + ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _last_fetch(mirror: Path) -> float:
+    try:
+        return (mirror / "FETCH_HEAD").stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def _fetch(mirror: Path):
+    result = _git(["fetch", "--quiet", "--prune", "--tags", "origin"], cwd=mirror)
+    if result.returncode != 0:
+        raise MirrorError(f"{mirror.name}: {result.stderr.strip()}")
+
+
+def ensure_mirror(url: str, refresh: bool = True, max_age: float = MIRROR_MAX_AGE) -> Path:
+    """Crée le miroir si besoin, et le rafraîchit s'il date de plus de `max_age` secondes"""
+    mirror = mirror_path(url)
+    with _locked(mirror):
+        if not (mirror / "HEAD").exists():
+            print(f"📥 Création du miroir {mirror.relative_to(MIRROR_DIR)}...", file=sys.stderr)
+            mirror.mkdir(parents=True, exist_ok=True)
+            for args in (
+                ["init", "--quiet", "--bare"],
+                ["remote", "add", "origin", url],
+                # Branches et tags uniquement (pas les refs/pull/* de GitHub)
+                ["config", "remote.origin.fetch", "+refs/heads/*:refs/heads/*"],
+                ["config", "gc.auto", "0"],
+                ["config", "core.logAllRefUpdates", "false"],
+            ):
+                _git(args, cwd=mirror)
+            try:
+                _fetch(mirror)
+            except MirrorError:
+                shutil.rmtree(mirror, ignore_errors=True)
+                raise
+        elif refresh and time.time() - _last_fetch(mirror) > max_age:
+            _fetch(mirror)
+    return mirror
+
+
+def refresh_mirrors(urls: Optional[List[str]] = None, jobs: int = 4) -> Dict[str, Any]:
+    """Rafraîchit en parallèle les miroirs donnés (tous les miroirs existants par défaut)"""
+    if urls is None:
+        urls = [
+            _git(["config", "remote.origin.url"], cwd=mirror).stdout.strip()
+            for mirror in sorted(MIRROR_DIR.glob("*/*.git"))
+        ]
+    urls = sorted({url for url in urls if url})
+    report: Dict[str, Any] = {"refreshed": [], "errors": []}
+
+    def refresh(url: str):
+        started = time.monotonic()
+        try:
+            ensure_mirror(url, max_age=0)
+            return url, round(time.monotonic() - started, 2), None
+        except (MirrorError, OSError, subprocess.TimeoutExpired) as e:
+            return url, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        for url, duration, error in executor.map(refresh, urls):
+            if error:
+                report["errors"].append({"url": url, "error": error})
+            else:
+                report["refreshed"].append({"url": url, "duration": duration})
+    return report
+
+
+def relativize_alternates(client_dir: Path) -> int:
+    """Réécrit en chemins relatifs les alternates des submodules pointant vers les miroirs"""
+    rewritten = 0
+    mirror_root = MIRROR_DIR.resolve()
+    for alternates in Path(client_dir, ".git", "modules").glob("**/objects/info/alternates"):
+        objects_dir = alternates.parent.parent
+        lines = alternates.read_text().splitlines()
+        new_lines = []
+        for line in lines:
+            target = (objects_dir / line).resolve() if line.strip() else None
+            if target and target.exists() and mirror_root in target.parents:
+                line = os.path.relpath(target, objects_dir.resolve())
+            new_lines.append(line)
+        if new_lines != lines:
+            alternates.write_text("\n".join(new_lines) + "\n")
+            rewritten += 1
+    return rewritten
+
+
+def list_submodules(client_dir: Path) -> List[Dict[str, str]]:
+    """Submodules déclarés dans .gitmodules : name, path, url et branch si renseignée"""
+    result = _git(["config", "-f", ".gitmodules", "--get-regexp", r"^submodule\..*\.(path|url|branch)$"], cwd=client_dir)
+    submodules: Dict[str, Dict[str, str]] = {}
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(" ")
+        name, _, attribute = key[len("submodule."):].rpartition(".")
+        submodules.setdefault(name, {"name": name})[attribute] = value
+    return [s for s in submodules.values() if "path" in s and "url" in s]
+
+
+def init_submodules(client_dir: Path, jobs: int = 4) -> Dict[str, Any]:
+    """Initialise les submodules pas encore clonés en s'appuyant sur les miroirs"""
+    client_dir = Path(client_dir)
+    missing = [
+        s for s in list_submodules(client_dir)
+        if not (client_dir / ".git" / "modules" / s["name"]).exists()
+    ]
+    report: Dict[str, Any] = {"initialized": [], "errors": []}
+
+    def prepare(submodule: Dict[str, str]):
+        if not is_mirrored(submodule["url"]):
+            return submodule, None, None
+        try:
+            return submodule, ensure_mirror(submodule["url"]), None
+        except (MirrorError, OSError, subprocess.TimeoutExpired) as e:
+            return submodule, None, str(e)
+
+    # Miroirs en parallèle ; `submodule update` écrit dans .git/config, donc en série
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        prepared = list(executor.map(prepare, missing))
+    for submodule, mirror, error in prepared:
+        args = ["submodule", "update", "--init"]
+        if mirror:
+            args += ["--reference", str(mirror)]
+        result = _git(args + ["--", submodule["path"]], cwd=client_dir)
+        if result.returncode == 0:
+            report["initialized"].append(submodule["path"])
+        else:
+            report["errors"].append({"path": submodule["path"], "error": error or result.stderr.strip()})
+
+    relativize_alternates(client_dir)
+    return report
+
+
+def mirror_status() -> List[Dict[str, Any]]:
+    status = []
+    for mirror in sorted(MIRROR_DIR.glob("*/*.git")):
+        size = sum(f.stat().st_size for f in mirror.rglob("*") if f.is_file())
+        last_fetch = _last_fetch(mirror)
+        status.append({
+            "mirror": str(mirror.relative_to(MIRROR_DIR)),
+            "size_mb": round(size / 1024 / 1024, 1),
+            "last_fetch": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(last_fetch)) if last_fetch else None,
+        })
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache de miroirs nus des dépôts OCA")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    path_parser = subparsers.add_parser("path", help="Chemin du miroir d'une URL OCA (créé si besoin)")
+    path_parser.add_argument("url")
+    path_parser.add_argument("--no-refresh", action="store_true", help="Ne pas rafraîchir un miroir existant")
+
+    refresh_parser = subparsers.add_parser("refresh", help="Rafraîchir les miroirs")
+    refresh_parser.add_argument("urls", nargs="*", help="URLs à rafraîchir (défaut: tous les miroirs)")
+    refresh_parser.add_argument("--jobs", type=int, default=4, help="Récupérations parallèles")
+
+    init_parser = subparsers.add_parser("init-submodules", help="Initialiser les submodules d'un client via les miroirs")
+    init_parser.add_argument("client_dir")
+    init_parser.add_argument("--jobs", type=int, default=4, help="Récupérations parallèles")
+
+    relativize_parser = subparsers.add_parser("relativize", help="Rendre relatifs les alternates d'un client")
+    relativize_parser.add_argument("client_dir")
+
+    status_parser = subparsers.add_parser("status", help="Lister les miroirs")
+    status_parser.add_argument("--json", action="store_true", help="Sortie JSON")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "path":
+            if not is_mirrored(args.url):
+                # Dépôts externes ou privés : jamais mis en cache (identifiants, organisations tierces)
+                raise MirrorError(f"Dépôt hors des organisations mises en miroir: {args.url}")
+            print(ensure_mirror(args.url, refresh=not args.no_refresh))
+        elif args.command == "refresh":
+            report = refresh_mirrors(args.urls or None, args.jobs)
+            print(json.dumps(report, indent=2))
+            sys.exit(1 if report["errors"] else 0)
+        elif args.command == "init-submodules":
+            report = init_submodules(Path(args.client_dir), args.jobs)
+            print(json.dumps(report, indent=2))
+            sys.exit(1 if report["errors"] else 0)
+        elif args.command == "relativize":
+            print(f"✅ {relativize_alternates(Path(args.client_dir))} fichier(s) alternates réécrit(s)")
+        elif args.command == "status":
+            status = mirror_status()
+            if args.json:
+                print(json.dumps(status, indent=2))
+                return
+            print(f"📦 {len(status)} miroir(s) dans {MIRROR_DIR}")
+            for entry in status:
+                print(f"   {entry['mirror']}: {entry['size_mb']} Mo, dernier fetch {entry['last_fetch'] or 'jamais'}")
+    except (MirrorError, subprocess.TimeoutExpired) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
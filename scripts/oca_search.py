@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Moteur de recherche en mémoire pour les dépôts et addons OCA
+
+Indexe les noms de dépôts, leurs descriptions (fr/en, depuis
+config/oca_descriptions.json) et, si l'index local des addons est disponible,
+les noms techniques et résumés des addons. La recherche floue repose sur des
+trigrammes ; les résultats sont classés par pertinence puis par popularité
+(étoiles GitHub). Avec l'index des addons (~15 000 documents), les trigrammes
+trop fréquents ne servent pas à trouver les candidats et seuls les meilleurs
+candidats de chaque type et champ sont notés.
+"""
+
+import argparse
+import heapq
+import json
+import math
+import sqlite3
+import sys
+import time
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import oca_addon_index
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CONFIG_DIR = ROOT_DIR / "config"
+
+# Poids des champs : le nom prime sur les descriptions
+FIELD_WEIGHTS = (3.0, 1.0, 1.0, 1.0)  # nom, description fr, description en, résumé
+TEXT_FIELDS = len(FIELD_WEIGHTS) - 1
+MIN_SIMILARITY = 0.3
+# Trigrammes présents dans plus de 20 % des documents (débuts de mots courants, "  a", " es"...) :
+# ils ne départagent rien et ce sont les listes les plus longues à parcourir
+STOP_TRIGRAM_SHARE = 0.2
+MIN_QUERY_TRIGRAMS = 3  # trigrammes les plus rares conservés même s'ils sont fréquents
+CANDIDATES_PER_RESULT = 10  # champs candidats classés par résultat demandé, par type et par champ
+RELOAD_CHECK_INTERVAL = 2.0  # secondes entre deux vérifications des fichiers sources
+QUERY_CACHE_SIZE = 256
+
+
+def normalize(text: str) -> str:
+    """Minuscules, sans accents, séparateurs `_`/`-` remplacés par des espaces"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(text.replace("_", " ").replace("-", " ").split())
+
+
+def trigrams(text: str) -> set:
+    """Trigrammes d'un texte normalisé (mots complétés comme pg_trgm)"""
+    result = set()
+    for word in text.split():
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class OcaSearchEngine:
+    """Index trigrammes en mémoire, rechargé quand les fichiers sources changent"""
+
+    def __init__(self, config_dir: Optional[Path] = None, addon_db: Optional[Path] = None):
+        self.config_dir = Path(config_dir or CONFIG_DIR)
+        self.addon_db = Path(addon_db) if addon_db else None
+        self.documents: List[Dict[str, Any]] = []
+        self._fields: List[Tuple[str, ...]] = []
+        # Par type de document : (trigramme -> doc_id des noms, trigramme -> doc_id * TEXT_FIELDS + champ des textes)
+        self._postings: Dict[str, Tuple[Dict[str, List[int]], Dict[str, List[int]]]] = {}
+        self._boosts: List[float] = []
+        self._stop_sets: Dict[Tuple[str, int, str], set] = {}  # listes des trigrammes fréquents, en ensembles
+        self._signature: Optional[Tuple] = None
+        self._last_check = 0.0
+        self._query_cache: Dict[Tuple, List[Dict[str, Any]]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # Chargement -------------------------------------------------------------
+
+    def _sources(self) -> List[Path]:
+        return [
+            self.config_dir / "repositories.json",
+            self.config_dir / "oca_descriptions.json",
+            self.addon_db or oca_addon_index.DEFAULT_DB_PATH,
+        ]
+
+    def _current_signature(self) -> Tuple:
+        signature = []
+        for path in self._sources():
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _ensure_loaded(self):
+        now = time.monotonic()
+        if self._signature is not None and now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return
+        self._last_check = now
+        signature = self._current_signature()
+        if signature != self._signature:
+            self._load()
+            self._signature = signature
+
+    def _load(self):
+        with open(self.config_dir / "repositories.json", "r") as f:
+            repositories = json.load(f).get("oca_repositories", {})
+        try:
+            with open(self.config_dir / "oca_descriptions.json", "r") as f:
+                descriptions = json.load(f)
+        except (OSError, ValueError):
+            descriptions = {}
+
+        documents = []
+        for name, info in repositories.items():
+            translations = descriptions.get(name, {})
+            documents.append({
+                "type": "repository",
+                "name": name,
+                "repository": name,
+                "url": info.get("url", ""),
+                "stars": info.get("stars") or 0,
+                "description": {
+                    "fr": translations.get("fr") or info.get("description", ""),
+                    "en": translations.get("en", ""),
+                },
+                "summary": "",
+                "versions": [],
+            })
+
+        stars = {name: info.get("stars") or 0 for name, info in repositories.items()}
+        documents.extend(self._load_addons(stars))
+
+        fields = []
+        postings: Dict[str, Tuple[Dict[str, List[int]], Dict[str, List[int]]]] = {}
+        for doc_id, doc in enumerate(documents):
+            values = (
+                normalize(doc["name"]),
+                normalize(doc["description"]["fr"]),
+                normalize(doc["description"]["en"]),
+                normalize(doc["summary"]),
+            )
+            fields.append(values)
+            names, texts = postings.setdefault(doc["type"], ({}, {}))
+            for trigram in trigrams(values[0]):
+                names.setdefault(trigram, []).append(doc_id)
+            for field_idx, value in enumerate(values[1:]):
+                key = doc_id * TEXT_FIELDS + field_idx
+                for trigram in trigrams(value):
+                    texts.setdefault(trigram, []).append(key)
+
+        self.documents = documents
+        self._fields = fields
+        self._postings = postings
+        self._boosts = [1.0 + math.log10(1 + doc["stars"]) / 4 for doc in documents]
+        self._stop_sets.clear()
+        self._query_cache.clear()
+
+    def _load_addons(self, stars: Dict[str, int]) -> List[Dict[str, Any]]:
+        """Addons de l'index local, regroupés par (addon, dépôt) toutes versions confondues"""
+        db_path = self.addon_db or oca_addon_index.DEFAULT_DB_PATH
+        if not db_path.exists():
+            return []
+
+        addons: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        try:
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            try:
+                rows = conn.execute(
+                    "SELECT name, repo, branch, summary FROM addons WHERE installable = 1"
+                    " ORDER BY branch"
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return []
+
+        for name, repo, branch, summary in rows:
+            doc = addons.setdefault((name, repo), {
+                "type": "addon",
+                "name": name,
+                "repository": repo,
+                "url": f"https://github.com/OCA/{repo}.git",
+                "stars": stars.get(repo, 0),
+                "description": {"fr": "", "en": ""},
+                "summary": "",
+                "versions": [],
+            })
+            doc["versions"].append(branch)
+            if summary:
+                doc["summary"] = summary  # le résumé de la version la plus récente l'emporte
+        return list(addons.values())
+
+    # Recherche --------------------------------------------------------------
+
+    def search(self, query: str, limit: int = 20, kind: Optional[str] = None, version: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recherche floue ; `kind` vaut "repository", "addon" ou None (tous)"""
+        self._ensure_loaded()
+
+        cache_key = (query, limit, kind, version)
+        cached = self._query_cache.get(cache_key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        self.cache_misses += 1
+
+        normalized = normalize(query)
+        if not normalized:
+            results = self._top_by_stars(limit, kind, version)
+        else:
+            results = self._fuzzy_search(normalized, limit, kind, version)
+
+        if len(self._query_cache) >= QUERY_CACHE_SIZE:
+            self._query_cache.clear()
+        self._query_cache[cache_key] = results
+        return results
+
+    def clear_cache(self):
+        """Vide le cache des requêtes (mesures de latence)"""
+        self._query_cache.clear()
+
+    def _accepts(self, doc: Dict[str, Any], kind: Optional[str], version: Optional[str]) -> bool:
+        if kind and doc["type"] != kind:
+            return False
+        if version and doc["type"] == "addon" and version not in doc["versions"]:
+            return False
+        return True
+
+    def _top_by_stars(self, limit: int, kind: Optional[str], version: Optional[str]) -> List[Dict[str, Any]]:
+        kind = kind or "repository"
+        docs = [d for d in self.documents if self._accepts(d, kind, version)]
+        docs.sort(key=lambda d: (-d["stars"], d["name"]))
+        return [dict(d, score=0.0) for d in docs[:limit]]
+
+    def _candidates(self, doc_type: str, index: int, query_trigrams: set, keep: Optional[int]) -> Tuple[List[Tuple[int, float]], bool]:
+        """Clés (noms ou textes d'un type de document) les plus proches de la requête, avec leur similarité
+
+        Seuls les trigrammes sélectifs servent à trouver les candidats ; les
+        trigrammes trop fréquents sont ensuite comptés pour ces seuls candidats.
+        Si `keep` est donné, seules les ~`keep` clés partageant le plus de
+        trigrammes sont retenues : le seuil est lu sur l'histogramme des comptes
+        (calculé en C) au lieu de noter toutes les clés. Retourne aussi si des
+        clés au-dessus de MIN_SIMILARITY ont pu être écartées.
+        """
+        postings = self._postings[doc_type][index]
+        lists = sorted(((trigram, postings.get(trigram, [])) for trigram in query_trigrams), key=lambda item: len(item[1]))
+        max_length = max(1, int(len(self.documents) * STOP_TRIGRAM_SHARE))
+        selective = max(MIN_QUERY_TRIGRAMS, sum(1 for _, posting in lists if len(posting) <= max_length))
+        counts: Counter = Counter()
+        for _, posting in lists[:selective]:
+            counts.update(posting)
+        stops = []
+        for trigram, posting in lists[selective:]:
+            key = (doc_type, index, trigram)
+            if key not in self._stop_sets:
+                self._stop_sets[key] = set(posting)
+            stops.append(self._stop_sets[key])
+
+        total = len(lists)
+        required = max(1, math.ceil(MIN_SIMILARITY * total - 1e-9))
+        threshold = floor = max(1, required - len(stops))
+        if keep is not None:
+            kept = 0
+            for count, keys in sorted(Counter(counts.values()).items(), reverse=True):
+                if count < floor:
+                    break
+                kept += keys
+                if kept >= keep:
+                    threshold = count
+                    break
+
+        candidates = []
+        for key, count in counts.items():
+            if count < threshold:
+                continue
+            for stop in stops:
+                count += key in stop
+            if count >= required:
+                candidates.append((key, count / total))
+        return candidates, threshold > floor
+
+    def _fuzzy_search(self, normalized: str, limit: int, kind: Optional[str], version: Optional[str],
+                      prune: bool = True) -> List[Dict[str, Any]]:
+        query_trigrams = trigrams(normalized)
+        keep = CANDIDATES_PER_RESULT * max(1, limit) if prune else None
+        best: Dict[int, float] = {}
+        pruned = False
+        for doc_type in self._postings:
+            if kind and doc_type != kind:
+                continue
+            candidates, cut = self._candidates(doc_type, 0, query_trigrams, keep)
+            pruned |= cut
+            for doc_id, similarity in candidates:
+                best[doc_id] = FIELD_WEIGHTS[0] * similarity
+            candidates, cut = self._candidates(doc_type, 1, query_trigrams, keep)
+            pruned |= cut
+            for key, similarity in candidates:
+                doc_id, field_idx = divmod(key, TEXT_FIELDS)
+                score = FIELD_WEIGHTS[field_idx + 1] * similarity
+                if score > best.get(doc_id, 0.0):
+                    best[doc_id] = score
+
+        scored = []
+        for doc_id, score in best.items():
+            doc = self.documents[doc_id]
+            if not self._accepts(doc, kind, version):
+                continue
+            name = self._fields[doc_id][0]
+            if name == normalized:
+                score += 10.0
+            elif name.startswith(normalized):
+                score += 5.0
+            elif normalized in name:
+                score += 2.0
+            scored.append((score * self._boosts[doc_id], doc_id))
+
+        if pruned and len(scored) < limit:
+            # Le filtre de version a écarté trop de candidats : recherche complète
+            return self._fuzzy_search(normalized, limit, kind, version, prune=False)
+        top = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], self.documents[item[1]]["name"]))
+        return [dict(self.documents[doc_id], score=round(score, 3)) for score, doc_id in top]
+
+    def stats(self) -> Dict[str, Any]:
+        self._ensure_loaded()
+        by_type = Counter(doc["type"] for doc in self.documents)
+        return {
+            "documents": len(self.documents),
+            "repositories": by_type.get("repository", 0),
+            "addons": by_type.get("addon", 0),
+            "trigrams": len({trigram for names, texts in self._postings.values() for trigram in (*names, *texts)}),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recherche floue dans les dépôts et addons OCA")
+    parser.add_argument("query", nargs="?", default="", help="Texte recherché")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--type", choices=["repository", "addon"], help="Restreindre le type de résultat")
+    parser.add_argument("--version", help="Version Odoo (filtre les addons)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_args()
+
+    engine = OcaSearchEngine()
+    start = time.perf_counter()
+    results = engine.search(args.query, args.limit, args.type, args.version)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    for result in results:
+        icon = "📦" if result["type"] == "repository" else "🧩"
+        label = result["name"] if result["type"] == "repository" else f"{result['name']} ({result['repository']})"
+        text = result["summary"] or result["description"]["fr"] or result["description"]["en"]
+        print(f"  {icon} {label} ⭐{result['stars']}")
+        if text:
+            print(f"     {text}")
+    print(f"{len(results)} résultat(s) en {elapsed_ms:.2f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Mise à jour parallèle des submodules d'un client
+
+1. les submodules absents sont initialisés (via les miroirs locaux) ;
+2. une passe de `git ls-remote` lancée en parallèle pour tous les submodules
+   compare la tête de la branche suivie à la révision locale : les
+   submodules à jour sont ignorés sans aucun fetch ;
+3. les autres sont récupérés en parallèle (--jobs), depuis le miroir local
+   rafraîchi pour les dépôts OCA, puis avancés en fast-forward.
+
+La branche suivie est celle de .gitmodules (`submodule add -b`), à défaut la
+branche courante du submodule. Le rapport (JSON avec --json) détaille durée,
+révisions et erreurs par submodule.
+
+Usage : parallel_submodule_update.py CLIENT_DIR [--jobs N] [--json]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import oca_mirror_cache
+
+DEFAULT_JOBS = 8
+LS_REMOTE_TIMEOUT = 60
+FETCH_TIMEOUT = 1800
+
+
+def _git(args: List[str], cwd: Path, timeout: int = FETCH_TIMEOUT) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, timeout=timeout)
+
+
+def _output(args: List[str], cwd: Path) -> Optional[str]:
+    result = _git(args, cwd, timeout=LS_REMOTE_TIMEOUT)
+    return (result.stdout.strip() or None) if result.returncode == 0 else None
+
+
+class SubmoduleUpdater:
+    """Mise à jour concurrente des submodules d'un dépôt client"""
+
+    def __init__(self, client_dir: Path, jobs: int = DEFAULT_JOBS):
+        self.client_dir = Path(client_dir)
+        self.jobs = max(1, jobs)
+
+    def _inspect(self, submodule: Dict[str, str]) -> Dict[str, Any]:
+        """Branche suivie, révision locale et tête distante (ls-remote)"""
+        path = self.client_dir / submodule["path"]
+        entry: Dict[str, Any] = {"path": submodule["path"], "url": submodule["url"]}
+        started = time.monotonic()
+        if not (path / ".git").exists():
+            entry.update(status="failed", error="Submodule non initialisé", duration=0)
+            return entry
+        entry["branch"] = submodule.get("branch") or _output(["symbolic-ref", "--short", "-q", "HEAD"], path)
+        entry["old"] = _output(["rev-parse", "HEAD"], path)
+        if not entry["branch"]:
+            entry.update(status="failed", error="Branche suivie inconnue (ni .gitmodules ni branche courante)")
+        else:
+            try:
+                result = _git(["ls-remote", submodule["url"], f"refs/heads/{entry['branch']}"], self.client_dir, LS_REMOTE_TIMEOUT)
+                remote = result.stdout.split()[0] if result.returncode == 0 and result.stdout.strip() else None
+            except subprocess.TimeoutExpired:
+                result, remote = None, None
+            if remote is None:
+                error = result.stderr.strip() if result is not None and result.stderr.strip() else "branche distante introuvable"
+                entry.update(status="failed", error=f"ls-remote: {error}")
+            elif remote == entry["old"]:
+                entry.update(status="unchanged", new=remote)
+            else:
+                entry.update(status="pending", remote=remote)
+        entry["duration"] = round(time.monotonic() - started, 2)
+        return entry
+
+    def _update(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetch (miroir local si possible) puis fast-forward sur la branche suivie"""
+        path = self.client_dir / entry["path"]
+        branch = entry["branch"]
+        started = time.monotonic()
+        source = "origin"
+        if oca_mirror_cache.is_mirrored(entry["url"]):
+            try:
+                source = str(oca_mirror_cache.ensure_mirror(entry["url"], max_age=0))
+            except (oca_mirror_cache.MirrorError, OSError, subprocess.TimeoutExpired) as e:
+                print(f"⚠️  {entry['path']}: miroir indisponible ({e}), fetch direct", file=sys.stderr)
+
+        steps = [
+            ["fetch", "--quiet", source, f"+refs/heads/{branch}:refs/remotes/origin/{branch}"],
+            ["checkout", "--quiet", branch],
+            ["merge", "--quiet", "--ff-only", f"origin/{branch}"],
+        ]
+        try:
+            for step in steps:
+                result = _git(step, path)
+                if result.returncode != 0:
+                    entry.update(status="failed", error=f"git {step[0]}: {result.stderr.strip()}")
+                    break
+            else:
+                entry.update(status="updated", new=_output(["rev-parse", "HEAD"], path))
+        except subprocess.TimeoutExpired as e:
+            entry.update(status="failed", error=f"délai dépassé: {' '.join(e.cmd)}")
+        entry.pop("remote", None)
+        entry["duration"] = round(entry["duration"] + time.monotonic() - started, 2)
+        return entry
+
+    def run(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        initialized = oca_mirror_cache.init_submodules(self.client_dir, self.jobs)
+        submodules = oca_mirror_cache.list_submodules(self.client_dir)
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            entries = list(executor.map(self._inspect, submodules))
+            pending = [entry for entry in entries if entry["status"] == "pending"]
+            print(
+                f"🔍 {len(entries)} submodule(s), {len(pending)} à mettre à jour",
+                file=sys.stderr,
+            )
+            list(executor.map(self._update, pending))
+
+        init_errors = {error["path"]: error["error"] for error in initialized["errors"]}
+        for entry in entries:
+            if entry["path"] in initialized["initialized"] and entry["status"] == "unchanged":
+                entry["status"] = "initialized"
+            elif entry["path"] in init_errors:
+                entry["error"] = f"initialisation: {init_errors[entry['path']]}"
+
+        summary: Dict[str, int] = {}
+        for entry in entries:
+            summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+        return {
+            "client": self.client_dir.resolve().name,
+            "jobs": self.jobs,
+            "duration": round(time.monotonic() - started, 2),
+            "summary": summary,
+            "submodules": sorted(entries, key=lambda e: e["path"]),
+        }
+
+
+def update_client(client_dir: Path, jobs: int = DEFAULT_JOBS) -> Dict[str, Any]:
+    return SubmoduleUpdater(client_dir, jobs).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mise à jour parallèle des submodules d'un client")
+    parser.add_argument("client_dir", help="Répertoire du client")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help=f"Mises à jour parallèles (défaut: {DEFAULT_JOBS})")
+    parser.add_argument("--json", action="store_true", help="Rapport JSON")
+    args = parser.parse_args()
+
+    client_dir = Path(args.client_dir)
+    if not (client_dir / ".git").exists():
+        print(f"❌ {client_dir} n'est pas un dépôt Git", file=sys.stderr)
+        sys.exit(1)
+
+    report = update_client(client_dir, args.jobs)
+    failed = report["summary"].get("failed", 0)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        sys.exit(1 if failed else 0)
+
+    icons = {"updated": "⬆️ ", "unchanged": "✅", "initialized": "📥", "failed": "❌"}
+    for entry in report["submodules"]:
+        line = f"{icons.get(entry['status'], '•')} {entry['path']} ({entry['duration']}s)"
+        if entry["status"] == "updated":
+            line += f": {(entry.get('old') or '')[:8]} -> {(entry.get('new') or '')[:8]}"
+        elif entry["status"] == "failed":
+            line += f": {entry['error']}"
+        print(line)
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(report["summary"].items()))
+    print(f"\n📊 {summary} en {report['duration']}s ({report['jobs']} en parallèle)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Cache (SQLite) de la disponibilité des branches de version des dépôts OCA
+
+Un seul `git ls-remote --heads` par dépôt donne toutes ses branches, donc sa
+disponibilité pour toutes les versions de config/odoo_versions.json. Les
+dépôts sont rafraîchis en parallèle, et les lectures ne touchent jamais au
+réseau tant qu'une entrée existe :
+- entrée fraîche (moins de REMOTE_BRANCH_CACHE_TTL secondes) : réponse directe ;
+- entrée périmée mais récente (moins de REMOTE_BRANCH_CACHE_STALE_TTL) :
+  réponse directe, et rafraîchissement lancé en arrière-plan
+  (stale-while-revalidate) ;
+- entrée absente ou trop ancienne : les dépôts concernés sont interrogés
+  ensemble, en parallèle.
+
+Usage :
+    remote_branch_cache.py refresh [REPO ...] [--jobs N]   # tous les dépôts OCA par défaut
+    remote_branch_cache.py check REPO VERSION
+    remote_branch_cache.py validate VERSION REPO ... [--json]
+    remote_branch_cache.py status [--json]
+    remote_branch_cache.py clean
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import oca_addon_index
+from oca_addon_index import CACHE_DIR
+
+REMOTE_BRANCH_CACHE_DB = Path(os.environ.get("REMOTE_BRANCH_CACHE_DB", CACHE_DIR / "remote_branches.db"))
+REMOTE_BRANCH_CACHE_TTL = float(os.environ.get("REMOTE_BRANCH_CACHE_TTL", "3600"))
+REMOTE_BRANCH_CACHE_STALE_TTL = float(os.environ.get("REMOTE_BRANCH_CACHE_STALE_TTL", str(7 * 86400)))
+LS_REMOTE_TIMEOUT = 60
+DEFAULT_JOBS = 16
+# Un rafraîchissement en arrière-plan n'est pas relancé pour un dépôt avant ce délai (s)
+REVALIDATION_GRACE = 120
+
+# Seules les branches de version (16.0, 17.0...) sont conservées
+VERSION_BRANCH = re.compile(r"^\d+\.\d+$")
+# Messages de git indiquant un dépôt inexistant (GitHub demande alors une authentification)
+MISSING_REPOSITORY = re.compile(
+    r"not found|could not read username|authentication failed|does not appear to be a git repository",
+    re.IGNORECASE,
+)
+
+
+class RemoteError(Exception):
+    """Interrogation du dépôt distant impossible (réseau, délai dépassé...)"""
+
+
+def repository_url(repo: str, catalog: Dict[str, Dict[str, Any]]) -> str:
+    return (catalog.get(repo) or {}).get("url") or f"https://github.com/OCA/{repo}.git"
+
+
+def ls_remote_branches(url: str) -> Optional[List[str]]:
+    """Branches de version du dépôt distant (None si le dépôt n'existe pas)"""
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    try:
+        result = subprocess.run(
+            ["git", "ls-remote", "--heads", url],
+            capture_output=True, text=True, timeout=LS_REMOTE_TIMEOUT, env=env,
+        )
+    except subprocess.TimeoutExpired:
+        raise RemoteError(f"{url}: délai dépassé")
+    if result.returncode != 0:
+        if MISSING_REPOSITORY.search(result.stderr):
+            return None
+        raise RemoteError(f"{url}: {result.stderr.strip()}")
+    branches = []
+    for line in result.stdout.splitlines():
+        ref = line.partition("\t")[2]
+        branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ""
+        if VERSION_BRANCH.match(branch):
+            branches.append(branch)
+    return sorted(branches)
+
+
+def spawn_refresh(repos: Optional[List[str]] = None):
+    """Rafraîchissement détaché : il survit à la fin du processus appelant"""
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "refresh", "--quiet", *(repos or [])],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+class RemoteBranchCache:
+    """Accès au cache des branches distantes"""
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+    ):
+        self.db_path = Path(db_path or REMOTE_BRANCH_CACHE_DB)
+        self.ttl = REMOTE_BRANCH_CACHE_TTL if ttl is None else ttl
+        self.stale_ttl = REMOTE_BRANCH_CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS remote_repositories (
+                repo TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                repo_exists INTEGER NOT NULL,
+                branches TEXT NOT NULL DEFAULT '[]',
+                checked_at REAL NOT NULL,
+                revalidating_at REAL NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL NOT NULL);
+            """
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _rows(self, repos: List[str]) -> Dict[str, sqlite3.Row]:
+        placeholders = ",".join("?" * len(repos))
+        rows = self.conn.execute(
+            f"SELECT * FROM remote_repositories WHERE repo IN ({placeholders})", repos
+        ).fetchall() if repos else []
+        return {row["repo"]: row for row in rows}
+
+    def refresh(self, repos: Optional[List[str]] = None, jobs: int = DEFAULT_JOBS) -> Dict[str, Any]:
+        """Interroge en parallèle les dépôts donnés (tous les dépôts OCA par défaut)"""
+        started = time.monotonic()
+        catalog = oca_addon_index.load_oca_repositories()
+        full = repos is None
+        if full:
+            repos = sorted(catalog)
+        urls = {repo: repository_url(repo, catalog) for repo in repos}
+
+        def query(repo: str) -> Tuple[str, Optional[List[str]], Optional[str]]:
+            try:
+                return repo, ls_remote_branches(urls[repo]), None
+            except RemoteError as e:
+                return repo, None, str(e)
+
+        report: Dict[str, Any] = {"refreshed": 0, "missing": [], "errors": []}
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            results = list(executor.map(query, repos))
+
+        now = time.time()
+        with self.conn:
+            for repo, branches, error in results:
+                if error:
+                    # L'entrée existante (même périmée) reste la meilleure information disponible
+                    self.conn.execute(
+                        "UPDATE remote_repositories SET revalidating_at = 0 WHERE repo = ?", (repo,)
+                    )
+                    report["errors"].append({"repository": repo, "error": error})
+                    continue
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO remote_repositories"
+                    " (repo, url, repo_exists, branches, checked_at, revalidating_at)"
+                    " VALUES (?, ?, ?, ?, ?, 0)",
+                    (repo, urls[repo], 0 if branches is None else 1, json.dumps(branches or []), now),
+                )
+                report["refreshed"] += 1
+                if branches is None:
+                    report["missing"].append(repo)
+            if full:
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('full_refresh_at', ?)", (now,))
+        report["duration"] = round(time.monotonic() - started, 2)
+        return report
+
+    def revalidate_in_background(self, repos: Optional[List[str]] = None) -> bool:
+        """Lance un rafraîchissement en arrière-plan, sauf s'il y en a déjà un en cours"""
+        now = time.time()
+        if repos is None:
+            if now - self._meta("full_revalidating_at") <= REVALIDATION_GRACE:
+                return False
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('full_revalidating_at', ?)", (now,))
+        else:
+            rows = self._rows(repos)
+            repos = [r for r in repos if r not in rows or now - rows[r]["revalidating_at"] > REVALIDATION_GRACE]
+            if not repos:
+                return False
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE remote_repositories SET revalidating_at = ? WHERE repo = ?",
+                    [(now, repo) for repo in repos],
+                )
+        spawn_refresh(repos)
+        return True
+
+    def lookup_many(self, repos: List[str], version: str, revalidate: bool = True) -> Dict[str, Optional[bool]]:
+        """Disponibilité de `version` pour chaque dépôt (None si elle n'a pas pu être vérifiée)"""
+        now = time.time()
+        rows = self._rows(repos)
+        stale, unknown = [], []
+        for repo in repos:
+            row = rows.get(repo)
+            age = now - row["checked_at"] if row else None
+            if age is None or age > self.stale_ttl:
+                unknown.append(repo)
+            elif age > self.ttl:
+                stale.append(repo)
+
+        if unknown:
+            self.refresh(unknown)
+            rows.update(self._rows(unknown))
+        if revalidate and stale:
+            self.revalidate_in_background(stale)
+
+        availability: Dict[str, Optional[bool]] = {}
+        for repo in repos:
+            row = rows.get(repo)
+            if row is None or (repo in unknown and now - row["checked_at"] > self.stale_ttl):
+                availability[repo] = None
+            else:
+                availability[repo] = bool(row["repo_exists"]) and version in json.loads(row["branches"])
+        return availability
+
+    def lookup(self, repo: str, version: str) -> Optional[bool]:
+        return self.lookup_many([repo], version)[repo]
+
+    def _meta(self, key: str) -> float:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0.0
+
+    def needs_full_refresh(self) -> bool:
+        return time.time() - self._meta("full_refresh_at") > self.ttl
+
+    def status(self) -> Dict[str, Any]:
+        now = time.time()
+        checked = [row[0] for row in self.conn.execute("SELECT checked_at FROM remote_repositories")]
+        full = self._meta("full_refresh_at")
+        return {
+            "database": str(self.db_path),
+            "repositories": len(checked),
+            "fresh": sum(1 for t in checked if now - t <= self.ttl),
+            "stale": sum(1 for t in checked if self.ttl < now - t <= self.stale_ttl),
+            "expired": sum(1 for t in checked if now - t > self.stale_ttl),
+            "missing_repositories": self.conn.execute(
+                "SELECT COUNT(*) FROM remote_repositories WHERE repo_exists = 0"
+            ).fetchone()[0],
+            "last_full_refresh": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(full)) if full else None,
+        }
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM remote_repositories")
+            self.conn.execute("DELETE FROM meta")
+
+
+def validate(version: str, repos: List[str], cache: Optional[RemoteBranchCache] = None) -> Dict[str, List[str]]:
+    """Répartit les dépôts en disponibles / indisponibles / non vérifiables pour une version"""
+    cache = cache or RemoteBranchCache()
+    availability = cache.lookup_many(repos, version)
+    if cache.needs_full_refresh():
+        # Les prochaines créations de clients trouveront tous les dépôts en cache
+        cache.revalidate_in_background()
+    return {
+        "valid": [repo for repo in repos if availability[repo]],
+        "invalid": [repo for repo in repos if availability[repo] is False],
+        "unknown": [repo for repo in repos if availability[repo] is None],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache de disponibilité des branches des dépôts OCA")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    refresh_parser = subparsers.add_parser("refresh", help="Rafraîchir le cache (tous les dépôts OCA par défaut)")
+    refresh_parser.add_argument("repos", nargs="*")
+    refresh_parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Requêtes parallèles")
+    refresh_parser.add_argument("--quiet", action="store_true", help="Aucune sortie (rafraîchissement en arrière-plan)")
+
+    check_parser = subparsers.add_parser("check", help="Vérifier qu'un dépôt existe pour une version")
+    check_parser.add_argument("repo")
+    check_parser.add_argument("version")
+
+    validate_parser = subparsers.add_parser("validate", help="Valider une liste de dépôts pour une version")
+    validate_parser.add_argument("version")
+    validate_parser.add_argument("repos", nargs="+")
+    validate_parser.add_argument("--json", action="store_true", help="Sortie JSON")
+
+    status_parser = subparsers.add_parser("status", help="Statut du cache")
+    status_parser.add_argument("--json", action="store_true", help="Sortie JSON")
+
+    subparsers.add_parser("clean", help="Vider le cache")
+
+    args = parser.parse_args()
+    cache = RemoteBranchCache()
+
+    if args.command == "refresh":
+        report = cache.refresh(args.repos or None, args.jobs)
+        if not args.quiet:
+            print(json.dumps(report, indent=2, ensure_ascii=False))
+        sys.exit(1 if report["errors"] else 0)
+
+    elif args.command == "check":
+        available = cache.lookup(args.repo, args.version)
+        if available:
+            print(f"✅ Le dépôt {args.repo} existe pour la version {args.version}", file=sys.stderr)
+            sys.exit(0)
+        if available is None:
+            print(f"❌ Impossible de vérifier le dépôt {args.repo}", file=sys.stderr)
+        else:
+            print(f"⚠️  Le dépôt {args.repo} n'est pas disponible pour la version {args.version}", file=sys.stderr)
+        sys.exit(1)
+
+    elif args.command == "validate":
+        result = validate(args.version, args.repos, cache)
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return
+        for repo in result["valid"]:
+            print(f"✅ {repo}", file=sys.stderr)
+        for repo in result["invalid"]:
+            print(f"❌ {repo} (branche {args.version} absente)", file=sys.stderr)
+        for repo in result["unknown"]:
+            print(f"❌ {repo} (vérification impossible)", file=sys.stderr)
+        # Sur stdout : les dépôts valides, pour les scripts shell
+        print(" ".join(result["valid"]))
+
+    elif args.command == "status":
+        status = cache.status()
+        if args.json:
+            print(json.dumps(status, indent=2))
+            return
+        print(f"   Base : {status['database']}")
+        print(f"   Dépôts en cache : {status['repositories']} ({status['fresh']} à jour, {status['stale']} périmés, {status['expired']} expirés)")
+        print(f"   Dépôts inexistants : {status['missing_repositories']}")
+        print(f"   Dernier rafraîchissement complet : {status['last_full_refresh'] or 'jamais'}")
+
+    elif args.command == "clean":
+        cache.clear()
+        print("✅ Cache des branches distantes vidé")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,32 +7,19 @@ if [ -z "$CONFIG_DIR" ]; then
     CONFIG_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/config"
 fi
 CACHE_DIR="$HOME/.cache/odoo_client_generator"
+REMOTE_BRANCH_CACHE="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/remote_branch_cache.py"
 
 # Create cache directory if it doesn't exist
 mkdir -p "$CACHE_DIR"
 
 # Function to check if a repository exists for a given version
+# (lookup in the remote branch cache: no network call while the entry is known)
 check_repository_exists() {
     local repo_name="$1"
     local version="$2"
-    local repo_url="https://github.com/OCA/$repo_name.git"
     
     echo "🔍 Vérification de l'existence du dépôt $repo_name pour la version $version..." >&2
-    
-    # Check if the repository exists at all
-    if ! git ls-remote --heads "$repo_url" >/dev/null 2>&1; then
-        echo "❌ Le dépôt $repo_name n'existe pas sur GitHub OCA" >&2
-        return 1
-    fi
-    
-    # Check if the version branch exists
-    if ! git ls-remote --heads "$repo_url" "$version" >/dev/null 2>&1; then
-        echo "⚠️  La branche $version n'existe pas pour le dépôt $repo_name" >&2
-        return 1
-    fi
-    
-    echo "✅ Le dépôt $repo_name existe pour la version $version" >&2
-    return 0
+    python3 "$REMOTE_BRANCH_CACHE" check "$repo_name" "$version"
 }
 
 # Function to create a shallow clone for faster downloads
@@ -61,38 +48,6 @@ clone_repository_optimized() {
     fi
 }
 
-# Function to cache repository information
-cache_repository_info() {
-    local repo_name="$1"
-    local version="$2"
-    local status="$3"  # "exists" or "missing"
-    
-    local cache_file="$CACHE_DIR/repo_${repo_name}_${version}.cache"
-    echo "$status" > "$cache_file"
-    echo "$(date +%s)" >> "$cache_file"
-}
-
-# Function to check cached repository information
-check_cached_repository_info() {
-    local repo_name="$1"
-    local version="$2"
-    local cache_file="$CACHE_DIR/repo_${repo_name}_${version}.cache"
-    local cache_duration=3600  # 1 hour cache
-    
-    if [[ -f "$cache_file" ]]; then
-        local status=$(head -n 1 "$cache_file")
-        local timestamp=$(tail -n 1 "$cache_file")
-        local current_time=$(date +%s)
-        
-        if (( current_time - timestamp < cache_duration )); then
-            echo "$status"
-            return 0
-        fi
-    fi
-    
-    return 1
-}
-
 # Function to validate OCA modules before adding them
 validate_oca_modules() {
     local client_dir="$1"
@@ -102,29 +57,19 @@ validate_oca_modules() {
     
     echo "🔍 Validation des modules OCA pour la version $version..." >&2
     
-    local valid_modules=()
+    # One batched lookup: cached repositories answer instantly, unknown ones are
+    # queried concurrently, stale ones are refreshed in the background
+    local valid_output
+    if ! valid_output=$(python3 "$REMOTE_BRANCH_CACHE" validate "$version" "${modules[@]}"); then
+        echo "❌ Validation des modules impossible" >&2
+        return 1
+    fi
+    local valid_modules=($valid_output)
     local invalid_modules=()
-    
+    local module
     for module in "${modules[@]}"; do
-        # Check cache first
-        cached_status=$(check_cached_repository_info "$module" "$version")
-        if [[ $? -eq 0 ]]; then
-            if [[ "$cached_status" == "exists" ]]; then
-                valid_modules+=("$module")
-                echo "✅ $module (depuis le cache)" >&2
-            else
-                invalid_modules+=("$module")
-                echo "❌ $module (depuis le cache)" >&2
-            fi
-        else
-            # Check repository existence
-            if check_repository_exists "$module" "$version"; then
-                valid_modules+=("$module")
-                cache_repository_info "$module" "$version" "exists"
-            else
-                invalid_modules+=("$module")
-                cache_repository_info "$module" "$version" "missing"
-            fi
+        if [[ " ${valid_modules[*]} " != *" $module "* ]]; then
+            invalid_modules+=("$module")
         fi
     done
     
@@ -151,28 +96,23 @@ validate_oca_modules() {
 # Function to clean up cache
 clean_cache() {
     echo "🧹 Nettoyage du cache..."
-    rm -rf "$CACHE_DIR"
+    python3 "$REMOTE_BRANCH_CACHE" clean
+    # Anciens fichiers de cache (un fichier par dépôt et par version)
+    find "$CACHE_DIR" -maxdepth 1 -name "repo_*.cache" -delete 2>/dev/null || true
     echo "✅ Cache nettoyé"
 }
 
+# Function to refresh the whole cache (all OCA repositories, all versions)
+refresh_cache() {
+    echo "🔄 Rafraîchissement de la disponibilité des branches de tous les dépôts OCA..."
+    python3 "$REMOTE_BRANCH_CACHE" refresh >/dev/null
+    echo "✅ Cache rafraîchi"
+}
+
 # Function to show cache status
 show_cache_status() {
     echo "📊 Statut du cache :"
-    if [[ -d "$CACHE_DIR" ]]; then
-        local cache_files=$(find "$CACHE_DIR" -name "*.cache" | wc -l)
-        echo "   Fichiers en cache : $cache_files"
-        echo "   Dossier cache : $CACHE_DIR"
-        
-        if [[ $cache_files -gt 0 ]]; then
-            echo "   Derniers éléments mis en cache :"
-            find "$CACHE_DIR" -name "*.cache" -printf '%T@ %p\n' | sort -n | tail -5 | while read timestamp file; do
-                local module_info=$(basename "$file" .cache)
-                echo "     - $module_info"
-            done
-        fi
-    else
-        echo "   Aucun cache trouvé"
-    fi
+    python3 "$REMOTE_BRANCH_CACHE" status
 }
 
 # Main function for script usage
@@ -191,17 +131,21 @@ main() {
         "clean-cache")
             clean_cache
             ;;
+        "refresh-cache")
+            refresh_cache
+            ;;
         "cache-status")
             show_cache_status
             ;;
         "help"|"-h"|"--help")
-            echo "Usage: $0 {validate|check|clone|clean-cache|cache-status|help}"
+            echo "Usage: $0 {validate|check|clone|clean-cache|refresh-cache|cache-status|help}"
             echo ""
             echo "Commands:"
             echo "  validate CLIENT_DIR VERSION MODULE1 MODULE2...  - Valider les modules OCA"
             echo "  check REPO VERSION                              - Vérifier l'existence d'un dépôt"
             echo "  clone REPO VERSION TARGET_DIR                   - Cloner un dépôt de manière optimisée"
             echo "  clean-cache                                     - Nettoyer le cache"
+            echo "  refresh-cache                                   - Rafraîchir le cache de tous les dépôts OCA"
             echo "  cache-status                                    - Afficher le statut du cache"
             echo "  help                                            - Afficher cette aide"
             ;;
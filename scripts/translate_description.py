@@ -5,28 +5,340 @@ Utilise plusieurs services de traduction selon leur disponibilité
 """
 
 import sys
+import os
 import json
+import sqlite3
 import requests
 import urllib.parse
 import time
 import hashlib
-from typing import Optional, Dict
+import functools
+import math
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import Optional, Dict, List, Iterable
+
+from github_client import GitHubClient
+from oca_addon_index import CACHE_DIR
+from translation_glossary import load_glossary
+
+# Cache persistant des traductions, partagé entre les invocations du script
+TRANSLATION_CACHE_DB = Path(
+    os.environ.get("TRANSLATION_CACHE_DB", CACHE_DIR / "translations.db")
+)
+# Durée de validité en jours (0 = illimitée)
+TRANSLATION_CACHE_TTL_DAYS = float(os.environ.get("TRANSLATION_CACHE_TTL_DAYS", "0"))
+
+# Taille maximale (caractères) d'une requête Google groupée
+GOOGLE_BATCH_MAX_CHARS = 1500
+# Au-delà de ce nombre de dépôts, la liste de l'organisation est utilisée
+ORG_LISTING_THRESHOLD = 10
+GENERIC_DESCRIPTIONS = {"", "null", "none", "odoo addons"}
+
+# Mode concurrent : délai avant la requête couverte vers le point d'accès suivant
+TRANSLATION_HEDGED = os.environ.get("TRANSLATION_HEDGED", "0") == "1"
+TRANSLATION_HEDGE_DELAY = float(os.environ.get("TRANSLATION_HEDGE_DELAY", "1.5"))
+TRANSLATION_HEDGE_DEADLINE = 20.0  # délai maximal d'une traduction en mode concurrent
+
+# Statistiques par point d'accès : lissage, latence a priori (s) et amortissement (s)
+STATS_ALPHA = 0.3
+STATS_PRIOR_LATENCY = 1.0
+STATS_DECAY = 86400.0
+
+# Disjoncteurs : échecs consécutifs avant mise à l'écart, taux de succès moyen minimal,
+# durée initiale et maximale (s)
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_MIN_SUCCESS = 0.25
+BREAKER_COOLDOWN = 300.0
+BREAKER_MAX_COOLDOWN = 3600.0
+
+
+class TranslationCache:
+    """Cache SQLite des traductions, indexé par le md5 de texte|source|cible"""
+
+    def __init__(self, db_path: Optional[Path] = None, ttl_days: Optional[float] = None):
+        self.db_path = Path(db_path or TRANSLATION_CACHE_DB)
+        ttl_days = TRANSLATION_CACHE_TTL_DAYS if ttl_days is None else ttl_days
+        self.ttl = ttl_days * 86400 if ttl_days > 0 else None
+        self.memory: Dict[str, str] = {}
+        self.conn = None
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(self.db_path, timeout=10)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS translations (
+                    key TEXT PRIMARY KEY,
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    service TEXT,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self.conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            # Sans cache disque, on se contente du cache mémoire
+            print(f"⚠️  Cache de traduction indisponible: {e}", file=sys.stderr)
+            self.conn = None
+
+    def get(self, key: str) -> Optional[str]:
+        if key in self.memory:
+            return self.memory[key]
+        if self.conn is None:
+            return None
+        row = self.conn.execute(
+            "SELECT translation, created_at FROM translations WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (self.ttl and time.time() - row[1] > self.ttl):
+            return None
+        self.memory[key] = row[0]
+        return row[0]
+
+    def set(
+        self,
+        key: str,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        translation: str,
+        service: Optional[str] = None,
+    ):
+        self.memory[key] = translation
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, source_lang, target_lang, text, translation, service, time.time()),
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️  Écriture du cache de traduction impossible: {e}", file=sys.stderr)
+
+
+class EndpointHealth:
+    """Disjoncteurs par point d'accès (service ou instance), conservés dans la base du cache
+
+    Après BREAKER_FAILURE_THRESHOLD échecs consécutifs, ou dès que le taux de
+    succès moyen (EndpointStats) passe sous BREAKER_MIN_SUCCESS, le point
+    d'accès est ignoré pendant une durée qui double à chaque nouvel échec
+    (plafonnée). Le second critère est nécessaire car l'ordre adaptatif relègue
+    un point d'accès en échec en fin de liste : il n'est alors plus sollicité
+    et ses échecs consécutifs ne s'accumuleraient jamais.
+    Une fois ce délai écoulé, une seule tentative est autorisée (semi-ouvert),
+    en tête de liste pour que le rétablissement soit détecté.
+    """
+
+    def __init__(self, conn: Optional[sqlite3.Connection] = None):
+        self.conn = conn
+        self.state: Dict[str, List[float]] = {}  # point d'accès -> [échecs, ouvert jusqu'à]
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS endpoint_breakers (
+                    endpoint TEXT PRIMARY KEY,
+                    failures INTEGER NOT NULL,
+                    open_until REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            self.conn.commit()
+            for endpoint, failures, open_until in self.conn.execute(
+                "SELECT endpoint, failures, open_until FROM endpoint_breakers"
+            ):
+                self.state[endpoint] = [failures, open_until]
+        except sqlite3.Error:
+            self.conn = None
+
+    def allow(self, endpoint: str) -> bool:
+        return time.time() >= self.state.get(endpoint, [0, 0.0])[1]
+
+    def half_open(self, endpoint: str) -> bool:
+        """Disjoncteur ouvert dont le délai est écoulé : tentative de rétablissement"""
+        open_until = self.state.get(endpoint, [0, 0.0])[1]
+        return 0 < open_until <= time.time()
+
+    def record_success(self, endpoint: str):
+        if self.state.get(endpoint, [0, 0.0])[0]:
+            self._save(endpoint, 0, 0.0)
+
+    def record_failure(self, endpoint: str, success_rate: float = 1.0):
+        failures = int(self.state.get(endpoint, [0, 0.0])[0]) + 1
+        open_until = 0.0
+        if failures >= BREAKER_FAILURE_THRESHOLD or success_rate < BREAKER_MIN_SUCCESS:
+            cooldown = min(
+                BREAKER_COOLDOWN * 2 ** max(failures - BREAKER_FAILURE_THRESHOLD, 0),
+                BREAKER_MAX_COOLDOWN,
+            )
+            open_until = time.time() + cooldown
+            print(
+                f"⛔ {endpoint} ignoré pendant {int(cooldown)}s ({failures} échecs consécutifs)",
+                file=sys.stderr,
+            )
+        self._save(endpoint, failures, open_until)
+
+    def _save(self, endpoint: str, failures: int, open_until: float):
+        self.state[endpoint] = [failures, open_until]
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO endpoint_breakers VALUES (?, ?, ?, ?)",
+                (endpoint, failures, open_until, time.time()),
+            )
+            self.conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+class EndpointStats:
+    """Latence et taux de succès par point d'accès (moyennes exponentielles persistantes)
+
+    Le coût attendu d'un point d'accès est sa latence moyenne divisée par sa
+    probabilité de succès. Les mesures anciennes se rapprochent de l'a priori
+    avec le temps, pour qu'un service rétabli finisse par être réessayé.
+    """
+
+    def __init__(self, conn: Optional[sqlite3.Connection] = None):
+        self.conn = conn
+        self.stats: Dict[str, Dict[str, float]] = {}
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS endpoint_stats (
+                    endpoint TEXT PRIMARY KEY,
+                    latency REAL NOT NULL,
+                    success REAL NOT NULL,
+                    samples INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            self.conn.commit()
+            for endpoint, latency, success, samples, updated_at in self.conn.execute(
+                "SELECT endpoint, latency, success, samples, updated_at FROM endpoint_stats"
+            ):
+                self.stats[endpoint] = {
+                    "latency": latency,
+                    "success": success,
+                    "samples": samples,
+                    "updated_at": updated_at,
+                }
+        except sqlite3.Error:
+            self.conn = None
+
+    def _current(self, endpoint: str) -> Dict[str, float]:
+        """Statistiques amorties vers l'a priori selon leur ancienneté"""
+        stat = self.stats.get(endpoint)
+        if stat is None:
+            return {"latency": STATS_PRIOR_LATENCY, "success": 1.0, "samples": 0}
+        weight = math.exp(-(time.time() - stat["updated_at"]) / STATS_DECAY)
+        return {
+            "latency": STATS_PRIOR_LATENCY + (stat["latency"] - STATS_PRIOR_LATENCY) * weight,
+            "success": 1.0 + (stat["success"] - 1.0) * weight,
+            "samples": stat["samples"],
+        }
+
+    def success_rate(self, endpoint: str) -> float:
+        return self._current(endpoint)["success"]
+
+    def expected_cost(self, endpoint: str) -> float:
+        current = self._current(endpoint)
+        return current["latency"] / max(current["success"], 0.05)
+
+    def record(self, endpoint: str, latency: float, success: Optional[bool]):
+        """Enregistre une mesure ; `success` à None pour une requête abandonnée
+
+        Une requête abandonnée n'a duré *qu'au moins* `latency` : elle ne peut
+        qu'augmenter l'estimation. La première mesure remplace l'a priori.
+        """
+        current = self._current(endpoint)
+        if success is None and latency <= current["latency"]:
+            return
+        if endpoint not in self.stats:
+            current = {
+                "latency": latency,
+                "success": 1.0 if success is None else float(success),
+                "samples": 0,
+            }
+        outcome = current["success"] if success is None else (1.0 if success else 0.0)
+        stat = {
+            "latency": (1 - STATS_ALPHA) * current["latency"] + STATS_ALPHA * latency,
+            "success": (1 - STATS_ALPHA) * current["success"] + STATS_ALPHA * outcome,
+            "samples": current["samples"] + 1,
+            "updated_at": time.time(),
+        }
+        self.stats[endpoint] = stat
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO endpoint_stats VALUES (?, ?, ?, ?, ?)",
+                (endpoint, stat["latency"], stat["success"], stat["samples"], stat["updated_at"]),
+            )
+            self.conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def report(self) -> List[Dict[str, object]]:
+        rows = []
+        for endpoint in self.stats:
+            current = self._current(endpoint)
+            rows.append(
+                {
+                    "endpoint": endpoint,
+                    "latency": round(current["latency"], 3),
+                    "success_rate": round(current["success"], 3),
+                    "samples": int(current["samples"]),
+                    "expected_cost": round(self.expected_cost(endpoint), 3),
+                }
+            )
+        return sorted(rows, key=lambda row: row["expected_cost"])
+
+
+class Endpoint:
+    """Point d'accès d'un service : l'API Google, une instance LibreTranslate..."""
+
+    def __init__(self, endpoint_id: str, translate, translate_batch):
+        self.id = endpoint_id
+        self.translate = translate
+        self.translate_batch = translate_batch
 
 
 class TranslationService:
     """Classe de base pour les services de traduction"""
 
+    name = "unknown"
+
     def translate(
         self, text: str, target_lang: str, source_lang: str = "en"
     ) -> Optional[str]:
         raise NotImplementedError
 
+    def translate_batch(
+        self, texts: List[str], target_lang: str, source_lang: str = "en"
+    ) -> List[Optional[str]]:
+        """Traduit plusieurs textes (par défaut une requête par texte)"""
+        return [self.translate(text, target_lang, source_lang) for text in texts]
+
+    def endpoints(self) -> List[Endpoint]:
+        """Points d'accès indépendants du service (un seul par défaut)"""
+        return [Endpoint(self.name, self.translate, self.translate_batch)]
+
 
 class GoogleTranslateService(TranslationService):
     """Service de traduction utilisant l'API Google Translate gratuite"""
 
+    name = "google"
+
     def __init__(self):
-        self.base_url = "https://translate.googleapis.com/translate_a/single"
+        self.base_url = os.environ.get(
+            "TRANSLATION_GOOGLE_URL", "https://translate.googleapis.com/translate_a/single"
+        )
         self.session = requests.Session()
         self.session.headers.update(
             {
@@ -65,13 +377,46 @@ class GoogleTranslateService(TranslationService):
 
         return None
 
+    def translate_batch(
+        self, texts: List[str], target_lang: str, source_lang: str = "en"
+    ) -> List[Optional[str]]:
+        """Regroupe les textes (une ligne chacun) dans des requêtes de taille limitée"""
+        results: List[Optional[str]] = []
+        chunk: List[str] = []
+        size = 0
+        for text in texts:
+            line = " ".join(text.split())
+            if chunk and size + len(line) > GOOGLE_BATCH_MAX_CHARS:
+                results.extend(self._translate_chunk(chunk, target_lang, source_lang))
+                chunk, size = [], 0
+            chunk.append(line)
+            size += len(line) + 1
+        if chunk:
+            results.extend(self._translate_chunk(chunk, target_lang, source_lang))
+        return results
+
+    def _translate_chunk(
+        self, lines: List[str], target_lang: str, source_lang: str
+    ) -> List[Optional[str]]:
+        if len(lines) > 1:
+            translated = self.translate("\n".join(lines), target_lang, source_lang)
+            if translated:
+                parts = [part.strip() for part in translated.split("\n")]
+                if len(parts) == len(lines):
+                    return parts
+            # Découpage incohérent : repli texte par texte
+        return [self.translate(line, target_lang, source_lang) for line in lines]
+
 
 class LibreTranslateService(TranslationService):
     """Service de traduction utilisant LibreTranslate (gratuit et open source)"""
 
+    name = "libretranslate"
+
     def __init__(self):
-        # Instances publiques de LibreTranslate
-        self.instances = [
+        # Instances publiques de LibreTranslate (surchargeables pour les tests)
+        configured = os.environ.get("TRANSLATION_LIBRETRANSLATE_URLS", "")
+        self.instances = [url.strip().rstrip("/") for url in configured.split(",") if url.strip()] or [
             "https://libretranslate.de",
             "https://translate.argosopentech.com",
             "https://translate.terraprint.co",
@@ -86,30 +431,87 @@ class LibreTranslateService(TranslationService):
             return ""
 
         for instance in self.instances:
-            try:
-                response = self.session.post(
-                    f"{instance}/translate",
-                    json={"q": text, "source": source_lang, "target": target_lang},
-                    timeout=10,
-                )
+            translated = self._translate_on(instance, text, target_lang, source_lang)
+            if translated:
+                return translated
 
-                if response.status_code == 200:
-                    result = response.json()
-                    if "translatedText" in result:
-                        return result["translatedText"].strip()
+        return None
 
-            except Exception as e:
-                print(f"❌ Erreur LibreTranslate ({instance}): {e}", file=sys.stderr)
-                continue
+    def _translate_on(
+        self, instance: str, text: str, target_lang: str, source_lang: str = "en"
+    ) -> Optional[str]:
+        try:
+            response = self.session.post(
+                f"{instance}/translate",
+                json={"q": text, "source": source_lang, "target": target_lang},
+                timeout=10,
+            )
+
+            if response.status_code == 200:
+                result = response.json()
+                if "translatedText" in result:
+                    return result["translatedText"].strip()
+
+        except Exception as e:
+            print(f"❌ Erreur LibreTranslate ({instance}): {e}", file=sys.stderr)
 
         return None
 
+    def translate_batch(
+        self, texts: List[str], target_lang: str, source_lang: str = "en"
+    ) -> List[Optional[str]]:
+        """LibreTranslate accepte une liste de textes dans `q`"""
+        results: List[Optional[str]] = [None] * len(texts)
+        for instance in self.instances:
+            results = self._translate_batch_on(instance, texts, target_lang, source_lang)
+            if any(results):
+                break
+        return results
+
+    def _translate_batch_on(
+        self, instance: str, texts: List[str], target_lang: str, source_lang: str = "en"
+    ) -> List[Optional[str]]:
+        if len(texts) <= 1:
+            return [self._translate_on(instance, text, target_lang, source_lang) for text in texts]
+
+        try:
+            response = self.session.post(
+                f"{instance}/translate",
+                json={"q": texts, "source": source_lang, "target": target_lang},
+                timeout=30,
+            )
+
+            if response.status_code == 200:
+                result = response.json().get("translatedText")
+                if isinstance(result, list) and len(result) == len(texts):
+                    return [(item or "").strip() or None for item in result]
+
+        except Exception as e:
+            print(f"❌ Erreur LibreTranslate ({instance}): {e}", file=sys.stderr)
+
+        return [None] * len(texts)
+
+    def endpoints(self) -> List[Endpoint]:
+        """Chaque instance est un point d'accès à part entière"""
+        return [
+            Endpoint(
+                f"{self.name}:{instance}",
+                functools.partial(self._translate_on, instance),
+                functools.partial(self._translate_batch_on, instance),
+            )
+            for instance in self.instances
+        ]
+
 
 class MyMemoryService(TranslationService):
     """Service de traduction utilisant MyMemory (gratuit)"""
 
+    name = "mymemory"
+
     def __init__(self):
-        self.base_url = "https://api.mymemory.translated.net/get"
+        self.base_url = os.environ.get(
+            "TRANSLATION_MYMEMORY_URL", "https://api.mymemory.translated.net/get"
+        )
         self.session = requests.Session()
 
     def translate(
@@ -142,22 +544,83 @@ class MyMemoryService(TranslationService):
         return None
 
 
+SERVICE_CLASSES = {
+    service.name: service
+    for service in (GoogleTranslateService, LibreTranslateService, MyMemoryService)
+}
+
+
+def _configured_services() -> List[TranslationService]:
+    """Services actifs, dans l'ordre de TRANSLATION_SERVICES (par défaut tous)"""
+    names = os.environ.get("TRANSLATION_SERVICES", "google,libretranslate,mymemory")
+    return [SERVICE_CLASSES[name.strip()]() for name in names.split(",") if name.strip() in SERVICE_CLASSES]
+
+
+def _run_in_thread(function, *args) -> Future:
+    """Exécute `function` dans un thread démon (une requête abandonnée ne bloque pas la sortie)"""
+    future: Future = Future()
+
+    def runner():
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=runner, daemon=True).start()
+    return future
+
+
 class TranslationManager:
-    """Gestionnaire des services de traduction avec fallback"""
+    """Gestionnaire des services de traduction avec fallback
 
-    def __init__(self):
-        self.services = [
-            GoogleTranslateService(),
-            LibreTranslateService(),
-            MyMemoryService(),
-        ]
-        self.cache = {}  # Cache simple en mémoire (session uniquement)
+    Le glossaire hors ligne (config/translation_glossary.json) est consulté
+    avant le cache et les services en ligne.
+    En mode séquentiel, les points d'accès sont essayés l'un après l'autre.
+    En mode concurrent (hedged), une requête est lancée vers le point d'accès
+    suivant si le précédent n'a pas répondu après TRANSLATION_HEDGE_DELAY
+    secondes ; la première réponse valide l'emporte.
+    """
+
+    def __init__(self, hedged: Optional[bool] = None):
+        self.services = _configured_services()
+        self.glossary = load_glossary()
+        self.cache = TranslationCache()  # Cache persistant (SQLite) partagé entre invocations
+        self.health = EndpointHealth(self.cache.conn)
+        self.stats = EndpointStats(self.cache.conn)
+        self.hedged = TRANSLATION_HEDGED if hedged is None else hedged
+        self.hedge_delay = TRANSLATION_HEDGE_DELAY
 
     def _get_cache_key(self, text: str, target_lang: str, source_lang: str) -> str:
         """Génère une clé de cache pour éviter les traductions redondantes"""
         content = f"{text}|{source_lang}|{target_lang}"
         return hashlib.md5(content.encode()).hexdigest()
 
+    def _endpoints(self) -> List[Endpoint]:
+        """Points d'accès dont le disjoncteur est fermé, du moins coûteux au plus coûteux
+
+        Un point d'accès semi-ouvert passe en tête : sinon, relégué par ses
+        échecs passés, il ne serait jamais réessayé.
+        """
+        endpoints = [endpoint for service in self.services for endpoint in service.endpoints()]
+        available = [endpoint for endpoint in endpoints if self.health.allow(endpoint.id)]
+        skipped = len(endpoints) - len(available)
+        if skipped:
+            print(f"⏭️  {skipped} point(s) d'accès en échec récent ignoré(s)", file=sys.stderr)
+        # Tous en échec : on retente quand même plutôt que d'abandonner
+        # (tri stable : à coût égal, l'ordre configuré est conservé)
+        return sorted(
+            available or endpoints,
+            key=lambda e: (not self.health.half_open(e.id), self.stats.expected_cost(e.id)),
+        )
+
+    def _observe(self, endpoint_id: str, started: float, success: bool, items: int = 1):
+        """Met à jour statistiques et disjoncteur (qui tient compte du taux de succès) après une réponse"""
+        self.stats.record(endpoint_id, (time.monotonic() - started) / max(items, 1), success)
+        if success:
+            self.health.record_success(endpoint_id)
+        else:
+            self.health.record_failure(endpoint_id, self.stats.success_rate(endpoint_id))
+
     def translate(self, text: str, target_lang: str, source_lang: str = "en") -> str:
         """Traduit un texte en essayant les services disponibles"""
         if not text or not text.strip():
@@ -167,60 +630,207 @@ class TranslationManager:
         if source_lang == target_lang:
             return text
 
-        # Vérifier le cache en mémoire (session uniquement)
+        # Phrases récurrentes : traduction hors ligne, prioritaire sur le cache
+        glossary_translation = self.glossary.lookup(text, target_lang, source_lang)
+        if glossary_translation is not None:
+            print("✅ Traduction trouvée dans le glossaire", file=sys.stderr)
+            return glossary_translation
+
+        # Vérifier le cache persistant
         cache_key = self._get_cache_key(text, target_lang, source_lang)
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            print("✅ Traduction trouvée dans le cache", file=sys.stderr)
+            return cached
 
-        # Essayer les services de traduction un par un
-        for i, service in enumerate(self.services):
-            try:
-                print(
-                    f"🔄 Tentative de traduction avec le service {i+1}...",
-                    file=sys.stderr,
-                )
-                translated = service.translate(text, target_lang, source_lang)
+        if self.hedged:
+            translated, endpoint_id = self._translate_hedged(text, target_lang, source_lang)
+        else:
+            translated, endpoint_id = self._translate_sequential(text, target_lang, source_lang)
 
-                if translated:
-                    print(
-                        f"✅ Traduction réussie avec le service {i+1}", file=sys.stderr
-                    )
-                    # Mettre en cache en mémoire uniquement
-                    self.cache[cache_key] = translated
-                    return translated
+        if translated:
+            translated = self.glossary.fix_protected_terms(translated)
+            print(f"✅ Traduction réussie avec {endpoint_id}", file=sys.stderr)
+            self.cache.set(cache_key, text, source_lang, target_lang, translated, endpoint_id)
+            return translated
 
+        # Aucun service n'a fonctionné, retourner le texte original
+        print(f"⚠️  Impossible de traduire, retour du texte original", file=sys.stderr)
+        return text
+
+    def _translate_sequential(self, text: str, target_lang: str, source_lang: str):
+        endpoints = self._endpoints()
+        for i, endpoint in enumerate(endpoints):
+            print(f"🔄 Tentative de traduction avec {endpoint.id}...", file=sys.stderr)
+            started = time.monotonic()
+            try:
+                translated = endpoint.translate(text, target_lang, source_lang)
             except Exception as e:
-                print(f"❌ Échec du service {i+1}: {e}", file=sys.stderr)
-                continue
+                print(f"❌ Échec de {endpoint.id}: {e}", file=sys.stderr)
+                translated = None
+
+            self._observe(endpoint.id, started, bool(translated))
+            if translated:
+                return translated, endpoint.id
 
             # Petite pause entre les tentatives
-            if i < len(self.services) - 1:
+            if i < len(endpoints) - 1:
                 time.sleep(0.5)
 
-        # Aucun service n'a fonctionné, retourner le texte original
-        print(f"⚠️  Impossible de traduire, retour du texte original", file=sys.stderr)
-        return text
+        return None, None
+
+    def _translate_hedged(self, text: str, target_lang: str, source_lang: str):
+        return self._race(
+            self._endpoints(),
+            lambda endpoint: endpoint.translate(text, target_lang, source_lang),
+            bool,
+        )
+
+    def _race(self, queue: List[Endpoint], call, succeeded):
+        """Requêtes couvertes : la première réponse valide parmi les points d'accès l'emporte"""
+        queue = list(queue)
+        pending: Dict[Future, Endpoint] = {}
+        started: Dict[str, float] = {}
+        deadline = time.monotonic() + TRANSLATION_HEDGE_DEADLINE
+
+        def launch():
+            endpoint = queue.pop(0)
+            print(f"🔄 Requête vers {endpoint.id}...", file=sys.stderr)
+            started[endpoint.id] = time.monotonic()
+            pending[_run_in_thread(call, endpoint)] = endpoint
+
+        def abandon():
+            # Requêtes encore en cours : leur latence est au moins le temps écoulé
+            for endpoint in pending.values():
+                self.stats.record(endpoint.id, time.monotonic() - started[endpoint.id], None)
+
+        if queue:
+            launch()
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = min(self.hedge_delay, remaining) if queue else remaining
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Pas de réponse à temps : requête couverte vers le point d'accès suivant
+                if queue:
+                    launch()
+                continue
+
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ Échec de {endpoint.id}: {e}", file=sys.stderr)
+                    result = None
+                success = bool(result) and bool(succeeded(result))
+                self._observe(endpoint.id, started[endpoint.id], success)
+                if success:
+                    abandon()
+                    return result, endpoint.id
+
+            # Échec franc : inutile d'attendre le délai avant de passer au suivant
+            if queue:
+                launch()
+
+        abandon()
+        return None, None
+
+    def translate_batch(
+        self, texts: List[str], target_lang: str, source_lang: str = "en"
+    ) -> List[str]:
+        """Traduit plusieurs textes : glossaire et cache d'abord, puis requêtes groupées par point d'accès"""
+        results: List[Optional[str]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}  # clé de cache -> positions
+
+        for position, text in enumerate(texts):
+            if not text or not text.strip():
+                results[position] = ""
+            elif source_lang == target_lang:
+                results[position] = text
+            else:
+                results[position] = self.glossary.lookup(text, target_lang, source_lang)
+                if results[position] is not None:
+                    continue
+                key = self._get_cache_key(text, target_lang, source_lang)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    results[position] = cached
+                else:
+                    pending.setdefault(key, []).append(position)
+
+        print(
+            f"📦 {len(texts)} texte(s), {len(pending)} à traduire (hors glossaire et cache)",
+            file=sys.stderr,
+        )
+
+        def apply(keys, batch, translations, endpoint_id):
+            for key, text, translated in zip(keys, batch, translations):
+                if not translated:
+                    continue
+                translated = self.glossary.fix_protected_terms(translated)
+                self.cache.set(key, text, source_lang, target_lang, translated, endpoint_id)
+                for position in pending.pop(key):
+                    results[position] = translated
+            print(
+                f"✅ {endpoint_id}: {len(keys) - len(pending)}/{len(keys)} traduit(s)",
+                file=sys.stderr,
+            )
 
+        endpoints = self._endpoints() if pending else []
+        if self.hedged and pending:
+            keys = list(pending)
+            batch = [texts[pending[key][0]] for key in keys]
+            translations, endpoint_id = self._race(
+                endpoints,
+                lambda endpoint: endpoint.translate_batch(batch, target_lang, source_lang),
+                any,
+            )
+            if endpoint_id:
+                apply(keys, batch, translations, endpoint_id)
+                endpoints = [e for e in endpoints if e.id != endpoint_id]
 
-def get_github_description(repo_name: str) -> Optional[str]:
+        # Séquentiel (ou restes du mode concurrent) : chaque point d'accès reçoit ce qui manque
+        for endpoint in endpoints:
+            if not pending:
+                break
+            keys = list(pending)
+            batch = [texts[pending[key][0]] for key in keys]
+            started = time.monotonic()
+            try:
+                translations = endpoint.translate_batch(batch, target_lang, source_lang)
+            except Exception as e:
+                print(f"❌ Échec de {endpoint.id}: {e}", file=sys.stderr)
+                translations = []
+
+            self._observe(endpoint.id, started, any(translations), len(batch))
+            apply(keys, batch, translations, endpoint.id)
+
+        # Textes non traduits : on conserve l'original, comme translate()
+        return [text if result is None else result for text, result in zip(texts, results)]
+
+
+def _clean_description(description: Optional[str]) -> Optional[str]:
+    """Filtre les descriptions vides ou génériques"""
+    description = (description or "").strip()
+    if description and description.lower() not in GENERIC_DESCRIPTIONS:
+        return description
+    return None
+
+
+def get_github_description(
+    repo_name: str, client: Optional[GitHubClient] = None
+) -> Optional[str]:
     """Récupère la description d'un dépôt GitHub OCA"""
 
     try:
-        url = f"https://api.github.com/repos/OCA/{repo_name}"
-        response = requests.get(url, timeout=10)
+        client = client or GitHubClient()
+        response = client.get(f"/repos/OCA/{repo_name}", timeout=10)
         response.raise_for_status()
 
-        repo_data = response.json()
-        description = repo_data.get("description", "").strip()
-
-        # Filtrer les descriptions vides ou génériques
-        if description and description.lower() not in [
-            "",
-            "null",
-            "none",
-            "odoo addons",
-        ]:
-            return description
+        return _clean_description(response.json().get("description"))
 
     except Exception as e:
         print(
@@ -231,8 +841,153 @@ def get_github_description(repo_name: str) -> Optional[str]:
     return None
 
 
+def get_github_descriptions(
+    repo_names: Iterable[str], client: Optional[GitHubClient] = None
+) -> Dict[str, Optional[str]]:
+    """Récupère les descriptions de plusieurs dépôts OCA
+
+    Au-delà de quelques dépôts, la liste paginée de l'organisation (3 requêtes)
+    est bien moins coûteuse qu'une requête par dépôt.
+    """
+    client = client or GitHubClient()
+    wanted = set(repo_names)
+    descriptions: Dict[str, Optional[str]] = {}
+
+    if len(wanted) > ORG_LISTING_THRESHOLD:
+        try:
+            for repo in client.paginate("/orgs/OCA/repos"):
+                if repo["name"] in wanted:
+                    descriptions[repo["name"]] = _clean_description(
+                        repo.get("description")
+                    )
+        except Exception as e:
+            print(
+                f"⚠️  Liste de l'organisation indisponible, requêtes unitaires: {e}",
+                file=sys.stderr,
+            )
+
+    for repo_name in sorted(wanted - set(descriptions)):
+        descriptions[repo_name] = get_github_description(repo_name, client)
+    return descriptions
+
+
+def _read_batch_input(stream) -> List[Dict[str, str]]:
+    """Lit des noms de dépôts (un par ligne) ou des objets JSONL {"repo", "text"}"""
+    items = []
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            entry = json.loads(line)
+            items.append({"repo": entry["repo"], "text": entry.get("text")})
+        else:
+            items.append({"repo": line, "text": None})
+    return items
+
+
+def batch_main(argv: List[str]):
+    """Mode lot : un seul processus pour traduire les descriptions de nombreux dépôts"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="translate_description.py --batch",
+        description="Traduction en lot des descriptions GitHub des dépôts OCA",
+    )
+    parser.add_argument("target_lang", help="Langue cible (fr, en...)")
+    parser.add_argument("repos", nargs="*", help="Dépôts (sinon lus sur l'entrée standard)")
+    parser.add_argument("--source", default="en", help="Langue source (défaut: en)")
+    parser.add_argument(
+        "--hedged",
+        action="store_true",
+        help="Mode concurrent : requêtes couvertes vers plusieurs services",
+    )
+    parser.add_argument(
+        "--input", help="Fichier de dépôts ou JSONL {\"repo\", \"text\"} ('-' = entrée standard)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.repos:
+        items = [{"repo": repo, "text": None} for repo in args.repos]
+    elif args.input and args.input != "-":
+        with open(args.input, "r") as f:
+            items = _read_batch_input(f)
+    else:
+        items = _read_batch_input(sys.stdin)
+
+    # Descriptions GitHub pour les entrées qui ne fournissent pas de texte
+    missing = [item["repo"] for item in items if not item["text"]]
+    if missing:
+        print(
+            f"🔍 Récupération des descriptions GitHub de {len(missing)} dépôt(s)...",
+            file=sys.stderr,
+        )
+        descriptions = get_github_descriptions(missing)
+        for item in items:
+            if not item["text"]:
+                item["text"] = descriptions.get(item["repo"])
+
+    translator = TranslationManager(hedged=args.hedged or None)
+    to_translate = [item for item in items if item["text"]]
+    translations = translator.translate_batch(
+        [item["text"] for item in to_translate], args.target_lang, args.source
+    )
+    for item, translation in zip(to_translate, translations):
+        item["translation"] = translation
+
+    results = []
+    for item in items:
+        if not item["text"]:
+            status, translation = "no_description", None
+        elif item["translation"] == item["text"] and args.source != args.target_lang:
+            status, translation = "untranslated", item["translation"]
+        else:
+            status, translation = "translated", item["translation"]
+        results.append(
+            {
+                "repo": item["repo"],
+                "source": item["text"],
+                "translation": translation,
+                "status": status,
+            }
+        )
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+def show_stats(as_json: bool = False):
+    """Affiche les statistiques des points d'accès, dans l'ordre où ils seront essayés"""
+    manager = TranslationManager()
+    rows = manager.stats.report()
+    for row in rows:
+        row["available"] = manager.health.allow(row["endpoint"])
+
+    if as_json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+
+    if not rows:
+        print("Aucune statistique enregistrée pour l'instant")
+        return
+    print(f"{'Point d accès':<50} {'Latence':>8} {'Succès':>7} {'Mesures':>8} {'Coût':>7}")
+    for row in rows:
+        state = "" if row["available"] else "  ⛔ en pause"
+        print(
+            f"{row['endpoint']:<50} {row['latency']:>7.2f}s {row['success_rate']:>6.0%} "
+            f"{row['samples']:>8} {row['expected_cost']:>7.2f}{state}"
+        )
+
+
 def main():
     """Fonction principale"""
+    if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        batch_main(sys.argv[2:])
+        return
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--stats":
+        show_stats("--json" in sys.argv[2:])
+        return
+
     if len(sys.argv) < 3:
         print(
             "Usage: python3 translate_description.py <repo_name> <target_lang> [source_lang]",
@@ -242,6 +997,14 @@ def main():
             "Exemple: python3 translate_description.py account-analytic fr en",
             file=sys.stderr,
         )
+        print(
+            "Mode lot: python3 translate_description.py --batch <target_lang> [repo ...] [--input fichier.jsonl]",
+            file=sys.stderr,
+        )
+        print(
+            "Statistiques: python3 translate_description.py --stats [--json]",
+            file=sys.stderr,
+        )
         sys.exit(1)
 
     repo_name = sys.argv[1]
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Glossaire de traduction hors ligne pour les descriptions OCA
+
+Les descriptions des dépôts OCA sont très répétitives ("Odoo addons for X",
+"Tools for Y", "OCA module"). Avant tout appel réseau, TranslationManager
+consulte ce glossaire (config/translation_glossary.json) :
+
+- phrases : traductions complètes, comparées sans tenir compte de la casse ;
+- templates : expressions régulières précompilées, dont les groupes sont
+  traduits par le dictionnaire `terms` (les groupes nommés `name...` sont
+  recopiés tels quels) ;
+- protected_terms : sigles et noms propres jamais traduits, dont la casse
+  est aussi rétablie dans les traductions venues des services en ligne.
+
+Une description n'est traduite par le glossaire que si chacun de ses termes
+est connu ; sinon elle part vers les services en ligne.
+
+Usage : translation_glossary.py "Tools for accounting and invoicing" [fr]
+"""
+
+import functools
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+GLOSSARY_FILE = Path(
+    os.environ.get("TRANSLATION_GLOSSARY_FILE", ROOT_DIR / "config" / "translation_glossary.json")
+)
+
+# Séparateurs d'énumération dans les groupes ("X, Y and Z")
+_ENUMERATION = re.compile(r"\s*(?:,\s*(?:and\s+|&\s+)?|\s+and\s+|\s*&\s*)\s*", re.IGNORECASE)
+# Élision de "de" devant une voyelle ou un h muet
+_ELISION = re.compile(r"\bde ([aeiouyhàâéèêîïôû])", re.IGNORECASE)
+_AND = {"fr": "et", "en": "and"}
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip()).lower()
+
+
+class Glossary:
+    """Glossaire chargé et précompilé une seule fois"""
+
+    def __init__(self, data: Optional[Dict] = None):
+        data = data or {}
+        self.source = data.get("source", "en")
+        self.protected = {_normalize(term): term for term in data.get("protected_terms", [])}
+        self._protected_pattern: Optional[Pattern] = None
+        if self.protected:
+            alternatives = sorted((re.escape(term) for term in self.protected.values()), key=len, reverse=True)
+            self._protected_pattern = re.compile(
+                r"(?<![\w.])(?:" + "|".join(alternatives) + r")(?!\w)", re.IGNORECASE
+            )
+
+        self.phrases: Dict[str, Dict[str, str]] = {}
+        self.terms: Dict[str, Dict[str, str]] = {}
+        self.templates: Dict[str, List[Tuple[Pattern, str]]] = {}
+        for lang, entries in data.get("languages", {}).items():
+            self.phrases[lang] = {_normalize(k): v for k, v in entries.get("phrases", {}).items()}
+            self.terms[lang] = {_normalize(k): v for k, v in entries.get("terms", {}).items()}
+            self.templates[lang] = [
+                (re.compile(template["pattern"], re.IGNORECASE), template["text"])
+                for template in entries.get("templates", [])
+            ]
+
+    def _term(self, text: str, lang: str) -> Optional[str]:
+        """Traduit un groupe : terme connu, terme protégé ou énumération de termes connus"""
+        key = _normalize(text)
+        if key in self.terms[lang]:
+            return self.terms[lang][key]
+        if key in self.protected:
+            return self.protected[key]
+
+        parts = [part for part in _ENUMERATION.split(text) if part]
+        if len(parts) < 2:
+            return None
+        translated = [self._term(part, lang) for part in parts]
+        if None in translated:
+            return None
+        return f"{', '.join(translated[:-1])} {_AND.get(lang, 'and')} {translated[-1]}"
+
+    def lookup(self, text: str, target_lang: str, source_lang: str = "en") -> Optional[str]:
+        """Traduction hors ligne, ou None si le glossaire ne couvre pas le texte"""
+        if source_lang != self.source or target_lang not in self.phrases:
+            return None
+        stripped = text.strip()
+        period = "." if stripped.endswith(".") else ""
+        body = stripped.rstrip(".").strip()
+
+        translated = self.phrases[target_lang].get(_normalize(body))
+        if translated is None:
+            translated = self._apply_templates(body, target_lang)
+        if translated is None:
+            return None
+        return translated[:1].upper() + translated[1:] + period
+
+    def _apply_templates(self, text: str, lang: str) -> Optional[str]:
+        for pattern, template in self.templates[lang]:
+            match = pattern.match(text)
+            if not match:
+                continue
+            values = {}
+            for group, value in match.groupdict().items():
+                values[group] = value.strip() if group.startswith("name") else self._term(value, lang)
+                if values[group] is None:
+                    break
+            else:
+                rendered = template.format(**values)
+                return _ELISION.sub(r"d'\1", rendered) if lang == "fr" else rendered
+        return None
+
+    def fix_protected_terms(self, text: str) -> str:
+        """Rétablit la graphie des termes protégés (ex: "Oca" -> "OCA")"""
+        if not self._protected_pattern or not text:
+            return text
+        return self._protected_pattern.sub(lambda m: self.protected[_normalize(m.group(0))], text)
+
+
+@functools.lru_cache(maxsize=None)
+def load_glossary(path: Optional[Path] = None) -> Glossary:
+    """Glossaire partagé par le processus (vide si le fichier est absent ou invalide)"""
+    path = Path(path or GLOSSARY_FILE)
+    try:
+        with open(path, "r") as f:
+            return Glossary(json.load(f))
+    except (OSError, ValueError, re.error, KeyError) as e:
+        print(f"⚠️  Glossaire de traduction indisponible ({path}): {e}", file=sys.stderr)
+        return Glossary()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        sys.exit(1)
+    text = sys.argv[1]
+    target_lang = sys.argv[2] if len(sys.argv) > 2 else "fr"
+    translated = load_glossary().lookup(text, target_lang)
+    if translated is None:
+        print("❌ Non couvert par le glossaire", file=sys.stderr)
+        sys.exit(1)
+    print(translated)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,12 @@
 
 # Script pour mettre à jour tous les submodules d'un dépôt client
 # Usage: update_client_submodules.sh [client_name]
+# Variable JOBS : nombre de mises à jour parallèles (défaut: 8)
 
 set -e
 
 CLIENT_NAME="$1"
+JOBS="${JOBS:-8}"
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 ROOT_DIR="$(dirname "$SCRIPT_DIR")"
 CLIENTS_DIR="$ROOT_DIR/clients"
@@ -52,17 +54,13 @@ if [ ! -d ".git" ]; then
     exit 1
 fi
 
-# Mettre à jour les submodules
-echo_info "Initialisation et mise à jour des submodules..."
-git submodule update --init --recursive
-
-echo_info "Mise à jour vers les dernières versions..."
-git submodule foreach '
-    echo "Mise à jour de $name..."
-    git fetch origin
-    git checkout $(git symbolic-ref refs/remotes/origin/HEAD | sed "s@^refs/remotes/origin/@@")
-    git pull origin $(git symbolic-ref refs/remotes/origin/HEAD | sed "s@^refs/remotes/origin/@@")
-'
+# Mise à jour parallèle : une passe ls-remote écarte les submodules déjà à jour,
+# les autres sont récupérés en parallèle (depuis les miroirs locaux pour l'OCA)
+echo_info "Mise à jour des submodules ($JOBS en parallèle)..."
+if ! python3 "$SCRIPT_DIR/parallel_submodule_update.py" . --jobs "$JOBS"; then
+    echo_error "Certains submodules n'ont pas pu être mis à jour"
+    exit 1
+fi
 
 echo_success "Mise à jour terminée pour le client $CLIENT_NAME"
 echo_warning "N'oubliez pas de tester les modules après la mise à jour"
@@ -2,7 +2,7 @@
 
 # Script pour mettre à jour automatiquement la liste des dépôts OCA dans repositories.json
 # Ce script récupère tous les dépôts de l'organisation OCA sur GitHub
-# Usage: update_oca_repositories.sh [--clean]
+# Usage: update_oca_repositories.sh [--clean] [--incremental]
 
 set -e
 
@@ -19,6 +19,7 @@ LANGUAGE="fr"
 VERIFY_ADDONS=true
 FILTER_EXISTING=false
 UPDATE_TRANSLATIONS=false
+INCREMENTAL=false
 
 # Parser les arguments
 while [[ $# -gt 0 ]]; do
@@ -47,14 +48,19 @@ while [[ $# -gt 0 ]]; do
             UPDATE_TRANSLATIONS=true
             shift
             ;;
+        --incremental)
+            INCREMENTAL=true
+            shift
+            ;;
         -h|--help)
-            echo "Usage: $0 [--clean] [--lang fr|en] [--no-verify] [--filter-existing] [--update-translations]"
+            echo "Usage: $0 [--clean] [--lang fr|en] [--no-verify] [--filter-existing] [--update-translations] [--incremental]"
             echo "Options:"
             echo "  --clean               Supprimer les fichiers de sauvegarde après succès"
             echo "  --lang fr|en          Langue pour les descriptions (défaut: fr)"
             echo "  --no-verify           Désactiver la vérification des addons Odoo (plus rapide)"
             echo "  --filter-existing     Filtrer le fichier existant sans appels API"
             echo "  --update-translations Mettre à jour les traductions via l'API GitHub (attention aux rate limits)"
+            echo "  --incremental         Ne re-vérifier que les dépôts nouveaux ou modifiés depuis le dernier passage"
             echo "  -h, --help            Afficher cette aide"
             exit 0
             ;;
@@ -66,6 +72,15 @@ while [[ $# -gt 0 ]]; do
     esac
 done
 
+# Mode incrémental : délégué au script Python (requêtes conditionnelles, état par dépôt)
+if [ "$INCREMENTAL" = true ]; then
+    incremental_args=(--lang "$LANGUAGE")
+    if [ "$VERIFY_ADDONS" = false ]; then
+        incremental_args+=(--no-verify)
+    fi
+    exec python3 "$SCRIPT_DIR/oca_catalog_refresh.py" "${incremental_args[@]}"
+fi
+
 # Couleurs
 GREEN='\033[0;32m'
 BLUE='\033[0;34m'
@@ -78,12 +93,21 @@ echo_success() { echo -e "${GREEN}✅ $1${NC}"; }
 echo_warning() { echo -e "${YIGHLIGHT}⚠️  $1${NC}"; }
 echo_error() { echo -e "${RED}❌ $1${NC}"; }
 
+# Requête sur l'API GitHub via scripts/github_client.py (quota, Retry-After, ETag)
+# Sortie : code HTTP en première ligne, puis le corps de la réponse
+github_api() {
+    local method="$1"
+    local path="$2"
+    
+    python3 "$SCRIPT_DIR/github_client.py" request "$method" "$path" --http-code
+}
+
 # Vérifier les dépendances
 check_dependencies() {
     local missing_deps=()
     
-    if ! command -v curl >/dev/null 2>&1; then
-        missing_deps+=("curl")
+    if ! command -v python3 >/dev/null 2>&1; then
+        missing_deps+=("python3")
     fi
     
     if ! command -v jq >/dev/null 2>&1; then
@@ -108,22 +132,25 @@ fetch_oca_repositories() {
         echo_info "Récupération de la page $page..."
         
         # Récupérer une page de dépôts (100 par page maximum)
-        local response=$(curl -s "https://api.github.com/orgs/OCA/repos?page=$page&per_page=100" 2>/dev/null)
+        local output
+        if ! output=$(github_api GET "/orgs/OCA/repos?page=$page&per_page=100"); then
+            echo_error "Échec de la requête API GitHub (limite de taux ou erreur réseau). Réessayez plus tard."
+            exit 1
+        fi
+        local http_code=$(echo "$output" | head -n 1)
+        local response=$(echo "$output" | tail -n +2)
+        
+        if [ "$http_code" != "200" ]; then
+            local message=$(echo "$response" | jq -r '.message // empty' 2>/dev/null)
+            echo_error "Réponse inattendue de l'API GitHub (HTTP $http_code${message:+: $message})"
+            exit 1
+        fi
         
         # Vérifier si la réponse est valide
         if [ -z "$response" ] || [ "$response" = "[]" ]; then
             break
         fi
         
-        # Vérifier si on a atteint la limite de taux
-        if echo "$response" | jq -e '.message' >/dev/null 2>&1; then
-            local message=$(echo "$response" | jq -r '.message')
-            if [[ "$message" == *"rate limit"* ]]; then
-                echo_error "Limite de taux API GitHub atteinte. Réessayez plus tard."
-                exit 1
-            fi
-        fi
-        
         # Fusionner avec les dépôts déjà récupérés
         all_repos=$(echo "$all_repos" "$response" | jq -s '.[0] + .[1]')
         
@@ -134,9 +161,6 @@ fetch_oca_repositories() {
         fi
         
         page=$((page + 1))
-        
-        # Pause pour éviter de surcharger l'API
-        sleep 0.5
     done
     
     echo "$all_repos" > "$TEMP_FILE"
@@ -210,16 +234,16 @@ verify_odoo_addons() {
         
         echo_info "[$repo_index/$total_repos] Vérification de $repo_name..."
         
-        # Construire l'URL de l'API GitHub pour lister le contenu
-        local api_url="https://api.github.com/repos/OCA/$repo_name/contents"
-        
         # Récupérer la liste des fichiers/dossiers de premier niveau
-        local contents=$(curl -s "$api_url" 2>/dev/null)
+        local output=""
+        output=$(github_api GET "/repos/OCA/$repo_name/contents") || true
+        local http_code=$(echo "$output" | head -n 1)
+        local contents=$(echo "$output" | tail -n +2)
         
         # Vérifier si on a une réponse valide
-        if [ -z "$contents" ] || echo "$contents" | jq -e '.message' >/dev/null 2>&1; then
-            local error_msg=$(echo "$contents" | jq -r '.message' 2>/dev/null || "erreur de connexion")
-            echo_warning "  ⚠️  Impossible de vérifier $repo_name ($error_msg), exclusion"
+        if [ "$http_code" != "200" ]; then
+            local error_msg=$(echo "$contents" | jq -r '.message // empty' 2>/dev/null)
+            echo_warning "  ⚠️  Impossible de vérifier $repo_name (${error_msg:-erreur de connexion}), exclusion"
             rejected_count=$((rejected_count + 1))
             continue
         fi
@@ -234,10 +258,9 @@ verify_odoo_addons() {
             local dir_count=0
             while IFS= read -r dir_name && [ $dir_count -lt 5 ]; do  # Limiter à 5 dossiers par dépôt
                 if [ -n "$dir_name" ]; then
-                    local manifest_url="https://api.github.com/repos/OCA/$repo_name/contents/$dir_name/__manifest__.py"
-                    local manifest_check=$(curl -s "$manifest_url" 2>/dev/null)
+                    local manifest_code=$(github_api HEAD "/repos/OCA/$repo_name/contents/$dir_name/__manifest__.py" | head -n 1)
                     
-                    if echo "$manifest_check" | jq -e '.name' >/dev/null 2>&1; then
+                    if [ "$manifest_code" = "200" ]; then
                         has_addon=true
                         manifest_found="$dir_name"
                         break
@@ -256,14 +279,7 @@ verify_odoo_addons() {
             rejected_count=$((rejected_count + 1))
             echo "     ❌ Aucun module Odoo détecté (pas de __manifest__.py)"
         fi
-        
-        # Pause pour éviter de surcharger l'API GitHub
-        if [ $((repo_index % 10)) -eq 0 ]; then
-            echo_info "  ⏸️  Pause API (traité $repo_index/$total_repos)..."
-            sleep 2
-        else
-            sleep 0.3
-        fi
+        # Pas de pause fixe : github_client.py régule le débit selon le quota restant
     done < <(jq -c '.[]' "${TEMP_FILE}.filtered")
     
     # Sauvegarder les dépôts vérifiés
@@ -595,7 +611,7 @@ update_translations_with_rate_limit() {
     if ! "$translate_script" complete-missing "$LANGUAGE" --limit "$batch_size" --delay "$delay_between_requests"; then
         echo_warning "⚠️  Mise à jour des traductions interrompue (probablement rate limit)"
         echo_info "💡 Attendez quelques minutes et relancez avec --update-translations"
-        echo_info "   Ou consultez les quotas: curl -s https://api.github.com/rate_limit"
+        echo_info "   Ou consultez les quotas: make github-rate-limit"
         return 1
     fi
     
@@ -607,7 +623,7 @@ check_github_rate_limit() {
     echo_info "🔍 Vérification du rate limit GitHub..."
     
     local rate_limit_info
-    if rate_limit_info=$(curl -s https://api.github.com/rate_limit 2>/dev/null); then
+    if rate_limit_info=$(python3 "$SCRIPT_DIR/github_client.py" rate-limit 2>/dev/null); then
         local remaining=$(echo "$rate_limit_info" | jq -r '.rate.remaining // 0')
         local limit=$(echo "$rate_limit_info" | jq -r '.rate.limit // 0')
         local reset_time=$(echo "$rate_limit_info" | jq -r '.rate.reset // 0')